@@ -0,0 +1,73 @@
+"""
+Guardado automático en segundo plano para el Simulador de Red
+Un hilo escribe periódicamente el checkpoint completo si la red ha cambiado
+(configuración o contadores de tráfico), de modo que al salir solo queda
+pendiente el diario de cambios y el tráfico del último intervalo
+"""
+
+import threading
+
+AUTOSAVE_INTERVAL = 30.0  # Segundos entre comprobaciones
+
+class Autosave:
+    """
+    Hilo de guardado periódico
+
+    Cada guardado copia la red bajo el candado del ConfigManager y la
+    escribe en un temporal que sustituye al checkpoint con os.replace (ver
+    ConfigManager.save_config). Si no hubo cambios desde el último
+    checkpoint, ni de configuración ni de contadores de tráfico, no se
+    escribe nada.
+    """
+
+    def __init__(self, network, config_manager, interval=AUTOSAVE_INTERVAL):
+        """
+        Inicializa el guardado automático
+
+        Args:
+            network: Instancia de Network a guardar
+            config_manager: ConfigManager con el checkpoint ya establecido
+            interval (float): Segundos entre comprobaciones
+        """
+        self.network = network
+        self.config_manager = config_manager
+        self.interval = interval
+        self.saves = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Arranca el hilo de guardado"""
+        self.thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Detiene el hilo esperando a que termine el guardado en curso, si lo hay"""
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def save_if_dirty(self):
+        """
+        Escribe el checkpoint si la red tiene cambios sin guardar
+
+        Returns:
+            tuple: (se guardó, mensaje)
+        """
+        if not self.config_manager.is_dirty(self.network):
+            return False, "Sin cambios desde el último guardado"
+        success, message = self.config_manager.checkpoint(self.network)
+        if success:
+            self.saves += 1
+        return success, message
+
+    def _run(self):
+        """Bucle del hilo: comprueba cada intervalo hasta que se detiene"""
+        while not self.stop_event.wait(self.interval):
+            try:
+                success, message = self.save_if_dirty()
+            except Exception as e:
+                success, message = False, f"Error en el guardado automático: {e}"
+            if not success and message.startswith("Error"):
+                print(f"Advertencia: {message}")
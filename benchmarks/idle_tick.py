@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: coste de un tick en una topología grande casi inactiva
+
+Construye una cadena de N dispositivos y, en cada tick, inyecta unos pocos
+paquetes entre vecinos fijos (sus tablas de rutas quedan en caché tras el
+primer tick), de modo que lo medido es el recorrido del propio tick.
+
+Como referencia mide también un tick de barrido completo: antes de la lista
+de interfaces pendientes, process_packets recorría todas las interfaces de
+todos los dispositivos dos veces por tick (cola de salida y de entrada);
+full_scan_tick repite ese recorrido antes del tick normal, de modo que la
+diferencia entre ambas cifras es lo que ahorra la lista de trabajo.
+
+Uso: python benchmarks/idle_tick.py [dispositivos] [ticks] [paquetes]
+"""
+
+import sys
+import os
+import time
+
+# Añadir el directorio raíz al path para importar módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from network import Network
+
+def build_chain(device_count):
+    """Construye una cadena D0 - D1 - ... - Dn-1 con dos interfaces por dispositivo"""
+    network = Network()
+    for index in range(device_count):
+        name = f"D{index}"
+        network.add_device(name, "router")
+        device = network.get_device(name)
+        device.add_interface("e0", f"10.{index >> 8 & 255}.{index & 255}.1")
+        device.add_interface("e1", f"10.{index >> 8 & 255}.{index & 255}.2")
+        for interface in device.get_interfaces():
+            interface.no_shutdown()
+    for index in range(device_count - 1):
+        network.connect_interfaces(f"D{index}", "e1", f"D{index + 1}", "e0")
+    return network
+
+def full_scan_tick(network):
+    """Tick con el barrido de todas las interfaces que hacía process_packets sin lista de trabajo"""
+    for has_packets in ("has_output_packets", "has_input_packets"):
+        for device in network.devices.values():
+            if not device.is_online():
+                continue
+            for interface in device.get_interfaces():
+                if interface.is_up():
+                    getattr(interface, has_packets)()
+    return network.process_packets()
+
+def run(device_count=10000, ticks=50, packets=5, full_scan=False):
+    """Ejecuta el benchmark y retorna los segundos medios por tick"""
+    network = build_chain(device_count)
+    process = full_scan_tick if full_scan else Network.process_packets
+
+    def tick():
+        for index in range(packets):
+            network.send_packet(f"10.0.{index}.2", f"10.0.{index + 1}.1", "bench")
+        process(network)
+
+    tick()  # Calentamiento: calcula las tablas de los dispositivos usados
+
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick()
+    elapsed = time.perf_counter() - start
+    return elapsed / ticks
+
+if __name__ == "__main__":
+    device_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    ticks = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    packets = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    for label, full_scan in (("barrido completo", True), ("lista de trabajo", False)):
+        per_tick = run(device_count, ticks, packets, full_scan)
+        print(f"{device_count} dispositivos, {packets} paquetes en vuelo, {label}: "
+              f"{per_tick * 1000:.3f} ms/tick ({1 / per_tick:.0f} ticks/s)")
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Benchmark: escalabilidad de las operaciones principales con el tamaño de la red
+
+Para cada tamaño construye una cadena sintética de N dispositivos y mide:
+- send_packet: paquetes encolados por segundo
+- process_packets: tiempo en vaciar la ráfaga enviada y ticks/s con tráfico
+  constante entre vecinos (como idle_tick.py)
+- Lo mismo con flujos lejanos (prefijo far_): tramos de varios saltos
+  elegidos al azar con semilla fija y, en redes pequeñas, la cadena entera
+  de un extremo a otro, para que el vaciado dure más de un tick
+- ConfigManager.save_config, load_config e import_cli_config
+- Pico de memoria (tracemalloc) al construir la red y al cargarla
+
+Los resultados se emiten en JSON para compararlos entre commits.
+
+Uso: python benchmarks/scalability.py [--sizes 100 1000 10000 100000]
+                                      [--output resultados.json] [--no-memory]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Añadir el directorio raíz al path para importar módulos
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from network import Network
+from config_manager import ConfigManager
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+SOURCES = 10  # Dispositivos que envían tráfico (cada uno calcula su tabla de rutas, O(N))
+FAR_SEED = 2024  # Semilla de los tramos lejanos (resultados comparables entre commits)
+FAR_SPANS = 2  # Tramos lejanos, recorridos en ambos sentidos
+FAR_HOPS = 8  # Saltos de cada tramo (cada dispositivo del tramo calcula su tabla, O(N))
+DIAMETER_LIMIT = 100  # Hasta este tamaño también se cruza la cadena de extremo a extremo
+
+def address(index, host):
+    """IP de la interfaz host (1 o 2) del dispositivo index; única hasta 11M dispositivos"""
+    return f"{10 + (index >> 16)}.{index >> 8 & 255}.{index & 255}.{host}"
+
+def build_chain(device_count):
+    """Construye una cadena D0 - D1 - ... - Dn-1 con dos interfaces por dispositivo"""
+    network = Network()
+    for index in range(device_count):
+        name = f"D{index}"
+        network.add_device(name, "router")
+        device = network.get_device(name)
+        device.add_interface("e0", address(index, 1))
+        device.add_interface("e1", address(index, 2))
+        for interface in device.get_interfaces():
+            interface.no_shutdown()
+    for index in range(device_count - 1):
+        network.connect_interfaces(f"D{index}", "e1", f"D{index + 1}", "e0")
+    return network
+
+def traffic(device_count):
+    """Flujos (origen, destino, ttl) entre vecinos repartidos a lo largo de la cadena"""
+    step = max(1, (device_count - 1) // SOURCES)
+    return [(address(index, 2), address(index + 1, 1), 10)
+            for index in range(0, device_count - 1, step)][:SOURCES]
+
+def far_traffic(device_count):
+    """
+    Flujos (origen, destino, ttl) de varios saltos: FAR_SPANS tramos de
+    FAR_HOPS saltos en posiciones aleatorias (semilla fija) y, si la red no
+    supera DIAMETER_LIMIT, la cadena completa; todos en ambos sentidos
+    """
+    rng = random.Random(FAR_SEED)
+    hops = min(FAR_HOPS, device_count - 1)
+    spans = [(start, start + hops)
+             for start in (rng.randrange(device_count - hops) for _ in range(FAR_SPANS))]
+    if device_count <= DIAMETER_LIMIT:
+        spans.append((0, device_count - 1))
+
+    flows = []
+    for first, last in spans:
+        ttl = last - first + 2
+        flows.append((address(first, 2), address(last, 1), ttl))
+        flows.append((address(last, 1), address(first, 2), ttl))
+    return flows
+
+def timed(function):
+    """Ejecuta function() y retorna (resultado, segundos)"""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+def peak_memory(function):
+    """Ejecuta function() bajo tracemalloc y retorna el pico en MB"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+def check(result):
+    """Interrumpe el benchmark si una operación (success, message) falló"""
+    success, message = result
+    if not success:
+        raise RuntimeError(message)
+
+def measure_flows(network, flows, packets, ticks):
+    """
+    Mide el envío, el vaciado de una ráfaga y los ticks con tráfico constante
+    para unos flujos (origen, destino, ttl)
+
+    Returns:
+        dict: send_packets_per_second, drain_ticks, drain_seconds y ticks_per_second
+    """
+    result = {}
+    drain_network(network, flows)  # Calentamiento: tablas de rutas del camino
+
+    def send():
+        for index in range(packets):
+            source_ip, destination_ip, ttl = flows[index % len(flows)]
+            network.send_packet(source_ip, destination_ip, "bench", ttl)
+
+    _, elapsed = timed(send)
+    result["send_packets_per_second"] = packets / elapsed
+    result["drain_ticks"], result["drain_seconds"] = timed(lambda: drain_network(network))
+
+    def steady():
+        for _ in range(ticks):
+            for source_ip, destination_ip, ttl in flows:
+                network.send_packet(source_ip, destination_ip, "bench", ttl)
+            network.process_packets()
+
+    _, elapsed = timed(steady)
+    result["ticks_per_second"] = ticks / elapsed
+    drain_network(network)  # Los flujos siguientes empiezan con las colas vacías
+    return result
+
+def drain_network(network, flows=()):
+    """Envía un paquete por flujo y procesa ticks hasta vaciar las colas; retorna los ticks"""
+    for source_ip, destination_ip, ttl in flows:
+        network.send_packet(source_ip, destination_ip, "warmup", ttl)
+    count = 0
+    while network.active_interfaces:
+        network.process_packets()
+        count += 1
+    return count
+
+def run(device_count, packets=10000, ticks=50, memory=True, directory=None):
+    """
+    Ejecuta el benchmark para un tamaño de red
+
+    Returns:
+        dict: Medidas (segundos, operaciones por segundo y MB)
+    """
+    result = {"devices": device_count}
+    network, result["build_seconds"] = timed(lambda: build_chain(device_count))
+    result["connections"] = len(network.connections)
+
+    # Entre vecinos el vaciado dura un tick; los flujos lejanos miden el reenvío
+    result.update(measure_flows(network, traffic(device_count), packets, ticks))
+    flows = far_traffic(device_count)
+    result["far_flows"] = len(flows)
+    for key, value in measure_flows(network, flows, packets, ticks).items():
+        result["far_" + key] = value
+
+    config_file = os.path.join(directory, f"bench_{device_count}.json")
+    cli_file = os.path.join(directory, f"bench_{device_count}.txt")
+    config_manager = ConfigManager()
+    _, result["save_config_seconds"] = timed(lambda: check(config_manager.save_config(network, config_file)))
+    check(config_manager.export_cli_config(network, cli_file))
+    del network
+
+    loaded = Network()
+    _, result["load_config_seconds"] = timed(lambda: check(config_manager.load_config(loaded, config_file)))
+    assert len(loaded.devices) == device_count
+    del loaded
+
+    imported = Network()
+    _, result["import_cli_config_seconds"] = timed(
+        lambda: check(config_manager.import_cli_config(imported, cli_file)))
+    assert len(imported.connections) == result["connections"]
+    del imported
+
+    if memory:
+        result["build_peak_mb"] = peak_memory(lambda: build_chain(device_count))
+        result["load_peak_mb"] = peak_memory(
+            lambda: check(config_manager.load_config(Network(), config_file)))
+
+    os.remove(config_file)
+    os.remove(cli_file)
+    return result
+
+def commit():
+    """Commit del árbol medido, si se ejecuta dentro de un repositorio git"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    """Punto de entrada"""
+    arg_parser = argparse.ArgumentParser(description="Benchmark de escalabilidad del simulador")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                            help="Número de dispositivos de cada red")
+    arg_parser.add_argument("--packets", type=int, default=10000,
+                            help="Paquetes enviados en la medida de send_packet")
+    arg_parser.add_argument("--ticks", type=int, default=50,
+                            help="Ticks con tráfico constante")
+    arg_parser.add_argument("--no-memory", action="store_true",
+                            help="No medir el pico de memoria (ahorra una construcción y una carga)")
+    arg_parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, la salida estándar)")
+    args = arg_parser.parse_args()
+
+    report = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": []
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for device_count in args.sizes:
+            result = run(device_count, args.packets, args.ticks, not args.no_memory, directory)
+            report["results"].append(result)
+            print(f"{device_count} dispositivos: {result['ticks_per_second']:.0f} ticks/s, "
+                  f"lejanos {result['far_ticks_per_second']:.0f} ticks/s "
+                  f"({result['far_drain_ticks']} ticks de vaciado), "
+                  f"carga {result['load_config_seconds']:.3f} s", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,42 @@ Parser CLI para el Simulador de Red
 Maneja múltiples niveles de contexto y comandos estilo Cisco
 """
 
+import io
+import os
 import re
+import shlex
+import sys
+import time
 from abc import ABC, abstractmethod
+from ip_utils import parse_cidr, int_to_ip
+from config_manager import parse_link_options, read_packet_file
+from sharding import ShardedSimulator
+from metrics import MetricsServer
+from profiling import profile_call, DEFAULT_TOP
+import topology
+
+# Comandos permitidos por modo (cada modo incluye los del anterior); se
+# construyen una sola vez en lugar de en cada verificación de permisos
+USER_COMMANDS = frozenset({"enable", "show", "send", "tick", "process", "run", "run-script",
+                           "list_devices", "set_device_status", "help", "?", "exit"})
+PRIVILEGED_COMMANDS = USER_COMMANDS | {"configure", "connect", "disconnect", "packet-store",
+                                       "metrics", "profile", "save", "load", "generate",
+                                       "disable", "end"}
+CONFIG_COMMANDS = PRIVILEGED_COMMANDS | {"hostname", "interface", "history-size", "exit", "end"}
+INTERFACE_COMMANDS = CONFIG_COMMANDS | {"ip", "shutdown", "no", "exit"}
+
+MODE_PERMISSIONS = {
+    "user": USER_COMMANDS,
+    "privileged": PRIVILEGED_COMMANDS,
+    "config": CONFIG_COMMANDS,
+    "interface": INTERFACE_COMMANDS
+}
+
+# Comandos que modifican la configuración y se anexan al diario de cambios
+JOURNALED_COMMANDS = frozenset({"hostname", "interface", "ip", "shutdown", "no", "history-size",
+                                "connect", "disconnect", "set_device_status"})
+
+SCRIPT_FLUSH_LINES = 256  # Líneas de salida acumuladas antes de escribirlas
 
 class Command(ABC):
     """Clase abstracta para comandos (Patrón Comando)"""
@@ -66,16 +100,47 @@ class IpAddressCommand(Command):
         if len(args) < 1:
             return "Error: Se requiere una dirección IP", None
         
-        ip_address = args[0]
-        # Validación básica de IP
-        if not re.match(r'^\d+\.\d+\.\d+\.\d+$', ip_address):
+        # Validación básica de IP (admite notación CIDR a.b.c.d/len)
+        if not re.match(r'^\d+\.\d+\.\d+\.\d+(/\d+)?$', args[0]):
             return "Error: Formato de IP inválido", None
+        try:
+            ip_address, prefix_length = parse_cidr(args[0])
+        except ValueError as e:
+            return f"Error: {e}", None
         
         if network.current_device and hasattr(network.current_device, 'current_interface') and network.current_device.current_interface:
-            network.current_device.current_interface.set_ip_address(ip_address)
-            return f"Dirección IP {ip_address} configurada", None
+            interface = network.current_device.current_interface
+            owner_device, owner_interface = network.find_interface_by_ip(ip_address)
+            if owner_interface and owner_interface is not interface:
+                return (f"Error: La IP {ip_address} ya está asignada a "
+                        f"{owner_device.name} {owner_interface.name}"), None
+            interface.set_ip_address(ip_address, prefix_length)
+            return f"Dirección IP {interface.get_cidr()} configurada", None
         return "Error: No hay interfaz seleccionada", None
 
+class HistorySizeCommand(Command):
+    """Comando history-size - capacidad del historial (global o de un dispositivo)"""
+    def execute(self, network, args):
+        if len(args) < 1:
+            return "Error: Uso: history-size <n> [device]", None
+        
+        try:
+            history_size = int(args[0])
+        except ValueError:
+            return "Error: El tamaño debe ser un número entero", None
+        if history_size < 0:
+            return "Error: El tamaño no puede ser negativo", None
+        
+        if len(args) > 1:
+            device = network.get_device(args[1])
+            if not device:
+                return f"Error: Dispositivo '{args[1]}' no encontrado", None
+            device.set_history_size(history_size)
+            return f"Historial de {device.name} limitado a {history_size} paquetes", None
+        
+        network.set_history_size(history_size)
+        return f"Historial global limitado a {history_size} paquetes por dispositivo", None
+
 class ShutdownCommand(Command):
     """Comando shutdown - desactiva la interfaz"""
     def execute(self, network, args):
@@ -112,8 +177,8 @@ class EndCommand(Command):
 class ConnectCommand(Command):
     """Comando connect - conecta dos interfaces"""
     def execute(self, network, args):
-        if len(args) < 4:
-            return "Error: Se requieren 4 argumentos: <iface1> <device2> <iface2>", None
+        if len(args) < 3:
+            return "Error: Se requieren 3 argumentos: <iface1> <device2> <iface2>", None
         
         interface1_name, device2_name, interface2_name = args[0], args[1], args[2]
         device1_name = network.current_device.name if network.current_device else None
@@ -121,16 +186,21 @@ class ConnectCommand(Command):
         if not device1_name:
             return "Error: No hay dispositivo actual", None
         
+        try:
+            latency, bandwidth = parse_link_options(args[3:])
+        except ValueError as e:
+            return f"Error: {e}", None
+        
         success, message = network.connect_interfaces(
-            device1_name, interface1_name, device2_name, interface2_name
+            device1_name, interface1_name, device2_name, interface2_name, latency, bandwidth
         )
-        return message, None
+        return message if success else f"Error: {message}", None
 
 class DisconnectCommand(Command):
     """Comando disconnect - desconecta dos interfaces"""
     def execute(self, network, args):
-        if len(args) < 4:
-            return "Error: Se requieren 4 argumentos: <iface1> <device2> <iface2>", None
+        if len(args) < 3:
+            return "Error: Se requieren 3 argumentos: <iface1> <device2> <iface2>", None
         
         interface1_name, device2_name, interface2_name = args[0], args[1], args[2]
         device1_name = network.current_device.name if network.current_device else None
@@ -141,11 +211,14 @@ class DisconnectCommand(Command):
         success, message = network.disconnect_interfaces(
             device1_name, interface1_name, device2_name, interface2_name
         )
-        return message, None
+        return message if success else f"Error: {message}", None
 
 class SendCommand(Command):
     """Comando send - envía un paquete"""
     def execute(self, network, args):
+        if args and args[0].lower() == "batch":
+            return self._send_batch(network, args[1:])
+        
         if len(args) < 3:
             return "Error: Se requieren al menos 3 argumentos: <source_ip> <destination_ip> <message> [ttl]", None
         
@@ -157,14 +230,139 @@ class SendCommand(Command):
         success, message_result = network.send_packet(source_ip, destination_ip, message, ttl)
         return message_result, None
 
+    def _send_batch(self, network, args):
+        """Envía los paquetes de un archivo JSONL/CSV leyéndolo en streaming"""
+        if not args:
+            return "Error: Uso: send batch <archivo.jsonl|archivo.csv>", None
+        
+        filename = args[0]
+        if not os.path.exists(filename):
+            return f"Error: El archivo {filename} no existe", None
+        
+        start = time.perf_counter()
+        result = network.send_packets(read_packet_file(filename))
+        elapsed = time.perf_counter() - start
+        rate = result["accepted"] / elapsed if elapsed > 0 else 0
+        return (f"Lote enviado: {result['accepted']} aceptados, "
+                f"{result['rejected']} rechazados en {elapsed:.3f} s "
+                f"({rate:.0f} paquetes/s)"), None
+
 class TickCommand(Command):
     """Comando tick/process - procesa paquetes en la red"""
     def execute(self, network, args):
-        result = network.process_packets()
-        return (f"[Tick] Procesados: {result['processed']}, "
+        args = list(args)
+        ticks = 1
+        workers = None
+        try:
+            if args and args[0].lower() != "workers":
+                ticks = int(args.pop(0))
+            if args:
+                if len(args) != 2 or args[0].lower() != "workers":
+                    return "Error: Uso: tick [n] [workers <k>]", None
+                workers = int(args[1])
+        except ValueError:
+            return "Error: Se requiere un valor numérico", None
+        if ticks < 1 or (workers is not None and workers < 1):
+            return "Error: Los valores deben ser mayores que 0", None
+        
+        if workers is not None:
+            result = ShardedSimulator(network, workers).run(ticks)
+            lines = [f"[Tick x{ticks}, {result['shards']} procesos ({result['start_method']})] "
+                     f"Procesados: {result['processed']}, "
+                     f"Entregados: {result['delivered']}, "
+                     f"Descartados: {result['dropped']}"]
+            if network.metrics is not None:
+                lines.append("Advertencia: las métricas no registran los ticks en varios procesos")
+            if network.packet_store is not None:
+                lines.append("Advertencia: los ticks en varios procesos no usan el almacén "
+                             "vectorizado (packet-store); los paquetes avanzan por objetos")
+            return "\n".join(lines), None
+        
+        result = {"processed": 0, "delivered": 0, "dropped": 0}
+        for _ in range(ticks):
+            for key, value in network.process_packets().items():
+                result[key] += value
+        label = "[Tick]" if ticks == 1 else f"[Tick x{ticks}]"
+        return (f"{label} Procesados: {result['processed']}, "
                 f"Entregados: {result['delivered']}, "
                 f"Descartados: {result['dropped']}"), None
 
+class RunCommand(Command):
+    """Comando run - avanza la simulación por eventos discretos"""
+    def execute(self, network, args):
+        if len(args) < 2 or args[0].lower() not in ["until", "events"]:
+            return "Error: Uso: run until <tiempo_ms> | run events <n>", None
+        
+        try:
+            if args[0].lower() == "until":
+                result = network.events.run_until(float(args[1]))
+            else:
+                result = network.events.run_events(int(args[1]))
+        except ValueError:
+            return "Error: Se requiere un valor numérico", None
+        
+        return (f"[Eventos] Tiempo: {result['time']:.3f} ms, "
+                f"Eventos: {result['events']}, "
+                f"Entregados: {result['delivered']}, "
+                f"Descartados: {result['dropped']}, "
+                f"Pendientes: {result['pending']}"), None
+
+class PacketStoreCommand(Command):
+    """Comando packet-store - activa el procesamiento vectorizado de paquetes"""
+    def execute(self, network, args):
+        if len(args) < 1 or args[0].lower() not in ["on", "off"]:
+            return "Error: Uso: packet-store <on|off>", None
+        
+        success, message = network.enable_packet_store(args[0].lower() == "on")
+        return message if success else f"Error: {message}", None
+
+class MetricsCommand(Command):
+    """Comando metrics - instrumentación de ticks y exportación en formato Prometheus"""
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+        self.server = None
+    
+    def execute(self, network, args):
+        usage = "Error: Uso: metrics <on|off|show|reset|export <archivo>|serve <puerto>|serve stop>"
+        if not args:
+            return usage, None
+        action = args[0].lower()
+        
+        if action in ["on", "off"]:
+            success, message = network.enable_metrics(action == "on")
+            return message, None
+        if action == "serve" and len(args) > 1 and args[1].lower() == "stop":
+            if not self.server:
+                return "Error: El servidor de métricas no está activo", None
+            self.server.stop()
+            self.server = None
+            return "Servidor de métricas detenido", None
+        if network.metrics is None:
+            return "Error: La instrumentación está desactivada (metrics on)", None
+        
+        if action == "show":
+            return network.metrics.summary(), None
+        if action == "reset":
+            network.metrics.reset()
+            return "Métricas reiniciadas", None
+        if action == "export" and len(args) > 1:
+            try:
+                network.metrics.export(args[1], network)
+            except OSError as e:
+                return f"Error: {e}", None
+            return f"Métricas exportadas a {args[1]}", None
+        if action == "serve" and len(args) > 1:
+            if self.server:
+                host, port = self.server.address
+                return f"Error: El servidor de métricas ya escucha en {host}:{port}", None
+            try:
+                self.server = MetricsServer(network, port=int(args[1]), lock=self.config_manager.lock)
+            except (ValueError, OSError) as e:
+                return f"Error: {e}", None
+            host, port = self.server.address
+            return f"Métricas publicadas en http://{host}:{port}/metrics", None
+        return usage, None
+
 class ShowCommand(Command):
     """Comando show - muestra información"""
     def execute(self, network, args):
@@ -183,6 +381,8 @@ class ShowCommand(Command):
             return self._show_statistics(network)
         elif subcommand == "devices":
             return self._show_devices(network)
+        elif subcommand == "ip" and len(args) > 1 and args[1].lower() == "route":
+            return self._show_ip_route(network, args[2:])
         else:
             return f"Error: Subcomando '{subcommand}' no reconocido", None
     
@@ -194,7 +394,7 @@ class ShowCommand(Command):
         result = [f"Interfaces de {network.current_device.name}:"]
         for interface_name, interface in network.current_device.interfaces.items():
             status = "up" if interface.is_up() else "down"
-            ip = interface.ip_address or "sin IP"
+            ip = interface.get_cidr() or "sin IP"
             result.append(f"  {interface_name}: {ip} [{status}]")
         
         return "\n".join(result), None
@@ -243,12 +443,40 @@ class ShowCommand(Command):
             "Estadísticas de la red:",
             f"Total de dispositivos: {stats['total_devices']}",
             f"Dispositivos en línea: {stats['online_devices']}",
+            f"Dispositivos fuera de línea: {stats['offline_devices']}",
             f"Total de conexiones: {stats['total_connections']}",
             f"Paquetes enviados: {stats['total_packets_sent']}",
             f"Paquetes entregados: {stats['total_packets_delivered']}",
             f"Paquetes descartados: {stats['total_packets_dropped']}",
             f"Promedio de saltos por paquete: {stats['average_hops_per_packet']}"
         ]
+        if stats["devices_by_type"]:
+            result.append("Dispositivos por tipo:")
+            for device_type, counts in sorted(stats["devices_by_type"].items()):
+                result.append(f"  {device_type}: {counts['total']} ({counts['online']} en línea)")
+        return "\n".join(result), None
+    
+    def _show_ip_route(self, network, args):
+        """Muestra la tabla de reenvío de un dispositivo"""
+        device_name = args[0] if args else None
+        device = network.get_device(device_name) if device_name else network.current_device
+        
+        if not device:
+            return "Error: Dispositivo no encontrado", None
+        
+        fib = network.routing.get_fib(device.name)
+        if not fib.get_size():
+            return f"No hay rutas disponibles en {device.name}", None
+        
+        result = [f"Tabla de rutas de {device.name}:"]
+        for prefix, length, (out_interface, next_device, next_interface, hops) in fib.items():
+            network_cidr = f"{int_to_ip(prefix)}/{length}"
+            if next_device is None:
+                result.append(f"  C {network_cidr} conectada directamente, {out_interface}")
+            else:
+                result.append(f"  R {network_cidr} vía {next_device} ({next_interface}) "
+                             f"por {out_interface}, saltos: {hops}")
+        
         return "\n".join(result), None
     
     def _show_devices(self, network):
@@ -261,20 +489,96 @@ class ShowCommand(Command):
 
 class SaveCommand(Command):
     """Comando save - guarda configuración"""
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+    
     def execute(self, network, args):
+        if args and args[0] == "snapshot":
+            if len(args) < 2:
+                return "Error: Uso: save snapshot <filename>", None
+            success, message = self.config_manager.save_snapshot(network, args[1])
+            return message if success else f"Error: {message}", None
+        
         filename = args[0] if args else "running-config.txt"
-        success, message = network.config_manager.export_cli_config(network, filename)
+        success, message = self.config_manager.export_cli_config(network, filename)
         return message, None
 
 class LoadCommand(Command):
-    """Comando load - carga configuración"""
+    """Comando load - carga configuración (formato CLI, JSON o instantánea)"""
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+    
     def execute(self, network, args):
-        if len(args) < 2 or args[0] != "config":
-            return "Error: Uso: load config <filename>", None
+        if len(args) < 2 or args[0] not in ["config", "snapshot"]:
+            return "Error: Uso: load config <filename> [memory] | load snapshot <filename>", None
         
         filename = args[1]
-        success, message = network.config_manager.import_cli_config(network, filename)
-        return message, None
+        if args[0] == "snapshot":
+            success, message = self.config_manager.load_snapshot(network, filename)
+            return message if success else f"Error: {message}", None
+        
+        if filename.lower().endswith(".json"):
+            measure_memory = len(args) > 2 and args[2].lower() == "memory"
+            success, message = self.config_manager.load_config(network, filename, measure_memory)
+        else:
+            success, message = self.config_manager.import_cli_config(network, filename)
+        return message if success else f"Error: {message}", None
+
+class GenerateCommand(Command):
+    """Comando generate - construye una topología sintética o la escribe en disco"""
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+    
+    def execute(self, network, args):
+        kinds = "|".join(topology.GENERATORS)
+        if not args:
+            return f"Error: Uso: generate <{kinds}> <parámetros> [seed <s>] [output <file>]", None
+        
+        kind = args[0].lower()
+        params = []
+        seed = None
+        output = None
+        try:
+            index = 1
+            while index < len(args):
+                option = args[index].lower()
+                if option in ["seed", "output"] and index + 1 < len(args):
+                    if option == "seed":
+                        seed = int(args[index + 1])
+                    else:
+                        output = args[index + 1]
+                    index += 2
+                else:
+                    params.append(int(args[index]))
+                    index += 1
+        except ValueError:
+            return "Error: Se requiere un valor numérico", None
+        
+        start = time.perf_counter()
+        try:
+            generated = topology.generate(kind, params, seed)
+        except ValueError as e:
+            return f"Error: {e}", None
+        
+        if output:
+            try:
+                if output.lower().endswith(".json"):
+                    topology.write_config(generated, output)
+                else:
+                    topology.write_cli_config(generated, output)
+            except OSError as e:
+                return f"Error al escribir {output}: {e}", None
+            elapsed = time.perf_counter() - start
+            return f"{generated} escrita en {output} en {elapsed:.3f} s", None
+        
+        topology.build(generated, network)
+        elapsed = time.perf_counter() - start
+        result = f"{generated} construida en {elapsed:.3f} s"
+        # La red se ha reemplazado entera, como con load
+        success, message = self.config_manager.record_replacement(network)
+        if not success:
+            result += f"\nAdvertencia: {message}"
+        return result, None
 
 class SetDeviceStatusCommand(Command):
     """Comando set_device_status - cambia estado de dispositivo"""
@@ -317,35 +621,56 @@ Modo Usuario:
   show history [device]    - Muestra historial de paquetes
   show queue [device]      - Muestra colas de paquetes
   show statistics          - Muestra estadísticas de la red
+  show ip route [device]   - Muestra la tabla de rutas
   send <src_ip> <dst_ip> <msg> [ttl] - Envía un paquete
-  tick                     - Procesa paquetes en la red
+  send batch <file>        - Envía los paquetes de un archivo JSONL o CSV
+  tick [n] [workers <k>]   - Procesa n ticks (opcionalmente en k procesos,
+                             sin métricas ni packet-store)
+  run until <tiempo_ms>    - Simula por eventos hasta el tiempo indicado
+  run events <n>           - Simula los siguientes n eventos
   list_devices             - Lista todos los dispositivos
+  run-script <file> [quiet] - Ejecuta los comandos de un archivo
   set_device_status <dev> <online|offline> - Cambia estado de dispositivo
   help                     - Muestra esta ayuda
   exit                     - Sale del simulador
 
 Modo Privilegiado:
   configure terminal       - Entra al modo configuración
-  connect <if1> <dev2> <if2> - Conecta interfaces
+  connect <if1> <dev2> <if2> [latency <ms>] [bandwidth <bps>] - Conecta interfaces
   disconnect <if1> <dev2> <if2> - Desconecta interfaces
+  packet-store <on|off>    - Procesamiento vectorizado de paquetes (NumPy)
+  metrics <on|off|show|reset> - Instrumentación de ticks
+  metrics export <file>    - Exporta las métricas en formato Prometheus
+  metrics serve <port|stop> - Publica las métricas en http://127.0.0.1:<port>/metrics
+  profile tick <n> [workers <k>] [opciones] - Perfila n ticks con cProfile
+  profile command "<línea>" [opciones] - Perfila un comando CLI
+                             opciones: memory (tracemalloc), top <k>, output <file.pstats>
   disable                  - Regresa al modo usuario
   end                      - Regresa al modo privilegiado desde cualquier modo
 
 Modo Configuración:
   hostname <name>          - Cambia nombre del dispositivo
   interface <name>         - Entra al modo configuración de interfaz
+  history-size <n> [device] - Limita el historial (global o de un dispositivo)
   exit                     - Regresa al modo privilegiado
   end                      - Regresa al modo privilegiado
 
 Modo Configuración de Interfaz:
-  ip address <ip>          - Establece dirección IP
+  ip address <ip>[/<len>]  - Establece dirección IP (y prefijo de red)
   shutdown                 - Desactiva interfaz
   no shutdown              - Activa interfaz
   exit                     - Regresa al modo configuración
 
 Configuración:
   save running-config      - Guarda configuración en archivo
-  load config <filename>   - Carga configuración desde archivo
+  load config <filename> [memory] - Carga configuración (CLI o .json; memory mide el pico)
+  save snapshot <filename> - Guarda una instantánea binaria de la red
+  load snapshot <filename> - Carga una instantánea binaria
+  generate <tipo> <parámetros> [output <file>] - Reemplaza la red por una topología sintética
+                             (o la escribe en <file>: .json o formato CLI)
+                             tipos: line <n>, ring <n>, star <hosts>, mesh <n>,
+                             tree <profundidad> <grado>, fat-tree <k>,
+                             random <n> <enlaces> [seed <s>]
         """
         return help_text, None
 
@@ -358,6 +683,7 @@ class CLIParser:
         self.config_manager = config_manager
         self.mode = "user"  # user, privileged, config, interface
         self.commands = self._initialize_commands()
+        self.handlers = self._resolve_handlers()
     
     def _initialize_commands(self):
         """Inicializa todos los comandos disponibles"""
@@ -367,6 +693,7 @@ class CLIParser:
             "configure": self._configure_handler,
             "hostname": HostnameCommand(),
             "interface": InterfaceCommand(),
+            "history-size": HistorySizeCommand(),
             "ip": self._ip_handler,
             "shutdown": ShutdownCommand(),
             "no": self._no_handler,
@@ -377,15 +704,28 @@ class CLIParser:
             "send": SendCommand(),
             "tick": TickCommand(),
             "process": TickCommand(),  # Alias para tick
+            "run": RunCommand(),
+            "packet-store": PacketStoreCommand(),
+            "metrics": MetricsCommand(self.config_manager),
             "show": ShowCommand(),
-            "save": SaveCommand(),
-            "load": LoadCommand(),
+            "save": SaveCommand(self.config_manager),
+            "load": LoadCommand(self.config_manager),
+            "generate": GenerateCommand(self.config_manager),
             "set_device_status": SetDeviceStatusCommand(),
             "list_devices": ListDevicesCommand(),
+            "run-script": self._run_script_handler,
+            "profile": self._profile_handler,
             "help": HelpCommand(),
             "?": HelpCommand()
         }
     
+    def _resolve_handlers(self):
+        """Resuelve una sola vez la función que ejecuta cada comando"""
+        handlers = {}
+        for name, command in self.commands.items():
+            handlers[name] = command.execute if hasattr(command, 'execute') else command
+        return handlers
+    
     def _configure_handler(self, network, args):
         """Maneja el comando configure"""
         if args and args[0].lower() == "terminal":
@@ -421,48 +761,177 @@ class CLIParser:
         args = parts[1:] if len(parts) > 1 else []
         
         # Verificar si el comando existe
-        if command not in self.commands:
+        handler = self.handlers.get(command)
+        if handler is None:
             return f"Error: Comando '{command}' no reconocido. Escriba 'help' para ver comandos disponibles."
         
         # Verificar permisos según el modo
         if not self._check_permissions(command):
             return f"Error: Comando '{command}' no disponible en modo {self.mode}"
         
-        # Ejecutar el comando
-        try:
-            cmd_handler = self.commands[command]
-            if hasattr(cmd_handler, 'execute'):
-                result, new_mode = cmd_handler.execute(self.network, args)
-                if new_mode:
-                    self.mode = new_mode
-                return result
-            else:
-                # Para comandos especiales como configure, ip, no
-                result, new_mode = cmd_handler(self.network, args)
+        # El candado evita que el guardado en segundo plano copie la red a medio modificar
+        with self.config_manager.lock:
+            journal_context = None
+            if command in JOURNALED_COMMANDS:
+                journal_context = self._journal_context(command, args)
+            
+            # Ejecutar el comando (los especiales como configure, ip o no son métodos del parser)
+            try:
+                result, new_mode = handler(self.network, args)
                 if new_mode:
                     self.mode = new_mode
+            except Exception as e:
+                return f"Error al ejecutar comando: {e}"
+            
+            if journal_context and not (result and result.startswith("Error")):
+                self.config_manager.record_change(self.network, *journal_context, " ".join(parts))
+            elif command == "load" and not result.startswith("Error"):
+                # La red se ha reemplazado entera: el diario ya no sirve como delta
+                success, message = self.config_manager.record_replacement(self.network)
+                if not success:
+                    result += f"\nAdvertencia: {message}"
+            return result
+    
+    def _journal_context(self, command, args):
+        """
+        Retorna (dispositivo, interfaz) seleccionados antes de ejecutar un
+        comando que se va a registrar, o None si el comando no cambia nada
+        """
+        device = self.network.current_device
+        if not device:
+            return None, None
+        if command == "interface" and args and args[0] in device.interfaces:
+            return None  # Solo selecciona una interfaz existente
+        interface = getattr(device, "current_interface", None)
+        return device.name, interface.name if interface else None
+    
+    def run_script(self, filename, quiet=False, output=None):
+        """
+        Ejecuta los comandos de un archivo sin prompt ni espera de entrada
+        
+        Las líneas vacías y las que empiezan por '#' o '!' se ignoran. La
+        salida de los comandos se acumula y se escribe por bloques.
+        
+        Args:
+            filename (str): Archivo con un comando por línea
+            quiet (bool): Si es True no se escribe la salida de cada comando
+            output: Flujo de texto donde escribir la salida (por defecto stdout)
+        
+        Returns:
+            dict: Comandos ejecutados, comandos con error y segundos empleados
+        """
+        output = output if output is not None else sys.stdout
+        pending_output = []
+        commands = 0
+        errors = 0
+        
+        start = time.perf_counter()
+        with open(filename, "r", encoding="utf-8") as script:
+            for line in script:
+                command_line = line.strip()
+                if not command_line or command_line[0] in "#!":
+                    continue
+                
+                result = self.parse_command(command_line)
+                commands += 1
+                if result and result.startswith("Error"):
+                    errors += 1
+                if result and not quiet:
+                    pending_output.append(result)
+                    if len(pending_output) >= SCRIPT_FLUSH_LINES:
+                        output.write("\n".join(pending_output) + "\n")
+                        pending_output.clear()
+        
+        if pending_output:
+            output.write("\n".join(pending_output) + "\n")
+        return {"commands": commands, "errors": errors,
+                "seconds": time.perf_counter() - start}
+    
+    @staticmethod
+    def format_script_summary(filename, summary):
+        """Resumen de la ejecución de un script con su velocidad en comandos/s"""
+        rate = summary["commands"] / summary["seconds"] if summary["seconds"] > 0 else 0
+        return (f"Script {filename}: {summary['commands']} comandos "
+                f"({summary['errors']} con error) en {summary['seconds']:.3f} s "
+                f"({rate:.0f} comandos/s)")
+    
+    def _run_script_handler(self, network, args):
+        """Maneja el comando run-script"""
+        if not args:
+            return "Error: Uso: run-script <archivo> [quiet]", None
+        filename = args[0]
+        if not os.path.exists(filename):
+            return f"Error: El archivo {filename} no existe", None
+        quiet = len(args) > 1 and args[1].lower() == "quiet"
+        
+        output = io.StringIO()
+        summary = self.run_script(filename, quiet, output)
+        return output.getvalue() + self.format_script_summary(filename, summary), None
+    
+    def _profile_handler(self, network, args):
+        """Maneja el comando profile: ejecuta ticks o un comando bajo cProfile"""
+        usage = ('Error: Uso: profile tick <n> [workers <k>] | profile command "<línea>" '
+                 '[memory] [top <k>] [output <archivo.pstats>]')
+        try:
+            # parse_command separa por espacios: se recuperan las comillas de la línea
+            args = shlex.split(" ".join(args))
+        except ValueError as e:
+            return f"Error: {e}", None
+        if len(args) < 2 or args[0].lower() not in ["tick", "command"]:
+            return usage, None
+        
+        target, options = args[1], args[2:]
+        memory = False
+        top = DEFAULT_TOP
+        output = None
+        workers = None
+        try:
+            while options:
+                option = options.pop(0).lower()
+                if option == "memory":
+                    memory = True
+                elif option == "top" and options:
+                    top = int(options.pop(0))
+                elif option == "output" and options:
+                    output = options.pop(0)
+                elif option == "workers" and options and args[0].lower() == "tick":
+                    workers = int(options.pop(0))
+                else:
+                    return usage, None
+        except ValueError:
+            return "Error: Se requiere un valor numérico", None
+        if top < 1 or (workers is not None and workers < 1):
+            return "Error: Los valores deben ser mayores que 0", None
+        
+        if args[0].lower() == "tick":
+            try:
+                ticks = int(target)
+            except ValueError:
+                return "Error: Se requiere un valor numérico", None
+            if ticks < 1:
+                return "Error: Los valores deben ser mayores que 0", None
+            tick_args = [str(ticks)] if workers is None else [str(ticks), "workers", str(workers)]
+            
+            def work():
+                # El mismo código que el comando tick (incluido el reparto en procesos)
+                result, _ = self.commands["tick"].execute(network, tick_args)
                 return result
-        except Exception as e:
-            return f"Error al ejecutar comando: {e}"
+        else:
+            if not target.strip() or target.split()[0].lower() == "profile":
+                return "Error: Se requiere un comando distinto de profile", None
+            
+            def work():
+                return self.parse_command(target)
+        
+        try:
+            result, report = profile_call(work, top, memory, output)
+        except (ValueError, OSError) as e:  # p. ej. otro perfilador activo
+            return f"Error: {e}", None
+        return f"{result}\n{report}" if result else report, None
     
     def _check_permissions(self, command):
         """Verifica si un comando está permitido en el modo actual"""
-        user_commands = {"enable", "show", "send", "tick", "process", "list_devices", 
-                        "set_device_status", "help", "?", "exit"}
-        privileged_commands = {"configure", "connect", "disconnect", "disable", "end"}
-        config_commands = {"hostname", "interface", "exit", "end"}
-        interface_commands = {"ip", "shutdown", "no", "exit"}
-        
-        if self.mode == "user":
-            return command in user_commands
-        elif self.mode == "privileged":
-            return command in user_commands or command in privileged_commands
-        elif self.mode == "config":
-            return command in user_commands or command in privileged_commands or command in config_commands
-        elif self.mode == "interface":
-            return command in user_commands or command in privileged_commands or command in config_commands or command in interface_commands
-        
-        return False
+        return command in MODE_PERMISSIONS.get(self.mode, ())
     
     def get_prompt(self):
         """Retorna el prompt actual según el modo"""
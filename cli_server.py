@@ -0,0 +1,194 @@
+"""
+Servidor CLI concurrente para el Simulador de Red
+Atiende varias sesiones por TCP con asyncio sobre una misma red: cada
+conexión tiene su propio CLIParser y las modificaciones se serializan
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from cli_parser import CLIParser
+
+# Comandos que no modifican la red (solo la consultan o cambian el modo de
+# la sesión): se ejecutan directamente en el bucle de eventos si el candado
+# de la red está libre
+READ_ONLY_COMMANDS = {"show", "list_devices", "help", "?", "enable", "disable",
+                      "configure", "exit", "end"}
+
+class CLISession:
+    """
+    Sesión de un operador: su parser (modo actual) y los nombres del
+    dispositivo e interfaz seleccionados, que se resuelven en la red
+    compartida solo mientras se ejecuta uno de sus comandos
+
+    Se guardan nombres y no objetos: si otra sesión reemplaza la red (load,
+    generate) o elimina el dispositivo, un objeto guardado quedaría fuera de
+    la red y los comandos de esta sesión lo modificarían sin efecto.
+    """
+
+    def __init__(self, network, config_manager):
+        self.network = network
+        self.lock = config_manager.lock
+        self.parser = CLIParser(network, config_manager)
+        self.current_device = network.current_device.name if network.current_device else None
+        self.current_interface = None
+        self.prompt = self.parser.get_prompt()  # Se actualiza tras cada comando
+        self.commands_executed = 0
+
+    def _restore_context(self):
+        """
+        Selecciona en la red el dispositivo e interfaz de la sesión; si el
+        dispositivo ya no existe, la sesión vuelve al modo privilegiado sobre
+        el dispositivo seleccionado en la red (y si solo falta la interfaz,
+        al modo configuración)
+        """
+        network = self.network
+        parser = self.parser
+        device = network.get_device(self.current_device) if self.current_device else None
+        interface = None
+        if device and self.current_interface:
+            interface = device.get_interface(self.current_interface)
+        if self.current_device and device is None:
+            if parser.mode in ["config", "interface"]:
+                parser.mode = "privileged"
+            device = network.current_device
+            self.current_interface = None
+        elif self.current_interface and interface is None and parser.mode == "interface":
+            parser.mode = "config"
+        network.current_device = device
+        if device:
+            device.current_interface = interface
+
+    def run(self, command_line):
+        """
+        Ejecuta un comando con el contexto de esta sesión
+
+        El contexto se selecciona y se recoge con el candado de la red
+        tomado, ya que la sesión puede ejecutarse en un hilo a la vez que otra.
+        """
+        network = self.network
+        with self.lock:
+            self._restore_context()
+            try:
+                return self.parser.parse_command(command_line)
+            finally:
+                device = network.current_device
+                interface = getattr(device, "current_interface", None) if device else None
+                self.current_device = device.name if device else None
+                self.current_interface = interface.name if interface else None
+                self.prompt = self.parser.get_prompt()
+                self.commands_executed += 1
+
+class CLIServer:
+    """
+    Servidor de sesiones CLI sobre una red compartida
+
+    Las consultas se ejecutan en el propio bucle de eventos, sin esperar
+    unas a otras; solo esperan a que termine la modificación en curso. Si
+    el candado de la red lo tiene otro hilo (guardado automático,
+    exportación de métricas), la consulta espera en un hilo aparte y no
+    bloquea el bucle. Las modificaciones toman un candado exclusivo y se
+    ejecutan en un hilo aparte, de modo que un tick largo no bloquea la
+    lectura de las demás conexiones.
+    """
+
+    def __init__(self, network, config_manager):
+        """
+        Inicializa el servidor
+
+        Args:
+            network: Instancia de Network compartida por todas las sesiones
+            config_manager: Instancia de ConfigManager
+        """
+        self.network = network
+        self.config_manager = config_manager
+        self.write_lock = asyncio.Lock()
+        self.idle = asyncio.Event()  # Activo mientras no hay una modificación en curso
+        self.idle.set()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.sessions = set()
+
+    async def execute(self, session, command_line):
+        """Ejecuta un comando de una sesión respetando la exclusión de escrituras"""
+        command = command_line.split()[0].lower()
+        if command in READ_ONLY_COMMANDS:
+            await self.idle.wait()
+            lock = self.config_manager.lock
+            if lock.acquire(blocking=False):
+                try:
+                    return session.run(command_line)
+                finally:
+                    lock.release()
+            return await asyncio.to_thread(session.run, command_line)
+
+        async with self.write_lock:
+            self.idle.clear()
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, session.run, command_line)
+            finally:
+                self.idle.set()
+
+    async def handle_client(self, reader, writer):
+        """Atiende una conexión hasta que el cliente sale o se desconecta"""
+        await self.idle.wait()
+        session = CLISession(self.network, self.config_manager)
+        self.sessions.add(session)
+        try:
+            writer.write(("=== Simulador de Red de Dispositivos (LAN) ===\n"
+                          "Escriba 'help' para ver comandos disponibles\n"
+                          "Escriba 'quit' para cerrar la sesión\n").encode())
+            writer.write(session.prompt.encode())
+            await writer.drain()
+
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command_line = line.decode(errors="replace").strip()
+                if command_line:
+                    lowered = command_line.lower()
+                    if lowered == "quit" or (lowered == "exit" and session.parser.mode == "user"):
+                        writer.write("¡Hasta luego!\n".encode())
+                        break
+                    result = await self.execute(session, command_line)
+                    if result:
+                        writer.write(f"{result}\n".encode())
+                writer.write(session.prompt.encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    async def start(self, host, port):
+        """Abre el socket de escucha y retorna el servidor de asyncio"""
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    def get_session_count(self):
+        """Retorna el número de sesiones abiertas"""
+        return len(self.sessions)
+
+def parse_address(address):
+    """
+    Separa una dirección 'host:puerto'
+
+    Returns:
+        tuple: (host, puerto)
+    """
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Dirección inválida: {address} (se espera host:puerto)")
+    return host, int(port)
+
+def run_server(network, config_manager, host, port):
+    """Ejecuta el servidor hasta que se interrumpa"""
+    async def serve():
+        cli_server = CLIServer(network, config_manager)
+        server = await cli_server.start(host, port)
+        address = server.sockets[0].getsockname()
+        print(f"Servidor CLI escuchando en {address[0]}:{address[1]}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
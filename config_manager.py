@@ -3,16 +3,119 @@ Gestor de Configuración para el Simulador de Red
 Maneja la persistencia de configuraciones en formato JSON
 """
 
+import csv
 import json
+import math
 import os
-from device import Device, Interface
+import threading
+import time
+import tracemalloc
+from device import Device
+from network import Network
+from config_stream import iter_config, IJSON_AVAILABLE, STREAMED_OBJECTS, STREAMED_ARRAYS
+from journal import ChangeJournal
+from ip_utils import parse_cidr
+import snapshot
+
+IMPORT_ERROR_LIMIT = 20  # Errores por línea que se muestran al importar configuración CLI
+
+def _temporary_file(filename):
+    """
+    Crea un archivo temporal junto a filename para escribirlo y renombrarlo después
+    
+    Se crea con permisos 0666 para que la umask vigente se aplique como a
+    cualquier archivo nuevo (mkstemp lo dejaría en 0600).
+    """
+    prefix = os.path.join(os.path.dirname(os.path.abspath(filename)), os.path.basename(filename))
+    while True:
+        temporary = f"{prefix}.{os.urandom(4).hex()}.tmp"
+        try:
+            fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            continue
+        os.close(fd)
+        return temporary
+
+def _sync_file(filename):
+    """Fuerza a disco el contenido de un archivo ya escrito"""
+    fd = os.open(filename, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def parse_link_options(options):
+    """
+    Interpreta las opciones de enlace 'latency <ms>' y 'bandwidth <bps>'
+    
+    Returns:
+        tuple: (latencia, ancho_de_banda); None en las no indicadas
+    
+    Raises:
+        ValueError: Si falta un valor o no es un número positivo y finito
+    """
+    if len(options) % 2:
+        raise ValueError(f"Falta el valor de la opción de enlace {options[-1]}")
+    values = {"latency": None, "bandwidth": None}
+    for index in range(0, len(options), 2):
+        key = options[index].lower()
+        if key not in values:
+            raise ValueError(f"Opción de enlace desconocida: {options[index]}")
+        value = float(options[index + 1])
+        if not math.isfinite(value) or value <= 0:
+            raise ValueError(f"El valor de {key} debe ser un número positivo: {options[index + 1]}")
+        values[key] = value
+    return values["latency"], values["bandwidth"]
+
+def read_packet_file(filename):
+    """
+    Lee un archivo de tráfico línea a línea sin cargarlo entero en memoria
+    
+    Admite JSONL (un objeto con source_ip, destination_ip, message y ttl
+    opcional, o una lista con esos valores por línea) y CSV
+    (source_ip,destination_ip,message[,ttl], con cabecera opcional).
+    Las líneas mal formadas se retornan como None.
+    
+    Yields:
+        tuple: (source_ip, destination_ip, message, ttl) o None
+    """
+    with open(filename, 'r', encoding='utf-8', newline='') as f:
+        if filename.lower().endswith((".jsonl", ".json")):
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    if isinstance(entry, dict):
+                        entry = [entry["source_ip"], entry["destination_ip"],
+                                 entry.get("message", ""), entry.get("ttl", 10)]
+                    yield (entry[0], entry[1], entry[2], int(entry[3]) if len(entry) > 3 else 10)
+                except (ValueError, KeyError, IndexError, TypeError):
+                    yield None
+        else:
+            for row in csv.reader(f):
+                if not row or row[0].startswith('#') or row[0] == "source_ip":
+                    continue
+                try:
+                    yield (row[0], row[1], row[2], int(row[3]) if len(row) > 3 else 10)
+                except (ValueError, IndexError):
+                    yield None
 
 class ConfigManager:
     """Gestiona la carga y guardado de configuraciones de red"""
     
     def __init__(self):
         """Inicializa el gestor de configuración"""
-        pass
+        self.journal = None  # Diario de cambios activo (ver open_journal)
+        self.checkpoint_file = None  # Checkpoint completo al que se aplica el diario
+        # Serializa los comandos con la copia de la red que hace el guardado en segundo plano
+        self.lock = threading.RLock()
+        self.changes = 0  # Cambios de configuración registrados
+        self.saved_changes = 0  # Cambios incluidos en el último checkpoint
+        self.checkpoint_generation = 0  # Checkpoints escritos (para descartar copias antiguas)
+        # Contadores de tráfico incluidos en el último checkpoint (el diario no los registra)
+        self.saved_statistics = None
     
     def save_config(self, network, filename="network_config.json"):
         """
@@ -22,35 +125,254 @@ class ConfigManager:
             network: Instancia de Network a guardar
             filename (str): Nombre del archivo de configuración
         """
+        temporary = None
         try:
-            config_data = network.to_dict()
+            # La copia se toma bajo el candado; la escritura, que es lo lento, no lo necesita
+            with self.lock:
+                config_data = network.to_dict()
+                state = self._save_state(network)
             
-            with open(filename, 'w', encoding='utf-8') as f:
+            temporary = _temporary_file(filename)
+            with open(temporary, 'w', encoding='utf-8') as f:
                 json.dump(config_data, f, indent=2, ensure_ascii=False)
+            self._replace_file(temporary, filename, state)
             
             return True, f"Configuración guardada exitosamente en {filename}"
         except Exception as e:
             return False, f"Error al guardar configuración: {e}"
+        finally:
+            if temporary and os.path.exists(temporary):
+                os.remove(temporary)
     
-    def load_config(self, network, filename="network_config.json"):
+    def load_config(self, network, filename="network_config.json", measure_memory=False,
+                    use_ijson=False):
         """
         Carga una configuración desde un archivo JSON
         
+        El archivo se recorre de forma incremental (ver config_stream): cada
+        dispositivo se construye en cuanto se lee, sin mantener el documento
+        completo en memoria.
+        
         Args:
             network: Instancia de Network donde cargar la configuración
             filename (str): Nombre del archivo de configuración
+            measure_memory (bool): Medir el pico de memoria con tracemalloc
+                (ralentiza la carga)
+            use_ijson (bool): Leer con ijson (si está instalado) en lugar del
+                lector por bloques
         """
         try:
             if not os.path.exists(filename):
                 return False, f"El archivo {filename} no existe"
             
-            with open(filename, 'r', encoding='utf-8') as f:
-                config_data = json.load(f)
+            if measure_memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            try:
+                counts = self._load_items(network, iter_config(filename, use_ijson))
+                elapsed = time.perf_counter() - start
+                peak_memory = tracemalloc.get_traced_memory()[1] if measure_memory else None
+            finally:
+                if measure_memory:
+                    tracemalloc.stop()
             
-            return self.load_from_dict(network, config_data)
+            message = (f"Configuración cargada desde {filename}: {counts['devices']} dispositivos, "
+                       f"{counts['connections']} conexiones en {elapsed:.3f} s "
+                       f"(lector {'ijson' if use_ijson and IJSON_AVAILABLE else 'por bloques'})")
+            if peak_memory is not None:
+                message += f", pico de memoria {peak_memory / (1024 * 1024):.1f} MB"
+            return True, message
         except Exception as e:
             return False, f"Error al cargar configuración: {e}"
     
+    def save_snapshot(self, network, filename="network_snapshot.bin"):
+        """
+        Guarda la red en una instantánea binaria (ver snapshot)
+        
+        Args:
+            network: Instancia de Network a guardar
+            filename (str): Nombre del archivo de la instantánea
+        """
+        temporary = None
+        try:
+            start = time.perf_counter()
+            temporary = _temporary_file(filename)
+            # La instantánea se construye recorriendo la red: todo bajo el candado
+            with self.lock:
+                state = self._save_state(network)
+                size = snapshot.save_snapshot(network, temporary)
+            self._replace_file(temporary, filename, state)
+            elapsed = time.perf_counter() - start
+            return True, f"Instantánea guardada en {filename} ({size} bytes en {elapsed:.3f} s)"
+        except Exception as e:
+            return False, f"Error al guardar instantánea: {e}"
+        finally:
+            if temporary and os.path.exists(temporary):
+                os.remove(temporary)
+    
+    def load_snapshot(self, network, filename="network_snapshot.bin"):
+        """
+        Carga la red desde una instantánea binaria (ver snapshot)
+        
+        Args:
+            network: Instancia de Network donde cargar la instantánea
+            filename (str): Nombre del archivo de la instantánea
+        """
+        try:
+            if not os.path.exists(filename):
+                return False, f"El archivo {filename} no existe"
+            
+            start = time.perf_counter()
+            counts = snapshot.load_snapshot(network, filename)
+            elapsed = time.perf_counter() - start
+            return True, (f"Instantánea cargada desde {filename}: {counts['devices']} dispositivos, "
+                          f"{counts['interfaces']} interfaces, {counts['connections']} conexiones "
+                          f"en {elapsed:.3f} s")
+        except Exception as e:
+            return False, f"Error al cargar instantánea: {e}"
+    
+    def open_journal(self, parser, filename, checkpoint_file):
+        """
+        Reaplica el diario de cambios y lo deja activo para los siguientes comandos
+        
+        A partir de aquí los comandos que modifican la configuración se
+        anexan al diario en lugar de reescribir el checkpoint completo, que
+        solo se regenera al compactar.
+        
+        Args:
+            parser: CLIParser sobre la red ya cargada desde el checkpoint
+            filename (str): Archivo del diario
+            checkpoint_file (str): Checkpoint (JSON o instantánea .bin)
+        """
+        self.checkpoint_file = checkpoint_file
+        # Los contadores son los del checkpoint: el diario solo reaplica configuración
+        self.saved_statistics = dict(parser.network.global_statistics)
+        try:
+            journal = ChangeJournal(filename)
+            applied, errors = journal.replay(parser, checkpoint_file)
+            self.journal = journal
+            
+            message = f"Diario {filename}: {applied} cambios reaplicados ({errors} con error)"
+            if not os.path.exists(checkpoint_file) or journal.needs_compaction():
+                success, checkpoint_message = self.checkpoint(parser.network)
+                message += f"; {checkpoint_message}"
+                if not success:
+                    return False, message
+            elif applied == 0:
+                journal.reset(checkpoint_file)
+            return True, message
+        except Exception as e:
+            self.journal = None
+            return False, f"Error al abrir el diario: {e}"
+    
+    def record_change(self, network, device_name, interface_name, command_line):
+        """
+        Marca la red como modificada y anexa el comando al diario (si hay
+        uno abierto), compactándolo si ha crecido demasiado
+        
+        Returns:
+            bool: True si el cambio quedó registrado en el diario
+        """
+        with self.lock:
+            self.changes += 1
+            if not self.journal:
+                return False
+            self.journal.append(device_name, interface_name, command_line)
+            if self.journal.needs_compaction():
+                success, message = self.checkpoint(network)
+                if not success:
+                    print(f"Advertencia: {message}")
+            return True
+    
+    def record_replacement(self, network):
+        """
+        Marca la red como reemplazada entera (load, generate): el diario ya
+        no sirve como delta, así que si hay uno abierto se escribe un
+        checkpoint completo
+        
+        Returns:
+            tuple: (éxito, mensaje)
+        """
+        with self.lock:
+            self.changes += 1
+            if not self.journal:
+                return True, "Red reemplazada"
+            return self.checkpoint(network)
+    
+    def is_dirty(self, network=None):
+        """
+        Indica si hay cambios que el último checkpoint no incluye: de
+        configuración y, si se indica la red, también de sus contadores de
+        tráfico (ver statistics_changed)
+        """
+        if self.changes != self.saved_changes:
+            return True
+        return network is not None and self.statistics_changed(network)
+    
+    def statistics_changed(self, network):
+        """
+        Indica si los contadores de tráfico (globales y, con ellos, los de
+        cada dispositivo) cambiaron desde el último checkpoint
+        
+        Todo paquete enviado, entregado o descartado pasa por
+        global_statistics, así que basta con compararlas.
+        """
+        with self.lock:
+            return (self.saved_statistics is not None and
+                    network.global_statistics != self.saved_statistics)
+    
+    def checkpoint(self, network):
+        """
+        Compacta el diario: escribe un checkpoint completo y lo vacía
+        
+        Args:
+            network: Instancia de Network a guardar
+        """
+        if self.checkpoint_file.endswith(".bin"):
+            return self.save_snapshot(network, self.checkpoint_file)
+        return self.save_config(network, self.checkpoint_file)
+    
+    def _save_state(self, network):
+        """Estado de los cambios al copiar la red para guardarla (con self.lock tomado)"""
+        return (self.changes, self.checkpoint_generation, self.journal.mark() if self.journal else 0,
+                dict(network.global_statistics))
+    
+    def _replace_file(self, temporary, filename, state):
+        """
+        Sustituye filename por el temporal ya escrito con os.replace, de modo
+        que un fallo a mitad de escritura nunca deja el archivo corrupto
+        
+        Si filename es el checkpoint del diario, el diario se vacía hasta el
+        momento de la copia. Si entretanto otro guardado más reciente ya
+        reemplazó el checkpoint, esta copia (más antigua) se descarta.
+        """
+        _sync_file(temporary)
+        with self.lock:
+            if not (self.checkpoint_file and
+                    os.path.abspath(filename) == os.path.abspath(self.checkpoint_file)):
+                os.replace(temporary, filename)
+                return
+            changes, generation, mark, statistics = state
+            if generation != self.checkpoint_generation:
+                os.remove(temporary)
+                return
+            os.replace(temporary, filename)
+            self.checkpoint_generation += 1
+            self.saved_changes = changes
+            self.saved_statistics = statistics
+            if self.journal:
+                self.journal.reset(self.checkpoint_file, mark)
+    
+    def close_journal(self):
+        """Cierra el diario; los cambios ya están en disco y no hay que reescribir nada"""
+        with self.lock:
+            if not self.journal:
+                return False, "No hay diario abierto"
+            records = self.journal.records
+            self.journal.close()
+            self.journal = None
+        return True, f"{records} cambios pendientes de compactar en {self.checkpoint_file}"
+    
     def load_from_dict(self, network, config_data):
         """
         Carga una configuración desde un diccionario
@@ -60,64 +382,122 @@ class ConfigManager:
             config_data (dict): Datos de configuración
         """
         try:
-            # Limpiar la red actual
-            network.devices.clear()
-            network.connections.clear()
-            network.current_device = None
-            
-            # Cargar dispositivos
-            if "devices" in config_data:
-                for device_name, device_data in config_data["devices"].items():
-                    # Crear dispositivo
-                    device = Device(device_name, device_data.get("type", "host"))
-                    device.set_status(device_data.get("status", "online"))
-                    
-                    # Cargar interfaces
-                    if "interfaces" in device_data:
-                        for interface_name, interface_data in device_data["interfaces"].items():
-                            interface = Interface(interface_name, interface_data.get("ip_address"))
-                            
-                            # Establecer estado de la interfaz
-                            if interface_data.get("status") == "up":
-                                interface.no_shutdown()
-                            else:
-                                interface.shutdown()
-                            
-                            device.interfaces[interface_name] = interface
-                    
-                    # Cargar estadísticas
-                    device.packets_processed = device_data.get("packets_processed", 0)
-                    device.packets_dropped = device_data.get("packets_dropped", 0)
-                    
-                    network.devices[device_name] = device
-            
-            # Cargar conexiones
-            if "connections" in config_data:
-                for connection in config_data["connections"]:
-                    if len(connection) == 4:
-                        device1_name, interface1_name, device2_name, interface2_name = connection
-                        success, message = network.connect_interfaces(
-                            device1_name, interface1_name, device2_name, interface2_name
-                        )
-                        if not success:
-                            print(f"Advertencia: {message}")
-            
-            # Establecer dispositivo actual
-            if "current_device" in config_data and config_data["current_device"]:
-                network.set_current_device(config_data["current_device"])
-            elif network.devices:
-                # Si no hay dispositivo actual, usar el primero
-                first_device = list(network.devices.values())[0]
-                network.current_device = first_device
-            
-            # Cargar estadísticas globales
-            if "global_statistics" in config_data:
-                network.global_statistics.update(config_data["global_statistics"])
-            
+            self._load_items(network, self._iter_dict(config_data))
             return True, "Configuración cargada exitosamente"
         except Exception as e:
             return False, f"Error al cargar configuración desde diccionario: {e}"
     
+    @staticmethod
+    def _iter_dict(config_data):
+        """Recorre un diccionario de configuración con la forma de iter_config"""
+        for section, value in config_data.items():
+            if section in STREAMED_OBJECTS and isinstance(value, dict):
+                for item in value.items():
+                    yield section, item
+            elif section in STREAMED_ARRAYS and isinstance(value, list):
+                for item in value:
+                    yield section, item
+            else:
+                yield section, value
+    
+    def _load_items(self, network, items):
+        """
+        Construye la red a partir de los elementos (sección, elemento) de una
+        configuración, a medida que se leen
+        
+        Las conexiones y enlaces que nombran dispositivos aún no leídos se
+        reintentan al final. La red se construye aparte y solo reemplaza a la
+        actual cuando se ha leído la configuración completa: un archivo
+        truncado o mal formado deja la red como estaba.
+        
+        Returns:
+            dict: Número de dispositivos y conexiones cargados
+        """
+        live_network = network
+        network = Network()
+        # Sin global_statistics en el archivo se conservan los contadores actuales
+        network.global_statistics.update(live_network.global_statistics)
+        
+        counts = {"devices": 0, "connections": 0}
+        pending_connections = []
+        pending_links = []
+        current_device = None
+        
+        for section, item in items:
+            if section == "devices":
+                if isinstance(item, tuple):
+                    network.register_device(self._build_device(*item))
+                    counts["devices"] += 1
+            elif section == "connections":
+                if len(item) == 4:
+                    if network.connect_interfaces(*item)[0]:
+                        counts["connections"] += 1
+                    else:
+                        pending_connections.append(item)
+            elif section == "link_properties":
+                if len(item) == 6 and not network.set_link_properties(*item)[0]:
+                    pending_links.append(item)
+            elif section == "history_size":
+                network.set_history_size(item)
+            elif section == "current_device":
+                current_device = item
+            elif section == "global_statistics":
+                network.global_statistics.update(item)
+        
+        self._warn_duplicate_ips(network)
+        
+        for connection in pending_connections:
+            success, message = network.connect_interfaces(*connection)
+            if success:
+                counts["connections"] += 1
+            else:
+                print(f"Advertencia: {message}")
+        
+        # Cargar latencia y ancho de banda de los enlaces
+        for link in pending_links:
+            success, message = network.set_link_properties(*link)
+            if not success:
+                print(f"Advertencia: {message}")
+        
+        # Establecer dispositivo actual
+        if current_device:
+            network.set_current_device(current_device)
+        elif network.devices:
+            # Si no hay dispositivo actual, usar el primero
+            first_device = next(iter(network.devices.values()))
+            network.current_device = first_device
+        
+        live_network.replace_contents(network)
+        return counts
+    
+    def _build_device(self, device_name, device_data):
+        """Crea un dispositivo con sus interfaces a partir de sus datos"""
+        device = Device(device_name, device_data.get("type", "host"))
+        device.set_status(device_data.get("status", "online"))
+        
+        # Cargar interfaces
+        for interface_name, interface_data in device_data.get("interfaces", {}).items():
+            device.add_interface(interface_name, interface_data.get("ip_address"),
+                                 interface_data.get("prefix_length"))
+            interface = device.get_interface(interface_name)
+            
+            # Establecer estado de la interfaz
+            if interface_data.get("status") == "up":
+                interface.no_shutdown()
+            else:
+                interface.shutdown()
+        
+        # Cargar estadísticas
+        device.packets_processed = device_data.get("packets_processed", 0)
+        device.packets_dropped = device_data.get("packets_dropped", 0)
+        device.history_size = device_data.get("history_size")
+        return device
+    
+    def _warn_duplicate_ips(self, network):
+        """Informa de las IPs asignadas a más de una interfaz"""
+        for ip_address, owners in network.get_duplicate_ips().items():
+            print(f"Advertencia: IP {ip_address} duplicada en {', '.join(owners)}")
+    
     def export_cli_config(self, network, filename="running-config.txt"):
         """
         Exporta la configuración en formato CLI (estilo Cisco)
@@ -137,7 +517,7 @@ class ConfigManager:
                     cli_lines.append(f"interface {interface_name}")
                     
                     if interface.ip_address:
-                        cli_lines.append(f"  ip address {interface.ip_address}")
+                        cli_lines.append(f"  ip address {interface.get_cidr()}")
                     
                     if interface.is_up():
                         cli_lines.append("  no shutdown")
@@ -152,7 +532,13 @@ class ConfigManager:
             cli_lines.append("# Conexiones entre dispositivos")
             for connection in network.connections:
                 device1, interface1, device2, interface2 = connection
-                cli_lines.append(f"connect {device1} {interface1} {device2} {interface2}")
+                line = f"connect {device1} {interface1} {device2} {interface2}"
+                if connection in network.link_properties:
+                    latency, bandwidth = network.link_properties[connection]
+                    line += f" latency {latency}"
+                    if bandwidth:
+                        line += f" bandwidth {bandwidth}"
+                cli_lines.append(line)
             
             # Guardar archivo
             with open(filename, 'w', encoding='utf-8') as f:
@@ -166,6 +552,12 @@ class ConfigManager:
         """
         Importa configuración desde formato CLI
         
+        La importación es masiva: primero se crean dispositivos e interfaces
+        y se reúnen las conexiones, y al final se conectan todas de una vez
+        con Network.connect_bulk (duplicados detectados con un conjunto,
+        vecinos en una sola pasada). Las líneas que no se pueden aplicar se
+        informan con su número en lugar de ignorarse.
+        
         Args:
             network: Instancia de Network
             filename (str): Nombre del archivo de configuración CLI
@@ -174,56 +566,83 @@ class ConfigManager:
             if not os.path.exists(filename):
                 return False, f"El archivo {filename} no existe"
             
-            with open(filename, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
+            errors = []  # (número de línea, mensaje)
+            links = []
+            link_lines = []
+            devices = 0
             current_device = None
             current_interface = None
             
-            for line in lines:
-                line = line.strip()
-                if not line or line.startswith('#'):
-                    continue
-                
-                parts = line.split()
-                if not parts:
-                    continue
-                
-                command = parts[0].lower()
-                
-                if command == "hostname" and len(parts) > 1:
-                    device_name = parts[1]
-                    if device_name not in network.devices:
-                        network.add_device(device_name)
-                    current_device = network.get_device(device_name)
-                
-                elif command == "interface" and len(parts) > 1 and current_device:
-                    interface_name = parts[1]
-                    current_device.add_interface(interface_name)
-                    current_interface = current_device.get_interface(interface_name)
-                
-                elif command == "ip" and len(parts) > 2 and current_interface:
-                    if parts[1] == "address":
-                        ip_address = parts[2]
-                        current_interface.set_ip_address(ip_address)
-                
-                elif command == "no" and len(parts) > 1 and current_interface:
-                    if parts[1] == "shutdown":
-                        current_interface.no_shutdown()
-                
-                elif command == "shutdown" and current_interface:
-                    current_interface.shutdown()
-                
-                elif command == "exit":
-                    if current_interface:
-                        current_interface = None
-                    elif current_device:
-                        current_device = None
-                
-                elif command == "connect" and len(parts) > 3:
-                    device1, interface1, device2, interface2 = parts[1:5]
-                    network.connect_interfaces(device1, interface1, device2, interface2)
+            with open(filename, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    parts = line.split()
+                    if not parts or parts[0].startswith('#'):
+                        continue
+                    command = parts[0].lower()
+                    
+                    try:
+                        if command == "hostname" and len(parts) > 1:
+                            device_name = parts[1]
+                            if network.add_device(device_name):
+                                devices += 1
+                            current_device = network.get_device(device_name)
+                            current_interface = None
+                        
+                        elif command == "interface" and len(parts) > 1:
+                            if not current_device:
+                                raise ValueError("interface fuera de un bloque hostname")
+                            interface_name = parts[1]
+                            current_device.add_interface(interface_name)
+                            current_interface = current_device.get_interface(interface_name)
+                        
+                        elif command == "ip" and len(parts) > 2 and parts[1] == "address":
+                            if not current_interface:
+                                raise ValueError("ip address fuera de un bloque interface")
+                            parse_cidr(parts[2])  # Valida la dirección antes de asignarla
+                            current_interface.set_ip_address(parts[2])
+                        
+                        elif command == "no" and len(parts) > 1 and parts[1] == "shutdown":
+                            if not current_interface:
+                                raise ValueError("no shutdown fuera de un bloque interface")
+                            current_interface.no_shutdown()
+                        
+                        elif command == "shutdown":
+                            if not current_interface:
+                                raise ValueError("shutdown fuera de un bloque interface")
+                            current_interface.shutdown()
+                        
+                        elif command == "exit":
+                            if current_interface:
+                                current_interface = None
+                            elif current_device:
+                                current_device = None
+                        
+                        elif command == "connect":
+                            if len(parts) < 5:
+                                raise ValueError("Uso: connect <dev1> <iface1> <dev2> <iface2> "
+                                                 "[latency <ms>] [bandwidth <bps>]")
+                            latency, bandwidth = parse_link_options(parts[5:])
+                            links.append((parts[1], parts[2], parts[3], parts[4], latency, bandwidth))
+                            link_lines.append(line_number)
+                        
+                        else:
+                            raise ValueError(f"Comando no reconocido: {line.strip()}")
+                    except ValueError as e:
+                        errors.append((line_number, str(e)))
+            
+            rejected = network.connect_bulk(links)
+            for position, message in rejected:
+                errors.append((link_lines[position], message))
+            errors.sort()
+            
+            for line_number, message in errors[:IMPORT_ERROR_LIMIT]:
+                print(f"Advertencia: {filename}:{line_number}: {message}")
+            if len(errors) > IMPORT_ERROR_LIMIT:
+                print(f"Advertencia: ... y {len(errors) - IMPORT_ERROR_LIMIT} errores más")
+            self._warn_duplicate_ips(network)
             
-            return True, "Configuración CLI importada exitosamente"
+            return True, (f"Configuración CLI importada desde {filename}: {devices} dispositivos nuevos, "
+                          f"{len(links) - len(rejected)} conexiones, "
+                          f"{len(errors)} líneas con error")
         except Exception as e:
-            return False, f"Error al importar configuración CLI: {e}" 
\ No newline at end of file
+            return False, f"Error al importar configuración CLI: {e}"
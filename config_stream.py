@@ -0,0 +1,171 @@
+"""
+Lectura incremental de archivos de configuración JSON para el Simulador de Red
+Recorre network_config.json elemento a elemento (cada dispositivo, cada
+conexión) sin cargar el documento completo en memoria
+"""
+
+import json
+
+try:
+    import ijson
+except ImportError:  # ijson es opcional: sin él se usa el lector en Python puro
+    ijson = None
+
+IJSON_AVAILABLE = ijson is not None
+
+# Secciones que se recorren elemento a elemento; el resto se lee entero
+STREAMED_OBJECTS = ("devices",)
+STREAMED_ARRAYS = ("connections", "link_properties")
+SCALAR_SECTIONS = ("history_size", "current_device", "global_statistics")
+
+CHUNK_SIZE = 1 << 16  # Caracteres leídos del archivo en cada bloque
+
+_WHITESPACE = " \t\n\r"
+
+class _JSONScanner:
+    """
+    Lector de JSON por bloques en Python puro
+
+    Solo interpreta la estructura exterior (llaves, corchetes, comas y dos
+    puntos); cada valor se decodifica con JSONDecoder.raw_decode sobre el
+    búfer, que se amplía si el valor aún no está completo y se recorta a
+    medida que se consume.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """Descarta lo ya consumido y lee el siguiente bloque"""
+        chunk = self.file.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def peek(self):
+        """Retorna el siguiente carácter significativo sin consumirlo ('' al final)"""
+        while True:
+            buffer = self.buffer
+            position = self.position
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            self.position = position
+            if position < len(buffer):
+                return buffer[position]
+            if self.eof:
+                return ""
+            self._fill()
+
+    def expect(self, characters):
+        """Consume el siguiente carácter significativo, que debe ser uno de characters"""
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"JSON inválido: se esperaba {characters!r} en lugar de {character!r}")
+        self.position += 1
+        return character
+
+    def value(self):
+        """Decodifica y consume el siguiente valor completo"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # Un número al final del búfer puede estar cortado: leer más y repetir
+            if end == len(self.buffer) and not self.eof:
+                self._fill()
+                continue
+            self.position = end
+            return value
+
+    def items(self):
+        """Genera los pares (clave, valor) de un objeto JSON"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.expect(",}") == "}":
+                return
+
+    def elements(self):
+        """Genera una vez por elemento de una lista JSON, antes de leerlo"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield
+            if self.expect(",]") == "]":
+                return
+
+def _iter_python(file):
+    """Recorre la configuración con el lector en Python puro"""
+    scanner = _JSONScanner(file)
+    for section in scanner.items():
+        if section in STREAMED_OBJECTS and scanner.peek() == "{":
+            for name in scanner.items():
+                yield section, (name, scanner.value())
+        elif section in STREAMED_ARRAYS and scanner.peek() == "[":
+            for _ in scanner.elements():
+                yield section, scanner.value()
+        else:
+            yield section, scanner.value()
+
+def _iter_ijson(filename):
+    """
+    Recorre la configuración con ijson, una pasada por sección
+
+    kvitems/items construyen cada elemento en C; es más rápido que
+    construirlos en Python a partir de los eventos de ijson.parse aunque
+    el archivo se lea varias veces.
+    """
+    for section in STREAMED_OBJECTS:
+        with open(filename, "rb") as f:
+            for item in ijson.kvitems(f, section, use_float=True):
+                yield section, item
+    for section in STREAMED_ARRAYS:
+        with open(filename, "rb") as f:
+            for item in ijson.items(f, f"{section}.item", use_float=True):
+                yield section, item
+    for section in SCALAR_SECTIONS:
+        with open(filename, "rb") as f:
+            for item in ijson.items(f, section, use_float=True):
+                yield section, item
+
+def iter_config(filename, use_ijson=False):
+    """
+    Recorre un archivo de configuración sin cargarlo entero
+
+    Los dispositivos se generan como ("devices", (nombre, datos)), las
+    conexiones y propiedades de enlace como ("connections", conexión) y
+    ("link_properties", enlace), y cualquier otra clave como (clave, valor).
+
+    Por defecto se usa el lector por bloques, que decodifica cada elemento
+    con el decodificador JSON en C de la biblioteca estándar y resulta más
+    rápido que ijson; use_ijson=True usa ijson si está instalado.
+
+    Args:
+        filename (str): Archivo JSON con el formato de Network.to_dict
+        use_ijson (bool): Usar ijson en lugar del lector por bloques
+
+    Yields:
+        tuple: (sección, elemento)
+    """
+    if use_ijson and IJSON_AVAILABLE:
+        yield from _iter_ijson(filename)
+    else:
+        with open(filename, "r", encoding="utf-8") as f:
+            yield from _iter_python(f)
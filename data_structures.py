@@ -1,30 +1,38 @@
 """
 Estructuras de Datos (TDA) para el Simulador de Red
-Implementación de Lista Enlazada, Cola y Pila
+Implementación de Lista Enlazada, Cola, Pila y Conjunto de Conexiones
 """
 
+def _iterate_nodes(head):
+    """Recorre los datos de una cadena de nodos desde head"""
+    current = head
+    while current:
+        yield current.data
+        current = current.next
+
 class Node:
     """Nodo para estructuras de datos enlazadas"""
+    __slots__ = ("data", "next")
+    
     def __init__(self, data):
         self.data = data
         self.next = None
 
 class LinkedList:
-    """Lista Enlazada Simple"""
+    """Lista Enlazada Simple (con puntero al último nodo)"""
     def __init__(self):
         self.head = None
+        self.tail = None
         self.size = 0
     
     def append(self, data):
-        """Añade un elemento al final de la lista"""
+        """Añade un elemento al final de la lista en O(1)"""
         new_node = Node(data)
         if not self.head:
             self.head = new_node
         else:
-            current = self.head
-            while current.next:
-                current = current.next
-            current.next = new_node
+            self.tail.next = new_node
+        self.tail = new_node
         self.size += 1
     
     def remove(self, data):
@@ -34,12 +42,16 @@ class LinkedList:
         
         if self.head.data == data:
             self.head = self.head.next
+            if not self.head:
+                self.tail = None
             self.size -= 1
             return True
         
         current = self.head
         while current.next:
             if current.next.data == data:
+                if current.next is self.tail:
+                    self.tail = current
                 current.next = current.next.next
                 self.size -= 1
                 return True
@@ -57,12 +69,7 @@ class LinkedList:
     
     def to_list(self):
         """Convierte la lista enlazada a una lista Python"""
-        result = []
-        current = self.head
-        while current:
-            result.append(current.data)
-            current = current.next
-        return result
+        return list(_iterate_nodes(self.head))
     
     def is_empty(self):
         """Verifica si la lista está vacía"""
@@ -71,6 +78,13 @@ class LinkedList:
     def get_size(self):
         """Retorna el tamaño de la lista"""
         return self.size
+    
+    def __iter__(self):
+        """Recorre los elementos sin copiarlos"""
+        return _iterate_nodes(self.head)
+    
+    def __len__(self):
+        return self.size
 
 class Queue:
     """Cola (FIFO - First In, First Out)"""
@@ -118,14 +132,16 @@ class Queue:
         """Retorna el tamaño de la cola"""
         return self.size
     
+    def __iter__(self):
+        """Recorre los elementos desde el primero sin extraerlos"""
+        return _iterate_nodes(self.head)
+    
+    def __len__(self):
+        return self.size
+    
     def to_list(self):
         """Convierte la cola a una lista Python"""
-        result = []
-        current = self.head
-        while current:
-            result.append(current.data)
-            current = current.next
-        return result
+        return list(_iterate_nodes(self.head))
 
 class Stack:
     """Pila (LIFO - Last In, First Out)"""
@@ -164,11 +180,168 @@ class Stack:
         """Retorna el tamaño de la pila"""
         return self.size
     
+    def __iter__(self):
+        """Recorre los elementos desde la cima sin extraerlos"""
+        return _iterate_nodes(self.head)
+    
+    def __len__(self):
+        return self.size
+    
     def to_list(self):
         """Convierte la pila a una lista Python (orden inverso)"""
-        result = []
-        current = self.head
-        while current:
-            result.append(current.data)
-            current = current.next
-        return result 
\ No newline at end of file
+        return list(_iterate_nodes(self.head)) 
+
+class RingBuffer:
+    """
+    Buffer circular de capacidad fija: al llenarse descarta lo más antiguo
+    
+    El espacio se reserva a medida que llegan elementos, de modo que crear
+    muchos buffers vacíos de gran capacidad es barato.
+    """
+    def __init__(self, capacity):
+        if capacity < 0:
+            raise ValueError("La capacidad no puede ser negativa")
+        self.capacity = capacity
+        self.items = []
+        self.next = 0  # Posición donde se escribirá el siguiente elemento
+        self.size = 0
+    
+    def push(self, data):
+        """Añade un elemento; si está lleno sobrescribe el más antiguo"""
+        if not self.capacity:
+            return
+        if self.size < self.capacity:
+            # Mientras crece, los elementos ocupan items[0:size] en orden
+            self.items.append(data)
+            self.size += 1
+            self.next = self.size % self.capacity
+            return
+        self.items[self.next] = data
+        self.next = (self.next + 1) % self.capacity
+    
+    def peek(self):
+        """Retorna el elemento más reciente sin eliminarlo"""
+        if not self.size:
+            return None
+        return self.items[(self.next - 1) % self.capacity]
+    
+    def resize(self, capacity):
+        """Cambia la capacidad conservando los elementos más recientes"""
+        newest_first = self.to_list()[:capacity]
+        self.__init__(capacity)
+        for data in reversed(newest_first):
+            self.push(data)
+    
+    def clear(self):
+        """Elimina todos los elementos"""
+        self.items = []
+        self.next = 0
+        self.size = 0
+    
+    def is_empty(self):
+        """Verifica si el buffer está vacío"""
+        return self.size == 0
+    
+    def get_size(self):
+        """Retorna el número de elementos almacenados"""
+        return self.size
+    
+    def __iter__(self):
+        """Recorre los elementos del más reciente al más antiguo"""
+        index = self.next
+        for _ in range(self.size):
+            index = (index - 1) % self.capacity
+            yield self.items[index]
+    
+    def __len__(self):
+        return self.size
+    
+    def to_list(self):
+        """Convierte el buffer a una lista Python (del más reciente al más antiguo)"""
+        return list(self)
+
+def _edge_key(connection):
+    """Clave normalizada de una conexión: la misma en ambos sentidos"""
+    device1, interface1, device2, interface2 = connection
+    if (device1, interface1) <= (device2, interface2):
+        return connection
+    return (device2, interface2, device1, interface1)
+
+class ConnectionStore:
+    """
+    Conjunto de conexiones indexado por hash con mapa de adyacencia
+    
+    Cada conexión (disp1, iface1, disp2, iface2) se guarda con el sentido
+    en que se creó, indexada por una clave normalizada común a ambos
+    sentidos; además cada dispositivo conoce las claves de sus conexiones.
+    Añadir, buscar y eliminar son O(1) y quitar un dispositivo es
+    O(grado). Se recorre en orden de inserción, como la lista original.
+    """
+    def __init__(self):
+        self.edges = {}  # Clave normalizada -> conexión en su sentido original
+        self.adjacency = {}  # Dispositivo -> claves de sus conexiones (dict como conjunto ordenado)
+    
+    def add(self, connection):
+        """Añade una conexión; retorna False si ya existe en cualquier sentido"""
+        connection = tuple(connection)
+        key = _edge_key(connection)
+        if key in self.edges:
+            return False
+        self.edges[key] = connection
+        self.adjacency.setdefault(connection[0], {})[key] = None
+        self.adjacency.setdefault(connection[2], {})[key] = None
+        return True
+    
+    def find(self, connection):
+        """Retorna la conexión guardada (en su sentido original) o None"""
+        return self.edges.get(_edge_key(tuple(connection)))
+    
+    def remove(self, connection):
+        """Elimina una conexión dada en cualquier sentido; retorna la guardada o None"""
+        key = _edge_key(tuple(connection))
+        stored = self.edges.pop(key, None)
+        if stored is not None:
+            for device_name in (stored[0], stored[2]):
+                keys = self.adjacency.get(device_name)
+                if keys is not None:
+                    keys.pop(key, None)
+                    if not keys:
+                        del self.adjacency[device_name]
+        return stored
+    
+    def remove_device(self, device_name):
+        """Elimina todas las conexiones de un dispositivo y las retorna"""
+        removed = []
+        for key in list(self.adjacency.get(device_name, ())):
+            removed.append(self.remove(key))
+        return removed
+    
+    def get_device_connections(self, device_name):
+        """Retorna las conexiones de un dispositivo"""
+        return [self.edges[key] for key in self.adjacency.get(device_name, ())]
+    
+    def clear(self):
+        """Elimina todas las conexiones"""
+        self.edges.clear()
+        self.adjacency.clear()
+    
+    def to_list(self):
+        """Convierte el conjunto a la lista de 4-tuplas (formato de to_dict)"""
+        return list(self.edges.values())
+    
+    def __contains__(self, connection):
+        return _edge_key(tuple(connection)) in self.edges
+    
+    def __iter__(self):
+        return iter(self.edges.values())
+    
+    def __len__(self):
+        return len(self.edges)
+    
+    def __eq__(self, other):
+        """Compara en orden con otro conjunto o con una lista de conexiones"""
+        if isinstance(other, (ConnectionStore, list)):
+            return self.to_list() == list(other)
+        return NotImplemented
+    
+    __hash__ = None
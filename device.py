@@ -2,48 +2,91 @@
 Clases Device e Interface para representar dispositivos de red
 """
 
-from data_structures import Queue, Stack, LinkedList
-from packet import Packet
+from data_structures import Queue, LinkedList, RingBuffer
+from packet import Packet, format_path
+from ip_utils import MAX_PREFIX_LENGTH, parse_cidr, format_cidr
 import time
 
+DEFAULT_HISTORY_SIZE = 1000  # Capacidad por defecto del historial de cada dispositivo
+
+# Campos de cada registro del historial (se guardan como tuplas compactas)
+HISTORY_FIELDS = ("timestamp", "source_ip", "destination_ip", "message",
+                  "ttl_at_arrival", "path", "expired")
+
 class Interface:
     """Representa una interfaz de red de un dispositivo"""
     
-    def __init__(self, name, ip_address=None):
+    def __init__(self, name, ip_address=None, prefix_length=None):
         """
         Inicializa una interfaz
         
         Args:
             name (str): Nombre de la interfaz (ej: g0/0, eth0)
-            ip_address (str): Dirección IP de la interfaz
+            ip_address (str): Dirección IP de la interfaz (admite a.b.c.d/len)
+            prefix_length (int): Longitud del prefijo de red (por defecto /32)
         """
         self.name = name
-        self.ip_address = ip_address
+        self.ip_address, self.prefix_length = self._split_address(ip_address, prefix_length)
         self.status = "down"  # down/up
+        self.device = None  # Dispositivo propietario (se asigna al añadirla)
         self.neighbors = LinkedList()  # Lista enlazada de vecinos
         self.input_queue = Queue()  # Cola de paquetes entrantes
         self.output_queue = Queue()  # Cola de paquetes salientes
     
-    def set_ip_address(self, ip_address):
-        """Establece la dirección IP de la interfaz"""
+    @staticmethod
+    def _split_address(ip_address, prefix_length=None):
+        """Separa 'a.b.c.d/len' en (ip, prefijo); sin prefijo se asume /32"""
+        if ip_address and "/" in ip_address:
+            return parse_cidr(ip_address)
+        if prefix_length is None:
+            prefix_length = MAX_PREFIX_LENGTH
+        return ip_address, prefix_length
+    
+    def set_ip_address(self, ip_address, prefix_length=None):
+        """Establece la dirección IP de la interfaz (admite notación a.b.c.d/len)"""
+        ip_address, prefix_length = self._split_address(ip_address, prefix_length)
+        network = self.device.network if self.device else None
+        if network:
+            network._unindex_interface(self)
         self.ip_address = ip_address
+        self.prefix_length = prefix_length
+        if network:
+            network._index_interface(self.device, self)
+    
+    def get_cidr(self):
+        """Retorna la dirección en notación CIDR (sin prefijo si es /32)"""
+        if not self.ip_address:
+            return None
+        return format_cidr(self.ip_address, self.prefix_length)
     
     def shutdown(self):
         """Desactiva la interfaz"""
-        self.status = "down"
+        self._set_status("down")
     
     def no_shutdown(self):
         """Activa la interfaz"""
-        self.status = "up"
+        self._set_status("up")
+    
+    def _set_status(self, status):
+        """Cambia el estado y avisa a la red si afecta a algún enlace"""
+        if status == self.status:
+            return
+        self.status = status
+        if self.device and self.device.network and not self.neighbors.is_empty():
+            self.device.network._invalidate_routes()
     
     def is_up(self):
         """Verifica si la interfaz está activa"""
         return self.status == "up"
     
     def add_neighbor(self, neighbor_interface):
-        """Añade un vecino a la interfaz"""
-        if not self.neighbors.contains(neighbor_interface):
-            self.neighbors.append(neighbor_interface)
+        """
+        Añade un vecino a la interfaz en O(1)
+        
+        No se comprueba si ya estaba: Network.connect_interfaces rechaza
+        antes los enlaces repetidos con el conjunto de conexiones.
+        """
+        self.neighbors.append(neighbor_interface)
     
     def remove_neighbor(self, neighbor_interface):
         """Elimina un vecino de la interfaz"""
@@ -56,10 +99,14 @@ class Interface:
     def enqueue_input(self, packet):
         """Añade un paquete a la cola de entrada"""
         self.input_queue.enqueue(packet)
+        if self.device and self.device.network:
+            self.device.network._activate_interface(self)
     
     def enqueue_output(self, packet):
         """Añade un paquete a la cola de salida"""
         self.output_queue.enqueue(packet)
+        if self.device and self.device.network:
+            self.device.network._activate_interface(self)
     
     def dequeue_input(self):
         """Extrae un paquete de la cola de entrada"""
@@ -90,14 +137,15 @@ class Interface:
         return {
             "name": self.name,
             "ip_address": self.ip_address,
+            "prefix_length": self.prefix_length,
             "status": self.status,
-            "neighbors": self.neighbors.to_list()
+            "neighbors": list(self.neighbors)
         }
     
     def __str__(self):
         """Representación string de la interfaz"""
         status_icon = "✓" if self.is_up() else "✗"
-        return f"{self.name} ({self.ip_address}) [{status_icon}]"
+        return f"{self.name} ({self.get_cidr()}) [{status_icon}]"
 
 class Device:
     """Representa un dispositivo de red (router, switch, host, firewall)"""
@@ -114,21 +162,33 @@ class Device:
         self.type = device_type
         self.status = "online"  # online/offline
         self.interfaces = {}  # Diccionario de interfaces por nombre
-        self.history = Stack()  # Pila para historial de paquetes recibidos
+        self.history_size = None  # Capacidad propia del historial (None = la global de la red)
+        self.history = RingBuffer(DEFAULT_HISTORY_SIZE)  # Últimos paquetes recibidos
         self.packets_processed = 0
         self.packets_dropped = 0
+        self.network = None  # Red a la que pertenece (se asigna al registrarlo)
     
-    def add_interface(self, interface_name, ip_address=None):
+    def add_interface(self, interface_name, ip_address=None, prefix_length=None):
         """Añade una interfaz al dispositivo"""
         if interface_name not in self.interfaces:
-            self.interfaces[interface_name] = Interface(interface_name, ip_address)
+            interface = Interface(interface_name, ip_address, prefix_length)
+            interface.device = self
+            self.interfaces[interface_name] = interface
+            if self.network:
+                self.network._index_interface(self, interface)
             return True
         return False
     
     def remove_interface(self, interface_name):
         """Elimina una interfaz del dispositivo"""
         if interface_name in self.interfaces:
-            del self.interfaces[interface_name]
+            interface = self.interfaces.pop(interface_name)
+            if self.network:
+                self.network._unindex_interface(interface)
+                self.network._deactivate_interface(interface)
+                if not interface.neighbors.is_empty():
+                    self.network._invalidate_routes()
+            interface.device = None
             return True
         return False
     
@@ -149,37 +209,68 @@ class Device:
     
     def set_status(self, status):
         """Establece el estado del dispositivo"""
-        if status in ["online", "offline"]:
+        if status in ["online", "offline"] and status != self.status:
             self.status = status
+            if self.network:
+                self.network._device_status_changed(self)
+                self.network._invalidate_routes()
     
     def is_online(self):
         """Verifica si el dispositivo está en línea"""
         return self.status == "online"
     
     def add_to_history(self, packet):
-        """Añade un paquete al historial"""
-        packet_info = {
-            "timestamp": time.time(),
-            "source_ip": packet.source_ip,
-            "destination_ip": packet.destination_ip,
-            "message": packet.message,
-            "ttl_at_arrival": packet.ttl,
-            "path": packet.get_path_string(),
-            "expired": packet.is_expired()
-        }
-        self.history.push(packet_info)
+        """
+        Añade un paquete al historial (se conservan los más recientes)
+        
+        Se guarda una referencia al camino del paquete (que ya no cambia
+        tras la entrega) y el texto se formatea solo al consultar el historial.
+        """
+        self.history.push((
+            time.time(),
+            packet.source_ip,
+            packet.destination_ip,
+            packet.message,
+            packet.ttl,
+            packet.path,
+            packet.is_expired()
+        ))
         self.packets_processed += 1
     
     def get_history(self):
-        """Retorna el historial de paquetes"""
-        return self.history.to_list()
+        """Retorna el historial de paquetes, del más reciente al más antiguo"""
+        history = []
+        for record in self.history:
+            packet_info = dict(zip(HISTORY_FIELDS, record))
+            packet_info["path"] = format_path(packet_info["path"])
+            history.append(packet_info)
+        return history
     
     def clear_history(self):
         """Limpia el historial de paquetes"""
-        self.history = Stack()
+        self.history.clear()
         self.packets_processed = 0
         self.packets_dropped = 0
     
+    def get_history_capacity(self):
+        """Retorna la capacidad efectiva del historial"""
+        if self.history_size is not None:
+            return self.history_size
+        if self.network:
+            return self.network.history_size
+        return DEFAULT_HISTORY_SIZE
+    
+    def set_history_size(self, history_size):
+        """Establece la capacidad propia del historial (None para usar la global)"""
+        self.history_size = history_size
+        self._apply_history_size()
+    
+    def _apply_history_size(self):
+        """Ajusta el buffer del historial a la capacidad efectiva"""
+        capacity = self.get_history_capacity()
+        if capacity != self.history.capacity:
+            self.history.resize(capacity)
+    
     def get_statistics(self):
         """Retorna estadísticas del dispositivo"""
         return {
@@ -201,7 +292,8 @@ class Device:
             "interfaces": {name: interface.to_dict() 
                           for name, interface in self.interfaces.items()},
             "packets_processed": self.packets_processed,
-            "packets_dropped": self.packets_dropped
+            "packets_dropped": self.packets_dropped,
+            "history_size": self.history_size
         }
     
     def __str__(self):
@@ -0,0 +1,145 @@
+"""
+Motor de simulación por eventos discretos para el Simulador de Red
+Alternativa al tick síncrono: cada salto es un evento en una cola de
+prioridad ordenada por tiempo simulado, con latencia y ancho de banda
+por enlace
+"""
+
+import heapq
+
+PACKET_HEADER_BYTES = 20  # Cabecera IPv4 sin opciones
+
+class EventEngine:
+    """
+    Cola de eventos (montículo) sobre el tiempo simulado en milisegundos
+
+    Cada evento es la llegada de un paquete a un dispositivo. Al procesarlo
+    el paquete se entrega si el dispositivo es su destino; si no, se
+    transmite por la interfaz que indique la tabla de reenvío y se programa
+    su llegada al siguiente dispositivo tras el retardo de transmisión
+    (tamaño / ancho de banda, respetando la ocupación del enlace) más la
+    latencia del enlace.
+    """
+
+    def __init__(self, network):
+        """
+        Inicializa el motor de eventos
+
+        Args:
+            network: Instancia de Network sobre la que se simula
+        """
+        self.network = network
+        self.current_time = 0.0
+        self.events = []  # Montículo de (tiempo, secuencia, dispositivo, paquete)
+        self.sequence = 0  # Desempate estable entre eventos simultáneos
+        self.link_busy_until = {}  # (dispositivo, interfaz) -> fin de la transmisión en curso
+        self.events_processed = 0
+
+    def reset(self):
+        """Descarta los eventos pendientes y reinicia el reloj"""
+        self.current_time = 0.0
+        self.events = []
+        self.sequence = 0
+        self.link_busy_until.clear()
+        self.events_processed = 0
+
+    def schedule(self, event_time, device_name, packet):
+        """Programa la llegada de un paquete a un dispositivo"""
+        heapq.heappush(self.events, (event_time, self.sequence, device_name, packet))
+        self.sequence += 1
+
+    def get_pending_count(self):
+        """Retorna el número de eventos pendientes"""
+        return len(self.events)
+
+    def inject_queued_packets(self):
+        """Convierte en eventos los paquetes que esperan en las colas de las interfaces"""
+        network = self.network
+        for interface in network._pending_interfaces():
+            device = interface.device
+            if not device.is_online() or not interface.is_up():
+                continue  # Igual que en el modo tick, esperan en la cola
+            while interface.has_output_packets():
+                self.schedule(self.current_time, device.name, interface.dequeue_output())
+            while interface.has_input_packets():
+                self.schedule(self.current_time, device.name, interface.dequeue_input())
+            network._deactivate_interface(interface)
+
+    def run_until(self, end_time):
+        """Procesa los eventos con tiempo <= end_time y avanza el reloj hasta él"""
+        self.inject_queued_packets()
+        result = self._run(lambda event_time, count: event_time <= end_time)
+        self.current_time = max(self.current_time, end_time)
+        result["time"] = self.current_time
+        return result
+
+    def run_events(self, max_events):
+        """Procesa como mucho max_events eventos"""
+        self.inject_queued_packets()
+        return self._run(lambda event_time, count: count < max_events)
+
+    def _run(self, should_continue):
+        """Bucle principal: extrae eventos mientras should_continue lo permita"""
+        delivered_count = 0
+        dropped_count = 0
+        count = 0
+
+        while self.events and should_continue(self.events[0][0], count):
+            event_time, _, device_name, packet = heapq.heappop(self.events)
+            self.current_time = event_time
+            count += 1
+
+            outcome = self._handle_arrival(device_name, packet)
+            if outcome == "delivered":
+                delivered_count += 1
+            elif outcome == "dropped":
+                dropped_count += 1
+
+        self.events_processed += count
+        return {
+            "events": count,
+            "delivered": delivered_count,
+            "dropped": dropped_count,
+            "time": self.current_time,
+            "pending": len(self.events)
+        }
+
+    def _handle_arrival(self, device_name, packet):
+        """Procesa la llegada de un paquete a un dispositivo"""
+        network = self.network
+        device = network.get_device(device_name)
+        if not device or not device.is_online():
+            network._drop_packet(device)
+            return "dropped"
+
+        destination_device, _ = network.find_interface_by_ip(packet.destination_ip)
+        if destination_device is device:
+            network._deliver_packet(device, packet)
+            return "delivered"
+
+        if packet.is_expired():
+            network._drop_packet(device)
+            return "dropped"
+        packet.decrement_ttl()
+
+        route = network._next_hop(device, packet.destination_ip)
+        if not route:
+            network._drop_packet(device)
+            return "dropped"
+
+        out_interface, next_device_name, next_interface_name, _ = route
+        latency, bandwidth = network.get_link_properties(
+            device_name, out_interface, next_device_name, next_interface_name
+        )
+
+        # Retardo de transmisión: el enlace envía un paquete tras otro
+        start_time = max(self.current_time, self.link_busy_until.get((device_name, out_interface), 0.0))
+        transmission_time = 0.0
+        if bandwidth:
+            size_bits = (len(packet.message) + PACKET_HEADER_BYTES) * 8
+            transmission_time = size_bits / bandwidth * 1000
+        self.link_busy_until[(device_name, out_interface)] = start_time + transmission_time
+
+        packet.add_hop(next_device_name)
+        self.schedule(start_time + transmission_time + latency, next_device_name, packet)
+        return "forwarded"
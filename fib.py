@@ -0,0 +1,151 @@
+"""
+FIB (Forwarding Information Base) para el Simulador de Red
+Trie binario compacto (Patricia) para búsquedas por prefijo más largo
+"""
+
+from ip_utils import MAX_PREFIX_LENGTH, PREFIX_MASKS, int_to_ip
+
+class TrieNode:
+    """Nodo del trie: un prefijo (red, longitud) con un valor opcional"""
+    __slots__ = ("prefix", "length", "value", "has_value", "left", "right")
+
+    def __init__(self, prefix, length):
+        self.prefix = prefix
+        self.length = length
+        self.value = None
+        self.has_value = False
+        self.left = None   # Hijo cuyo siguiente bit es 0
+        self.right = None  # Hijo cuyo siguiente bit es 1
+
+    def get_child(self, bit):
+        """Retorna el hijo correspondiente a un bit"""
+        return self.right if bit else self.left
+
+    def set_child(self, bit, node):
+        """Establece el hijo correspondiente a un bit"""
+        if bit:
+            self.right = node
+        else:
+            self.left = node
+
+def _bit_at(value, position):
+    """Retorna el bit de la posición dada (0 = bit más significativo)"""
+    return (value >> (MAX_PREFIX_LENGTH - 1 - position)) & 1
+
+def _common_length(a, b, limit):
+    """Longitud del prefijo común de dos enteros de 32 bits, acotada por limit"""
+    difference = a ^ b
+    common = MAX_PREFIX_LENGTH - difference.bit_length()
+    return min(common, limit)
+
+class PrefixTrie:
+    """
+    Trie Patricia sobre direcciones IPv4 enteras
+
+    Solo se crean nodos para los prefijos insertados y para los puntos de
+    bifurcación, por lo que el tamaño es O(número de prefijos) y una
+    búsqueda recorre como mucho 33 nodos.
+    """
+
+    def __init__(self):
+        self.root = TrieNode(0, 0)
+        self.size = 0
+
+    def insert(self, prefix, length, value):
+        """Inserta (o reemplaza) el valor asociado a un prefijo"""
+        prefix &= PREFIX_MASKS[length]
+        node = self.root
+
+        while True:
+            if node.length == length:
+                if not node.has_value:
+                    self.size += 1
+                node.value = value
+                node.has_value = True
+                return
+
+            bit = _bit_at(prefix, node.length)
+            child = node.get_child(bit)
+            if child is None:
+                leaf = TrieNode(prefix, length)
+                leaf.value = value
+                leaf.has_value = True
+                node.set_child(bit, leaf)
+                self.size += 1
+                return
+
+            common = _common_length(child.prefix, prefix, min(child.length, length))
+            if common == child.length:
+                node = child
+                continue
+
+            # Dividir la arista: el nuevo nodo cuelga en el punto de bifurcación
+            if common == length:
+                branch = TrieNode(prefix, length)
+                branch.value = value
+                branch.has_value = True
+                self.size += 1
+            else:
+                branch = TrieNode(prefix & PREFIX_MASKS[common], common)
+                leaf = TrieNode(prefix, length)
+                leaf.value = value
+                leaf.has_value = True
+                branch.set_child(_bit_at(prefix, common), leaf)
+                self.size += 1
+
+            branch.set_child(_bit_at(child.prefix, common), child)
+            node.set_child(bit, branch)
+            return
+
+    def get(self, prefix, length):
+        """Retorna el valor asociado exactamente a un prefijo o None"""
+        prefix &= PREFIX_MASKS[length]
+        node = self.root
+        while node and node.length < length:
+            node = node.get_child(_bit_at(prefix, node.length))
+            if node and (prefix & PREFIX_MASKS[node.length]) != node.prefix:
+                return None
+        if node and node.length == length and node.prefix == prefix and node.has_value:
+            return node.value
+        return None
+
+    def contains(self, prefix, length):
+        """Verifica si un prefijo tiene valor asociado"""
+        return self.get(prefix, length) is not None
+
+    def lookup(self, address):
+        """Retorna el valor del prefijo más largo que contiene la dirección"""
+        best = self.root.value if self.root.has_value else None
+        node = self.root
+        while node.length < MAX_PREFIX_LENGTH:
+            node = node.get_child(_bit_at(address, node.length))
+            if node is None or (address & PREFIX_MASKS[node.length]) != node.prefix:
+                break
+            if node.has_value:
+                best = node.value
+        return best
+
+    def items(self):
+        """Retorna las entradas (prefijo, longitud, valor) en orden de dirección"""
+        result = []
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            if node.has_value:
+                result.append((node.prefix, node.length, node.value))
+            if node.right:
+                pending.append(node.right)
+            if node.left:
+                pending.append(node.left)
+        return result
+
+    def get_size(self):
+        """Retorna el número de prefijos almacenados"""
+        return self.size
+
+    def __len__(self):
+        return self.size
+
+    def __str__(self):
+        entries = ", ".join(f"{int_to_ip(prefix)}/{length}" for prefix, length, _ in self.items())
+        return f"PrefixTrie({entries})"
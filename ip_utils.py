@@ -0,0 +1,59 @@
+"""
+Utilidades para direcciones IPv4
+Conversión entre texto y enteros de 32 bits y manejo de prefijos CIDR
+"""
+
+MAX_PREFIX_LENGTH = 32
+
+# Máscaras de red precalculadas para cada longitud de prefijo
+PREFIX_MASKS = [(0xFFFFFFFF << (MAX_PREFIX_LENGTH - length)) & 0xFFFFFFFF
+                for length in range(MAX_PREFIX_LENGTH + 1)]
+
+def ip_to_int(ip_address):
+    """Convierte una IP en texto (a.b.c.d) a entero de 32 bits"""
+    octets = ip_address.split(".")
+    if len(octets) != 4:
+        raise ValueError(f"Dirección IP inválida: {ip_address}")
+
+    value = 0
+    for octet in octets:
+        number = int(octet)
+        if not 0 <= number <= 255:
+            raise ValueError(f"Dirección IP inválida: {ip_address}")
+        value = (value << 8) | number
+    return value
+
+def int_to_ip(value):
+    """Convierte un entero de 32 bits a IP en texto (a.b.c.d)"""
+    return f"{(value >> 24) & 255}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+
+def parse_cidr(text):
+    """
+    Separa una dirección en notación CIDR
+
+    Args:
+        text (str): Dirección 'a.b.c.d' o 'a.b.c.d/len'
+
+    Returns:
+        tuple: (ip_address, prefix_length); sin prefijo se asume /32
+    """
+    if "/" in text:
+        ip_address, prefix = text.split("/", 1)
+        prefix_length = int(prefix)
+    else:
+        ip_address, prefix_length = text, MAX_PREFIX_LENGTH
+
+    if not 0 <= prefix_length <= MAX_PREFIX_LENGTH:
+        raise ValueError(f"Longitud de prefijo inválida: {prefix_length}")
+    ip_to_int(ip_address)  # Valida los octetos
+    return ip_address, prefix_length
+
+def network_address(ip_value, prefix_length):
+    """Retorna la dirección de red (entera) de una IP entera y su prefijo"""
+    return ip_value & PREFIX_MASKS[prefix_length]
+
+def format_cidr(ip_address, prefix_length):
+    """Formatea una dirección con su prefijo, omitiéndolo si es /32"""
+    if prefix_length == MAX_PREFIX_LENGTH:
+        return ip_address
+    return f"{ip_address}/{prefix_length}"
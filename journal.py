@@ -0,0 +1,160 @@
+"""
+Diario de cambios para el Simulador de Red
+Registra cada comando CLI que modifica la configuración en un archivo de solo
+anexado; al arrancar se reaplica sobre el último checkpoint completo
+"""
+
+import json
+import os
+
+JOURNAL_COMPACT_RECORDS = 1000  # Registros tras los que se escribe un nuevo checkpoint
+
+def _checkpoint_version(checkpoint_file):
+    """Identifica el estado de un checkpoint (su fecha de modificación en ns)"""
+    try:
+        return os.stat(checkpoint_file).st_mtime_ns
+    except OSError:
+        return None
+
+class ChangeJournal:
+    """
+    Diario de solo anexado de comandos de configuración
+
+    Cada registro es una línea JSON [dispositivo, interfaz, comando] con el
+    contexto en que se ejecutó el comando, de modo que al reaplicarlo basta
+    con seleccionar ese dispositivo e interfaz y volver a ejecutarlo. La
+    primera línea identifica el checkpoint al que se aplica el diario: si el
+    checkpoint cambia por otra vía, el diario se descarta en lugar de
+    aplicarse sobre un estado distinto.
+    """
+
+    def __init__(self, filename, compact_records=JOURNAL_COMPACT_RECORDS):
+        """
+        Inicializa el diario
+
+        Args:
+            filename (str): Archivo del diario
+            compact_records (int): Registros a partir de los que conviene compactar
+        """
+        self.filename = filename
+        self.compact_records = compact_records
+        self.file = None
+        self.records = 0
+        self.recent = []  # Registros anexados desde el último checkpoint (ver mark)
+
+    def read_records(self, checkpoint_file):
+        """
+        Genera los registros del diario válidos para el checkpoint dado
+
+        Una última línea incompleta (escritura interrumpida) se ignora.
+
+        Yields:
+            tuple: (dispositivo, interfaz, comando)
+        """
+        if not os.path.exists(self.filename):
+            return
+        with open(self.filename, "r", encoding="utf-8") as f:
+            header = f.readline()
+            try:
+                version = json.loads(header)["checkpoint"]
+            except (ValueError, KeyError, TypeError):
+                print(f"Advertencia: {self.filename} no tiene cabecera válida; se descarta")
+                return
+            if version != _checkpoint_version(checkpoint_file):
+                print(f"Advertencia: {self.filename} no corresponde a {checkpoint_file}; se descarta")
+                return
+            for line in f:
+                try:
+                    device_name, interface_name, command_line = json.loads(line)
+                except (ValueError, TypeError):
+                    print(f"Advertencia: registro del diario incompleto ignorado: {line.strip()!r}")
+                    continue
+                yield device_name, interface_name, command_line
+
+    def replay(self, parser, checkpoint_file):
+        """
+        Reaplica el diario sobre la red del parser
+
+        Args:
+            parser: CLIParser sobre la red cargada desde el checkpoint
+            checkpoint_file (str): Checkpoint del que se partió
+
+        Returns:
+            tuple: (registros aplicados, registros con error)
+        """
+        network = parser.network
+        selected_device = network.current_device
+        applied = 0
+        errors = 0
+        try:
+            for device_name, interface_name, command_line in self.read_records(checkpoint_file):
+                device = network.get_device(device_name) if device_name else None
+                network.current_device = device
+                if device:
+                    device.current_interface = device.get_interface(interface_name) if interface_name else None
+                parser.mode = "interface" if interface_name else "config"
+
+                result = parser.parse_command(command_line)
+                if result and result.startswith("Error"):
+                    errors += 1
+                applied += 1
+        finally:
+            if network.current_device:
+                network.current_device.current_interface = None
+            if selected_device and network.devices.get(selected_device.name) is not selected_device:
+                selected_device = None
+            network.current_device = selected_device
+            parser.mode = "user"
+        self.records = applied
+        return applied, errors
+
+    def append(self, device_name, interface_name, command_line):
+        """Añade un registro al final del diario y lo pasa al sistema operativo"""
+        if self.file is None:
+            # Si la última escritura quedó a medias, el registro nuevo empieza en otra línea
+            partial_line = False
+            if os.path.exists(self.filename) and os.path.getsize(self.filename) > 0:
+                with open(self.filename, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    partial_line = f.read(1) != b"\n"
+            self.file = open(self.filename, "a", encoding="utf-8")
+            if partial_line:
+                self.file.write("\n")
+        line = json.dumps([device_name, interface_name, command_line], ensure_ascii=False) + "\n"
+        self.file.write(line)
+        self.file.flush()
+        self.recent.append(line)
+        self.records += 1
+    
+    def mark(self):
+        """Posición actual del diario, para vaciarlo después solo hasta ese punto"""
+        return len(self.recent)
+
+    def needs_compaction(self):
+        """Indica si el diario ha crecido lo bastante para escribir un checkpoint"""
+        return self.records >= self.compact_records
+
+    def reset(self, checkpoint_file, mark=None):
+        """
+        Vacía el diario tras escribir un checkpoint completo
+
+        Args:
+            checkpoint_file (str): Checkpoint recién escrito
+            mark (int): Posición (ver mark) en que se copió la red para el
+                checkpoint; los registros posteriores se conservan
+        """
+        self.close()
+        kept = self.recent[mark:] if mark is not None else []
+        temporary = self.filename + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"checkpoint": _checkpoint_version(checkpoint_file)}) + "\n")
+            f.writelines(kept)
+        os.replace(temporary, self.filename)
+        self.recent = kept
+        self.records = len(kept)
+
+    def close(self):
+        """Cierra el archivo del diario"""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
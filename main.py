@@ -3,11 +3,14 @@ Simulador de Red de Dispositivos (LAN) — CLI Estilo Router
 Desarrollado para el curso de Algoritmos y Estructuras de Datos II
 """
 
+import argparse
 import json
 import os
 from network import Network
 from cli_parser import CLIParser
+from cli_server import parse_address, run_server
 from config_manager import ConfigManager
+from autosave import Autosave, AUTOSAVE_INTERVAL
 
 def load_default_config():
     """Carga la configuración por defecto para pruebas"""
@@ -51,13 +54,65 @@ def load_default_config():
         ]
     }
 
+def persist(network, config_manager, autosave=None):
+    """
+    Deja la configuración en disco: si hay diario de cambios basta con
+    cerrarlo, salvo que haya tráfico nuevo (los contadores no se registran
+    en el diario y van en un checkpoint final); si no, se reescribe el
+    checkpoint solo si hubo cambios
+    """
+    if autosave:
+        autosave.stop()
+    if config_manager.journal:
+        if config_manager.statistics_changed(network):
+            success, message = config_manager.checkpoint(network)
+            config_manager.close_journal()
+            return success, message
+        return config_manager.close_journal()
+    if not config_manager.is_dirty(network) and os.path.exists(config_manager.checkpoint_file):
+        return True, "Sin cambios que guardar"
+    return config_manager.checkpoint(network)
+
+def save_on_exit(network, config_manager, autosave=None):
+    """Guarda la red al salir"""
+    print("Guardando configuración antes de salir...")
+    success, message = persist(network, config_manager, autosave)
+    print(message)
+    print("¡Hasta luego!")
+
+def parse_arguments():
+    """Procesa los argumentos de línea de comandos"""
+    arg_parser = argparse.ArgumentParser(description="Simulador de Red de Dispositivos (LAN)")
+    arg_parser.add_argument("--serve", metavar="HOST:PUERTO",
+                            help="Atiende sesiones CLI concurrentes por TCP en lugar de la consola")
+    arg_parser.add_argument("--script", metavar="ARCHIVO",
+                            help="Ejecuta los comandos de un archivo y termina")
+    arg_parser.add_argument("--quiet", action="store_true",
+                            help="Con --script, muestra solo el resumen final")
+    arg_parser.add_argument("--autosave", type=float, default=AUTOSAVE_INTERVAL, metavar="SEGUNDOS",
+                            help="Intervalo del guardado automático en segundo plano (0 lo desactiva)")
+    return arg_parser.parse_args()
+
 def main():
     """Función principal del simulador"""
-    print("=== Simulador de Red de Dispositivos (LAN) ===")
-    print("CLI Estilo Router - Algoritmos II")
-    print("Escriba 'help' para ver comandos disponibles")
-    print("Escriba 'exit' para salir")
-    print("-" * 50)
+    args = parse_arguments()
+    serve_address = None
+    if args.serve:
+        try:
+            serve_address = parse_address(args.serve)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+    if args.script and not os.path.exists(args.script):
+        print(f"Error: El archivo {args.script} no existe")
+        return
+    
+    if not args.script:
+        print("=== Simulador de Red de Dispositivos (LAN) ===")
+        print("CLI Estilo Router - Algoritmos II")
+        print("Escriba 'help' para ver comandos disponibles")
+        print("Escriba 'exit' para salir")
+        print("-" * 50)
     
     # Inicializar la red
     network = Network()
@@ -65,20 +120,51 @@ def main():
     
     # Cargar configuración por defecto si no existe archivo de configuración
     config_file = "network_config.json"
-    if os.path.exists(config_file):
-        try:
-            config_manager.load_config(network, config_file)
-            print(f"Configuración cargada desde {config_file}")
-        except Exception as e:
-            print(f"Error al cargar configuración: {e}")
-            print("Cargando configuración por defecto...")
-            config_manager.load_from_dict(network, load_default_config())
+    snapshot_file = "network_snapshot.bin"
+    journal_file = "network_config.journal"
+    # La instantánea binaria se prefiere si es más reciente que el JSON
+    if os.path.exists(snapshot_file) and (not os.path.exists(config_file) or
+                                          os.path.getmtime(snapshot_file) >= os.path.getmtime(config_file)):
+        success, message = config_manager.load_snapshot(network, snapshot_file)
+        print(message)
+        if not success:
+            snapshot_file = None
     else:
+        success = False
+        snapshot_file = None
+    if not success and os.path.exists(config_file):
+        success, message = config_manager.load_config(network, config_file)
+        print(message)
+    if not success:
         print("Cargando configuración por defecto...")
         config_manager.load_from_dict(network, load_default_config())
     
-    # Inicializar parser CLI
+    # Reaplicar los cambios registrados desde el último checkpoint
+    checkpoint_file = snapshot_file or config_file
     parser = CLIParser(network, config_manager)
+    success, message = config_manager.open_journal(parser, journal_file, checkpoint_file)
+    print(message if success else f"Advertencia: {message}")
+    
+    autosave = None
+    if args.autosave > 0 and not args.script:
+        autosave = Autosave(network, config_manager, args.autosave)
+        autosave.start()
+    
+    # Modo servidor: cada conexión es una sesión CLI sobre la misma red
+    if serve_address:
+        try:
+            run_server(network, config_manager, *serve_address)
+        except KeyboardInterrupt:
+            print()
+        save_on_exit(network, config_manager, autosave)
+        return
+    
+    # Modo script: los comandos se leen del archivo sin prompt
+    if args.script:
+        summary = parser.run_script(args.script, quiet=args.quiet)
+        print(parser.format_script_summary(args.script, summary))
+        persist(network, config_manager)
+        return
     
     # Bucle principal de comandos
     try:
@@ -91,9 +177,7 @@ def main():
                     continue
                     
                 if command.lower() in ['exit', 'quit']:
-                    print("Guardando configuración antes de salir...")
-                    config_manager.save_config(network, config_file)
-                    print("¡Hasta luego!")
+                    save_on_exit(network, config_manager, autosave)
                     break
                     
                 result = parser.parse_command(command)
@@ -101,17 +185,17 @@ def main():
                     print(result)
                     
             except KeyboardInterrupt:
-                print("\nGuardando configuración antes de salir...")
-                config_manager.save_config(network, config_file)
-                print("¡Hasta luego!")
+                print()
+                save_on_exit(network, config_manager, autosave)
                 break
+            except EOFError:
+                raise  # Fin de la entrada (p. ej. redirigida): se sale guardando
             except Exception as e:
                 print(f"Error: {e}")
                 
     except EOFError:
-        print("\nGuardando configuración antes de salir...")
-        config_manager.save_config(network, config_file)
-        print("¡Hasta luego!")
+        print()
+        save_on_exit(network, config_manager, autosave)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
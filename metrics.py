@@ -0,0 +1,265 @@
+"""
+Instrumentación de ticks para el Simulador de Red
+Mide cada tick (tiempo y paquetes por etapa) y la profundidad máxima de las
+colas, y exporta las métricas en el formato de texto de Prometheus
+"""
+
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from data_structures import RingBuffer
+
+RECENT_TICKS = 1000  # Ticks recientes que se conservan con su detalle
+# Límites (segundos) del histograma de duración de los ticks
+TICK_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Contadores de paquetes por (etapa, resultado)
+PACKET_OUTCOMES = (("output", "forwarded"), ("output", "dropped"),
+                   ("input", "delivered"), ("input", "dropped"),
+                   ("vectorized", "processed"), ("vectorized", "delivered"),
+                   ("vectorized", "dropped"))
+
+def _escape(value):
+    """Escapa un valor de etiqueta de Prometheus"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class TickMetrics:
+    """
+    Métricas de los ticks de una red
+
+    Solo existe mientras la instrumentación está activa (network.metrics);
+    desactivada, process_packets no hace más que comprobar que es None. Las
+    colas se muestrean cuando alcanzan su profundidad máxima dentro del
+    tick: las de salida al empezarlo (con los paquetes enviados y los
+    reenviados en el tick anterior) y las de entrada tras la etapa de salida.
+    """
+
+    def __init__(self, recent_ticks=RECENT_TICKS):
+        self.lock = threading.Lock()  # La exportación HTTP lee desde otro hilo
+        self.recent = RingBuffer(recent_ticks)
+        self.reset()
+
+    def reset(self):
+        """Pone a cero todas las métricas"""
+        with self.lock:
+            self.ticks = 0
+            self.tick_seconds_sum = 0.0
+            self.tick_seconds_max = 0.0
+            self.tick_buckets = [0] * len(TICK_BUCKETS)
+            self.stage_seconds = {"output": 0.0, "input": 0.0}
+            self.packets = dict.fromkeys(PACKET_OUTCOMES, 0)
+            self.queue_high_water = {}  # (dispositivo, interfaz, cola) -> profundidad máxima
+            self.recent.clear()
+
+    def sample_queues(self, interfaces, queue):
+        """Actualiza la profundidad máxima de una cola ('input' u 'output') de las interfaces dadas"""
+        with self.lock:
+            high_water = self.queue_high_water
+            for interface in interfaces:
+                depth = len(interface.input_queue if queue == "input" else interface.output_queue)
+                if depth:
+                    key = (interface.device.name, interface.name, queue)
+                    if depth > high_water.get(key, 0):
+                        high_water[key] = depth
+
+    def record_tick(self, seconds, result, stage_seconds=None):
+        """
+        Registra un tick terminado
+
+        Args:
+            seconds (float): Duración total del tick
+            result (dict): Paquetes por etapa y resultado ((etapa, resultado) -> n)
+            stage_seconds (dict): Duración de cada etapa, si se midió
+        """
+        with self.lock:
+            self.ticks += 1
+            self.tick_seconds_sum += seconds
+            if seconds > self.tick_seconds_max:
+                self.tick_seconds_max = seconds
+            for index, bound in enumerate(TICK_BUCKETS):
+                if seconds <= bound:
+                    self.tick_buckets[index] += 1
+                    break
+            for key, count in result.items():
+                self.packets[key] += count
+            if stage_seconds:
+                for stage, elapsed in stage_seconds.items():
+                    self.stage_seconds[stage] += elapsed
+            self.recent.push((self.ticks, seconds, sum(result.values())))
+
+    def summary(self):
+        """Resumen legible de las métricas"""
+        with self.lock:
+            if not self.ticks:
+                return "Métricas: sin ticks registrados"
+            average = self.tick_seconds_sum / self.ticks
+            lines = [f"Métricas de {self.ticks} ticks: medio {average * 1000:.3f} ms, "
+                     f"máximo {self.tick_seconds_max * 1000:.3f} ms"]
+            for stage, elapsed in self.stage_seconds.items():
+                if elapsed:
+                    lines.append(f"  Etapa {stage}: {elapsed * 1000:.3f} ms en total")
+            for (stage, outcome), count in self.packets.items():
+                if count:
+                    lines.append(f"  Paquetes {stage}/{outcome}: {count}")
+            deepest = sorted(self.queue_high_water.items(), key=lambda item: -item[1])[:5]
+            for (device_name, interface_name, queue), depth in deepest:
+                lines.append(f"  Cola {queue} de {device_name} {interface_name}: máximo {depth}")
+            return "\n".join(lines)
+
+    def render(self, network=None, network_lock=None):
+        """
+        Retorna las métricas en el formato de texto de Prometheus
+
+        Args:
+            network: Si se indica, se añaden los contadores globales de la red
+            network_lock: Candado con el que se modifica la red, si se
+                          exporta desde otro hilo (ConfigManager.lock)
+        """
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        with self.lock:
+            metric("simulator_ticks_total", "counter", "Ticks procesados", [((), self.ticks)])
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(TICK_BUCKETS, self.tick_buckets):
+                cumulative += count
+                buckets.append(((("le", bound),), cumulative))
+            buckets.append(((("le", "+Inf"),), self.ticks))
+            lines.append("# HELP simulator_tick_seconds Duración de cada tick")
+            lines.append("# TYPE simulator_tick_seconds histogram")
+            for labels, value in buckets:
+                lines.append(f'simulator_tick_seconds_bucket{{le="{labels[0][1]}"}} {value}')
+            lines.append(f"simulator_tick_seconds_sum {self.tick_seconds_sum}")
+            lines.append(f"simulator_tick_seconds_count {self.ticks}")
+            metric("simulator_tick_seconds_max", "gauge", "Duración del tick más lento",
+                   [((), self.tick_seconds_max)])
+            metric("simulator_stage_seconds_total", "counter", "Tiempo acumulado por etapa del tick",
+                   [((("stage", stage),), elapsed) for stage, elapsed in self.stage_seconds.items()])
+            metric("simulator_tick_packets_total", "counter", "Paquetes por etapa y resultado",
+                   [((("stage", stage), ("outcome", outcome)), count)
+                    for (stage, outcome), count in self.packets.items()])
+            metric("simulator_queue_depth_max", "gauge", "Profundidad máxima observada de cada cola",
+                   [((("device", device_name), ("interface", interface_name), ("queue", queue)), depth)
+                    for (device_name, interface_name, queue), depth
+                    in sorted(self.queue_high_water.items())])
+
+        if network is not None:
+            # Copia de los contadores con la red quieta: la CLI puede estar modificándola
+            with network_lock or nullcontext():
+                stats = network.get_network_statistics()
+                total_hops = network.global_statistics["total_hops"]
+            metric("simulator_devices", "gauge", "Dispositivos por tipo",
+                   [((("type", device_type),), counts["total"])
+                    for device_type, counts in sorted(stats["devices_by_type"].items())])
+            metric("simulator_devices_online", "gauge", "Dispositivos en línea por tipo",
+                   [((("type", device_type),), counts["online"])
+                    for device_type, counts in sorted(stats["devices_by_type"].items())])
+            metric("simulator_connections", "gauge", "Conexiones entre interfaces",
+                   [((), stats["total_connections"])])
+            for key in ("total_packets_sent", "total_packets_delivered", "total_packets_dropped"):
+                metric(f"simulator_{key[len('total_'):]}_total", "counter", f"Contador global {key}",
+                       [((), stats[key])])
+            metric("simulator_hops_total", "counter", "Saltos de los paquetes entregados",
+                   [((), total_hops)])
+        return "\n".join(lines) + "\n"
+
+    def export(self, filename, network=None):
+        """Escribe las métricas en un archivo (de forma atómica, para recolectores de texto)"""
+        temporary = filename + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(self.render(network))
+        os.replace(temporary, filename)
+
+class MetricsServer:
+    """Servidor HTTP local que publica las métricas en /metrics"""
+
+    def __init__(self, network, host="127.0.0.1", port=9100, lock=None):
+        """
+        Args:
+            network: Red cuyas métricas se publican
+            lock: Candado con el que se modifica la red (las peticiones llegan
+                  en otro hilo); sin él, los contadores de la red se leen sin sincronizar
+        """
+        self.network = network
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                metrics = network.metrics
+                if handler.path != "/metrics" or metrics is None:
+                    handler.send_error(404)
+                    return
+                body = metrics.render(network, lock).encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass  # Sin trazas por petición en la consola del simulador
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True)
+        self.thread.start()
+
+    @property
+    def address(self):
+        """(host, puerto) en que escucha el servidor"""
+        return self.server.server_address[:2]
+
+    def stop(self):
+        """Detiene el servidor"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+def timed_tick(network, metrics):
+    """
+    Ejecuta un tick midiendo cada etapa (ver Network.process_packets)
+
+    Returns:
+        dict: Paquetes procesados, entregados y descartados
+    """
+    if network.packet_store is not None:
+        start = time.perf_counter()
+        result = network.packet_store.tick()
+        metrics.record_tick(time.perf_counter() - start, {
+            ("vectorized", "processed"): result["processed"],
+            ("vectorized", "delivered"): result["delivered"],
+            ("vectorized", "dropped"): result["dropped"]
+        })
+        return result
+
+    start = time.perf_counter()
+    metrics.sample_queues(network.active_interfaces, "output")
+    output_start = time.perf_counter()
+    processed_count, output_dropped = network._output_stage(network._enqueue_arrival)
+    output_end = time.perf_counter()
+    metrics.sample_queues(network.active_interfaces, "input")
+    input_start = time.perf_counter()
+    delivered_count, input_dropped = network._input_stage()
+    input_end = time.perf_counter()
+    network._prune_idle_interfaces()
+    end = time.perf_counter()
+
+    # El muestreo de colas no se atribuye a ninguna etapa, pero sí al tick
+    metrics.record_tick(end - start, {
+        ("output", "forwarded"): processed_count - output_dropped,
+        ("output", "dropped"): output_dropped,
+        ("input", "delivered"): delivered_count,
+        ("input", "dropped"): input_dropped
+    }, {"output": output_end - output_start, "input": input_end - input_start})
+    return {
+        "processed": processed_count,
+        "delivered": delivered_count,
+        "dropped": output_dropped + input_dropped
+    }
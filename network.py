@@ -2,18 +2,42 @@
 Clase Network para gestionar la topología de red y el procesamiento de paquetes
 """
 
-from device import Device, Interface
+from device import Device, Interface, DEFAULT_HISTORY_SIZE
 from packet import Packet
+from routing import RoutingEngine
+from event_engine import EventEngine
+from packet_store import PacketStore, NUMPY_AVAILABLE
+from data_structures import ConnectionStore
+from metrics import TickMetrics, timed_tick
 import time
 
+DEFAULT_LINK_LATENCY = 1.0  # Latencia por defecto de un enlace (ms)
+DEFAULT_LINK_BANDWIDTH = None  # Ancho de banda por defecto (bps); None = ilimitado
+
+def _interface_order(interface):
+    """Clave de orden canónico de una interfaz: (dispositivo, interfaz)"""
+    return (interface.device.name, interface.name)
+
 class Network:
     """Gestiona la topología de red y el procesamiento de paquetes"""
     
     def __init__(self):
         """Inicializa la red"""
         self.devices = {}  # Diccionario de dispositivos por nombre
-        self.connections = []  # Lista de conexiones entre interfaces
+        self.connections = ConnectionStore()  # Conexiones entre interfaces (indexadas por hash)
+        self.link_properties = {}  # Conexión -> (latencia_ms, ancho_de_banda_bps)
         self.current_device = None  # Dispositivo actualmente seleccionado
+        self.ip_index = {}  # Índice IP -> (dispositivo, interfaz)
+        self.duplicate_ips = {}  # IP -> lista de (dispositivo, interfaz) en conflicto
+        self.routing = RoutingEngine(self)  # Tablas de reenvío por dispositivo
+        self.active_interfaces = {}  # Interfaces con paquetes pendientes (conjunto ordenado)
+        self.events = EventEngine(self)  # Simulación por eventos discretos
+        self.history_size = DEFAULT_HISTORY_SIZE  # Capacidad global del historial por dispositivo
+        self.packet_store = None  # Almacén vectorizado opcional (requiere NumPy)
+        self.metrics = None  # Instrumentación de ticks (None = desactivada)
+        # Contadores de dispositivos mantenidos al registrar, eliminar o cambiar de estado
+        self.online_devices = 0
+        self.device_type_counts = {}  # Tipo -> [total, en línea]
         self.global_statistics = {
             "total_packets_sent": 0,
             "total_packets_delivered": 0,
@@ -24,28 +48,228 @@ class Network:
     def add_device(self, name, device_type="host"):
         """Añade un dispositivo a la red"""
         if name not in self.devices:
-            self.devices[name] = Device(name, device_type)
-            if not self.current_device:
-                self.current_device = self.devices[name]
-            return True
+            return self.register_device(Device(name, device_type))
         return False
     
+    def register_device(self, device):
+        """Registra en la red un dispositivo ya construido (con sus interfaces)"""
+        if device.name in self.devices:
+            return False
+        
+        self.devices[device.name] = device
+        device.network = self
+        self._count_device(device, 1)
+        device._apply_history_size()
+        for interface in device.interfaces.values():
+            interface.device = device
+            self._index_interface(device, interface)
+        
+        if not self.current_device:
+            self.current_device = device
+        return True
+    
     def remove_device(self, name):
         """Elimina un dispositivo de la red"""
         if name in self.devices:
-            # Eliminar todas las conexiones del dispositivo
-            self.connections = [conn for conn in self.connections 
-                              if conn[0] != name and conn[2] != name]
+            device = self.devices[name]
+            for interface in device.interfaces.values():
+                self._unindex_interface(interface)
+                self._deactivate_interface(interface)
+            device.network = None
+            self._count_device(device, -1)
+            self._invalidate_routes()
+            
+            # Eliminar las conexiones del dispositivo (O(grado)) y sus vecinos en ambos extremos
+            for connection in self.connections.remove_device(name):
+                self.link_properties.pop(connection, None)
+                self._remove_neighbors(connection)
             
             # Si era el dispositivo actual, cambiar a otro
             if self.current_device and self.current_device.name == name:
-                remaining_devices = [d for d in self.devices.values() if d.name != name]
-                self.current_device = remaining_devices[0] if remaining_devices else None
+                self.current_device = next(
+                    (other for other in self.devices.values() if other.name != name), None
+                )
             
             del self.devices[name]
             return True
         return False
     
+    def clear(self):
+        """Elimina todos los dispositivos y conexiones de la red"""
+        for device in self.devices.values():
+            device.network = None
+        self.devices.clear()
+        self.online_devices = 0
+        self.device_type_counts.clear()
+        self.connections.clear()
+        self.link_properties.clear()
+        self.ip_index.clear()
+        self.duplicate_ips.clear()
+        self.active_interfaces.clear()
+        self.events.reset()
+        if self.packet_store:
+            self.packet_store = PacketStore(self)
+        self.current_device = None
+        self._invalidate_routes()
+    
+    def replace_contents(self, other):
+        """
+        Sustituye los dispositivos y conexiones de la red por los de otra red
+        ya construida (carga en dos fases: se construye aparte y solo se
+        sustituye si la lectura terminó bien)
+        
+        Se conservan este objeto (al que apuntan el parser, el servidor CLI y
+        las métricas), la instrumentación y el modo vectorizado.
+        """
+        for device in self.devices.values():
+            device.network = None
+        self.devices = other.devices
+        for device in self.devices.values():
+            device.network = self
+        self.connections = other.connections
+        self.link_properties = other.link_properties
+        self.ip_index = other.ip_index
+        self.duplicate_ips = other.duplicate_ips
+        self.active_interfaces = other.active_interfaces
+        self.online_devices = other.online_devices
+        self.device_type_counts = other.device_type_counts
+        self.history_size = other.history_size
+        self.global_statistics.clear()
+        self.global_statistics.update(other.global_statistics)
+        self.current_device = other.current_device
+        self.events.reset()
+        if self.packet_store:
+            self.packet_store = PacketStore(self)
+        self._invalidate_routes()
+    
+    def _count_device(self, device, delta):
+        """Suma (delta=1) o resta (delta=-1) un dispositivo de los contadores"""
+        counts = self.device_type_counts.setdefault(device.type, [0, 0])
+        counts[0] += delta
+        if device.is_online():
+            counts[1] += delta
+            self.online_devices += delta
+        if not counts[0]:
+            del self.device_type_counts[device.type]
+    
+    def _device_status_changed(self, device):
+        """Actualiza los contadores tras el cambio de estado de un dispositivo"""
+        delta = 1 if device.is_online() else -1
+        self.device_type_counts[device.type][1] += delta
+        self.online_devices += delta
+    
+    def _activate_interface(self, interface):
+        """Añade una interfaz con paquetes pendientes a la lista de trabajo"""
+        self.active_interfaces[interface] = True
+    
+    def _deactivate_interface(self, interface):
+        """Quita una interfaz de la lista de trabajo"""
+        self.active_interfaces.pop(interface, None)
+    
+    def _pending_interfaces(self):
+        """
+        Retorna las interfaces con paquetes pendientes en orden canónico
+        (dispositivo, interfaz), independiente del orden de llegada
+        
+        Ordenar cuesta O(k log k) por tick (k interfaces pendientes, con una
+        tupla de clave por interfaz) y se asume a propósito: el orden de
+        inserción depende de cómo se llegó al estado (carga de una
+        instantánea, reparto entre procesos), y la simulación en varios
+        procesos reconstruye este mismo orden para dar el mismo resultado
+        que un solo proceso (ver sharding).
+        """
+        return sorted(self.active_interfaces, key=_interface_order)
+    
+    def _invalidate_routes(self):
+        """Descarta las tablas de reenvío tras un cambio de topología o estado"""
+        self.routing.invalidate()
+    
+    def _invalidate_addresses(self):
+        """Descarta las FIB tras un cambio de direcciones (la topología no cambia)"""
+        self.routing.invalidate_addresses()
+    
+    def _index_interface(self, device, interface):
+        """Registra la IP de una interfaz en el índice de la red"""
+        ip_address = interface.ip_address
+        if not ip_address:
+            return
+        
+        self._invalidate_addresses()
+        owner = self.ip_index.get(ip_address)
+        if owner is None:
+            self.ip_index[ip_address] = (device, interface)
+        elif owner[1] is not interface:
+            # IP duplicada: se conserva el primer propietario y se anota el conflicto
+            self.duplicate_ips.setdefault(ip_address, []).append((device, interface))
+    
+    def _unindex_interface(self, interface):
+        """Elimina la IP de una interfaz del índice de la red"""
+        ip_address = interface.ip_address
+        if not ip_address:
+            return
+        
+        self._invalidate_addresses()
+        conflicts = self.duplicate_ips.get(ip_address, [])
+        owner = self.ip_index.get(ip_address)
+        if owner and owner[1] is interface:
+            if conflicts:
+                # Promover al siguiente propietario en conflicto
+                self.ip_index[ip_address] = conflicts.pop(0)
+            else:
+                del self.ip_index[ip_address]
+        else:
+            conflicts[:] = [entry for entry in conflicts if entry[1] is not interface]
+        
+        if ip_address in self.duplicate_ips and not conflicts:
+            del self.duplicate_ips[ip_address]
+    
+    def find_interface_by_ip(self, ip_address):
+        """Retorna (dispositivo, interfaz) con la IP dada o (None, None) en O(1)"""
+        return self.ip_index.get(ip_address, (None, None))
+    
+    def get_duplicate_ips(self):
+        """Retorna las IPs duplicadas con la lista de 'dispositivo interfaz' que las usan"""
+        duplicates = {}
+        for ip_address, conflicts in self.duplicate_ips.items():
+            owners = [self.ip_index[ip_address]] + conflicts
+            duplicates[ip_address] = [f"{device.name} {interface.name}" 
+                                      for device, interface in owners]
+        return duplicates
+    
+    def enable_metrics(self, enabled=True):
+        """Activa o desactiva la instrumentación de ticks (ver metrics)"""
+        if enabled:
+            if self.metrics is None:
+                self.metrics = TickMetrics()
+            return True, "Instrumentación de ticks activada"
+        self.metrics = None
+        return True, "Instrumentación de ticks desactivada"
+    
+    def enable_packet_store(self, enabled=True):
+        """
+        Activa o desactiva el procesamiento vectorizado de paquetes (NumPy)
+        
+        Al desactivarlo los paquetes en vuelo vuelven a las colas de las
+        interfaces y se continúa con el procesamiento por objetos.
+        """
+        if enabled:
+            if not NUMPY_AVAILABLE:
+                return False, "NumPy no está disponible; se mantiene el procesamiento por objetos"
+            if self.packet_store is None:
+                self.packet_store = PacketStore(self)
+            return True, "Procesamiento vectorizado de paquetes activado"
+        
+        if self.packet_store is not None:
+            self.packet_store.flush_to_queues()
+            self.packet_store = None
+        return True, "Procesamiento vectorizado de paquetes desactivado"
+    
+    def set_history_size(self, history_size):
+        """Establece la capacidad global del historial de los dispositivos"""
+        self.history_size = history_size
+        for device in self.devices.values():
+            device._apply_history_size()
+    
     def get_device(self, name):
         """Obtiene un dispositivo por nombre"""
         return self.devices.get(name)
@@ -61,8 +285,15 @@ class Network:
             return True
         return False
     
-    def connect_interfaces(self, device1_name, interface1_name, device2_name, interface2_name):
-        """Conecta dos interfaces de dispositivos diferentes"""
+    def connect_interfaces(self, device1_name, interface1_name, device2_name, interface2_name,
+                           latency=None, bandwidth=None):
+        """
+        Conecta dos interfaces de dispositivos diferentes
+        
+        Args:
+            latency (float): Latencia del enlace en ms (por defecto DEFAULT_LINK_LATENCY)
+            bandwidth (float): Ancho de banda en bps (por defecto ilimitado)
+        """
         device1 = self.get_device(device1_name)
         device2 = self.get_device(device2_name)
         
@@ -75,23 +306,72 @@ class Network:
         if not interface1 or not interface2:
             return False, "Una o ambas interfaces no existen"
         
-        # Crear la conexión bidireccional
+        # Crear la conexión bidireccional (falla si ya existe en cualquier sentido)
         connection = (device1_name, interface1_name, device2_name, interface2_name)
-        reverse_connection = (device2_name, interface2_name, device1_name, interface1_name)
-        
-        # Verificar que no exista ya la conexión
-        if connection in self.connections or reverse_connection in self.connections:
+        if not self.connections.add(connection):
             return False, "La conexión ya existe"
         
         # Añadir vecinos a las interfaces
         interface1.add_neighbor((device2_name, interface2_name))
         interface2.add_neighbor((device1_name, interface1_name))
-        
-        # Añadir a la lista de conexiones
-        self.connections.append(connection)
+        if latency is not None or bandwidth is not None:
+            self.link_properties[connection] = (
+                DEFAULT_LINK_LATENCY if latency is None else latency,
+                bandwidth
+            )
+        self._invalidate_routes()
         
         return True, "Conexión establecida exitosamente"
     
+    def connect_bulk(self, links):
+        """
+        Conecta muchas interfaces de una vez (importación masiva)
+        
+        Los vecinos se añaden en una sola pasada al final sin comprobar si ya
+        existen (los duplicados ya se rechazan en el conjunto de conexiones),
+        y las rutas se invalidan una vez.
+        
+        Args:
+            links: Secuencia de (dispositivo1, interfaz1, dispositivo2, interfaz2,
+                latencia, ancho_de_banda); latencia y ancho de banda pueden ser None
+        
+        Returns:
+            list: (posición en links, mensaje) de cada enlace rechazado
+        """
+        accepted = []
+        errors = []
+        for position, (device1_name, interface1_name, device2_name, interface2_name,
+                       latency, bandwidth) in enumerate(links):
+            device1 = self.devices.get(device1_name)
+            device2 = self.devices.get(device2_name)
+            if not device1 or not device2:
+                errors.append((position, "Uno o ambos dispositivos no existen"))
+                continue
+            interface1 = device1.interfaces.get(interface1_name)
+            interface2 = device2.interfaces.get(interface2_name)
+            if not interface1 or not interface2:
+                errors.append((position, "Una o ambas interfaces no existen"))
+                continue
+            
+            connection = (device1_name, interface1_name, device2_name, interface2_name)
+            if not self.connections.add(connection):
+                errors.append((position, "La conexión ya existe"))
+                continue
+            if latency is not None or bandwidth is not None:
+                self.link_properties[connection] = (
+                    DEFAULT_LINK_LATENCY if latency is None else latency,
+                    bandwidth
+                )
+            accepted.append((interface1, interface2, connection))
+        
+        for interface1, interface2, connection in accepted:
+            interface1.neighbors.append((connection[2], connection[3]))
+            if interface2 is not interface1:
+                interface2.neighbors.append((connection[0], connection[1]))
+        if accepted:
+            self._invalidate_routes()
+        return errors
+    
     def disconnect_interfaces(self, device1_name, interface1_name, device2_name, interface2_name):
         """Desconecta dos interfaces"""
         device1 = self.get_device(device1_name)
@@ -106,23 +386,63 @@ class Network:
         if not interface1 or not interface2:
             return False, "Una o ambas interfaces no existen"
         
-        # Buscar y eliminar la conexión
-        connection = (device1_name, interface1_name, device2_name, interface2_name)
-        reverse_connection = (device2_name, interface2_name, device1_name, interface1_name)
-        
-        if connection in self.connections:
-            self.connections.remove(connection)
-        elif reverse_connection in self.connections:
-            self.connections.remove(reverse_connection)
-        else:
+        # Buscar y eliminar la conexión (en cualquier sentido)
+        connection = self.connections.remove(
+            (device1_name, interface1_name, device2_name, interface2_name)
+        )
+        if connection is None:
             return False, "La conexión no existe"
+        self.link_properties.pop(connection, None)
         
         # Eliminar vecinos de las interfaces
         interface1.remove_neighbor((device2_name, interface2_name))
         interface2.remove_neighbor((device1_name, interface1_name))
+        self._invalidate_routes()
         
         return True, "Conexión eliminada exitosamente"
     
+    def _remove_neighbors(self, connection):
+        """Quita de ambos extremos de una conexión la referencia al otro"""
+        device1_name, interface1_name, device2_name, interface2_name = connection
+        for device_name, interface_name, neighbor in (
+                (device1_name, interface1_name, (device2_name, interface2_name)),
+                (device2_name, interface2_name, (device1_name, interface1_name))):
+            device = self.devices.get(device_name)
+            interface = device.interfaces.get(interface_name) if device else None
+            if interface:
+                interface.remove_neighbor(neighbor)
+    
+    def get_link_properties(self, device1_name, interface1_name, device2_name, interface2_name):
+        """Retorna (latencia_ms, ancho_de_banda_bps) de un enlace en cualquier sentido"""
+        properties = self.link_properties.get(
+            (device1_name, interface1_name, device2_name, interface2_name)
+        )
+        if properties is None:
+            properties = self.link_properties.get(
+                (device2_name, interface2_name, device1_name, interface1_name)
+            )
+        if properties is None:
+            return DEFAULT_LINK_LATENCY, DEFAULT_LINK_BANDWIDTH
+        return properties
+    
+    def set_link_properties(self, device1_name, interface1_name, device2_name, interface2_name,
+                            latency=None, bandwidth=None):
+        """Cambia la latencia y/o el ancho de banda de un enlace existente"""
+        connection = self.connections.find(
+            (device1_name, interface1_name, device2_name, interface2_name)
+        )
+        if connection is None:
+            return False, "La conexión no existe"
+        
+        current_latency, current_bandwidth = self.link_properties.get(
+            connection, (DEFAULT_LINK_LATENCY, DEFAULT_LINK_BANDWIDTH)
+        )
+        self.link_properties[connection] = (
+            current_latency if latency is None else latency,
+            current_bandwidth if bandwidth is None else bandwidth
+        )
+        return True, "Propiedades del enlace actualizadas"
+    
     def send_packet(self, source_ip, destination_ip, message, ttl=10):
         """Envía un paquete desde una IP origen a una IP destino"""
         # Crear el paquete
@@ -130,17 +450,7 @@ class Network:
         packet.timestamp = time.time()
         
         # Encontrar la interfaz origen
-        source_interface = None
-        source_device = None
-        
-        for device in self.devices.values():
-            for interface in device.get_interfaces():
-                if interface.ip_address == source_ip:
-                    source_interface = interface
-                    source_device = device
-                    break
-            if source_interface:
-                break
+        source_device, source_interface = self.find_interface_by_ip(source_ip)
         
         if not source_interface:
             return False, f"No se encontró interfaz con IP {source_ip}"
@@ -148,117 +458,242 @@ class Network:
         # Añadir el dispositivo origen al camino
         packet.add_hop(source_device.name)
         
-        # Encolar en la interfaz origen
+        # Encolar en la interfaz de salida que indique la tabla de rutas
+        route = self._next_hop(source_device, destination_ip)
+        if route:
+            source_interface = source_device.get_interface(route[0])
         source_interface.enqueue_output(packet)
         self.global_statistics["total_packets_sent"] += 1
         
         return True, "Paquete encolado para envío"
     
+    def send_packets(self, packets):
+        """
+        Envía un lote de paquetes
+        
+        La interfaz origen se resuelve una vez por IP origen distinta y la
+        interfaz de salida una vez por par (origen, destino); todos los
+        paquetes del lote comparten la marca de tiempo.
+        
+        Args:
+            packets: Iterable de tuplas (source_ip, destination_ip, message[, ttl]);
+                las entradas None (líneas ilegibles) cuentan como rechazadas
+        
+        Returns:
+            dict: Paquetes aceptados y rechazados
+        """
+        accepted_count = 0
+        rejected_count = 0
+        timestamp = time.time()
+        sources = {}  # IP origen -> (dispositivo, interfaz) o None
+        exits = {}  # (IP origen, IP destino) -> interfaz de salida
+        
+        for entry in packets:
+            if entry is None:
+                rejected_count += 1
+                continue
+            source_ip, destination_ip, message = entry[0], entry[1], entry[2]
+            ttl = entry[3] if len(entry) > 3 else 10
+            
+            if source_ip not in sources:
+                source = self.find_interface_by_ip(source_ip)
+                sources[source_ip] = source if source[1] else None
+            source = sources[source_ip]
+            if source is None:
+                rejected_count += 1
+                continue
+            source_device, source_interface = source
+            
+            exit_interface = exits.get((source_ip, destination_ip))
+            if exit_interface is None:
+                route = self._next_hop(source_device, destination_ip)
+                exit_interface = source_device.get_interface(route[0]) if route else source_interface
+                exits[(source_ip, destination_ip)] = exit_interface
+            
+            packet = Packet(source_ip, destination_ip, message, ttl)
+            packet.timestamp = timestamp
+            packet.add_hop(source_device.name)
+            exit_interface.enqueue_output(packet)
+            accepted_count += 1
+        
+        self.global_statistics["total_packets_sent"] += accepted_count
+        return {
+            "accepted": accepted_count,
+            "rejected": rejected_count
+        }
+    
+    def _next_hop(self, device, destination_ip):
+        """
+        Retorna la ruta desde un dispositivo hacia una IP o None
+        
+        Se consulta la FIB del dispositivo (prefijo más largo). Si la IP
+        pertenece a una red directamente conectada, el host concreto se
+        resuelve con el índice de IPs y la tabla de reenvío por dispositivo.
+        """
+        route = self.routing.lookup(device.name, destination_ip)
+        if route and route[1] is None:
+            destination_device, _ = self.find_interface_by_ip(destination_ip)
+            if destination_device is None or destination_device is device:
+                return None
+            route = self.routing.get_next_hop(device.name, destination_device.name)
+        return route
+    
+    def _drop_packet(self, device):
+        """Contabiliza un paquete descartado en un dispositivo"""
+        if device:
+            device.packets_dropped += 1
+        self.global_statistics["total_packets_dropped"] += 1
+    
+    def _deliver_packet(self, device, packet):
+        """Registra la entrega de un paquete en su dispositivo destino"""
+        device.add_to_history(packet)
+        self.global_statistics["total_packets_delivered"] += 1
+        # El camino incluye el dispositivo origen: los saltos son los enlaces recorridos
+        self.global_statistics["total_hops"] += max(len(packet.path) - 1, 0)
+    
     def process_packets(self):
-        """Procesa todos los paquetes en las colas de la red"""
+        """
+        Procesa todos los paquetes en las colas de la red
+        
+        Solo se recorren las interfaces de la lista de trabajo (las que
+        tienen paquetes en alguna cola), por lo que el coste de un tick
+        depende de los paquetes en vuelo y no del tamaño de la topología.
+        En cada tick los paquetes de las colas de salida avanzan un salto
+        por la ruta más corta hacia la cola de entrada del siguiente
+        dispositivo; después, las colas de entrada entregan los paquetes que
+        han llegado a su destino y encolan el resto en la interfaz de salida
+        indicada por la tabla de reenvío.
+        """
+        if self.metrics is not None:
+            return timed_tick(self, self.metrics)
+        if self.packet_store is not None:
+            return self.packet_store.tick()
+        
+        processed_count, output_dropped = self._output_stage(self._enqueue_arrival)
+        delivered_count, input_dropped = self._input_stage()
+        self._prune_idle_interfaces()
+        
+        return {
+            "processed": processed_count,
+            "delivered": delivered_count,
+            "dropped": output_dropped + input_dropped
+        }
+    
+    def _enqueue_arrival(self, sender_interface, interface, packet):
+        """Deja un paquete recién llegado en la cola de entrada de la interfaz"""
+        interface.enqueue_input(packet)
+    
+    def _output_stage(self, arrive):
+        """
+        Etapa de salida: los paquetes de las colas de salida avanzan un salto
+        
+        Args:
+            arrive: Función (interfaz_emisora, interfaz_destino, paquete) que
+                recibe cada llegada; el modo fragmentado la usa para diferir
+                las llegadas a interfaces de otros procesos
+        
+        Returns:
+            tuple: (paquetes procesados, paquetes descartados)
+        """
         processed_count = 0
-        delivered_count = 0
         dropped_count = 0
         
-        # Procesar paquetes de salida de todas las interfaces
-        for device in self.devices.values():
-            if not device.is_online():
+        # Procesar paquetes de salida de las interfaces con paquetes pendientes
+        for interface in self._pending_interfaces():
+            device = interface.device
+            if not device.is_online() or not interface.is_up():
                 continue
+            
+            # Procesar cola de salida
+            while interface.has_output_packets():
+                packet = interface.dequeue_output()
+                processed_count += 1
                 
-            for interface in device.get_interfaces():
-                if not interface.is_up():
+                # Verificar si el paquete ha expirado
+                if packet.is_expired():
+                    dropped_count += 1
+                    self._drop_packet(device)
                     continue
                 
-                # Procesar cola de salida
-                while interface.has_output_packets():
-                    packet = interface.dequeue_output()
-                    processed_count += 1
-                    
-                    # Verificar si el paquete ha expirado
-                    if packet.is_expired():
-                        dropped_count += 1
-                        device.packets_dropped += 1
-                        self.global_statistics["total_packets_dropped"] += 1
-                        continue
-                    
-                    # Decrementar TTL
-                    packet.decrement_ttl()
-                    
-                    # Buscar interfaz destino
-                    destination_interface = None
-                    destination_device = None
-                    
-                    for d in self.devices.values():
-                        for i in d.get_interfaces():
-                            if i.ip_address == packet.destination_ip:
-                                destination_interface = i
-                                destination_device = d
-                                break
-                        if destination_interface:
-                            break
-                    
-                    # Si encontramos el destino
-                    if destination_interface and destination_device.is_online():
-                        packet.add_hop(destination_device.name)
-                        destination_interface.enqueue_input(packet)
-                        delivered_count += 1
-                        self.global_statistics["total_packets_delivered"] += 1
-                        destination_device.add_to_history(packet)
-                    else:
-                        # Reenviar a vecinos
-                        forwarded = False
-                        for neighbor_device_name, neighbor_interface_name in interface.get_neighbors():
-                            neighbor_device = self.get_device(neighbor_device_name)
-                            if neighbor_device and neighbor_device.is_online():
-                                neighbor_interface = neighbor_device.get_interface(neighbor_interface_name)
-                                if neighbor_interface and neighbor_interface.is_up():
-                                    packet.add_hop(neighbor_device.name)
-                                    neighbor_interface.enqueue_input(packet)
-                                    forwarded = True
-                                    break
-                        
-                        if not forwarded:
-                            dropped_count += 1
-                            device.packets_dropped += 1
-                            self.global_statistics["total_packets_dropped"] += 1
-        
-        # Procesar paquetes de entrada (mover a cola de salida si es necesario)
-        for device in self.devices.values():
-            if not device.is_online():
+                # Decrementar TTL
+                packet.decrement_ttl()
+                
+                # Buscar interfaz destino
+                destination_device, destination_interface = self.find_interface_by_ip(
+                    packet.destination_ip
+                )
+                
+                # Destino en el propio dispositivo: pasa directamente a la entrada
+                if destination_device is device:
+                    arrive(interface, destination_interface, packet)
+                    continue
+                
+                # Siguiente salto según la tabla de reenvío
+                route = self._next_hop(device, packet.destination_ip)
+                if not route:
+                    dropped_count += 1
+                    self._drop_packet(device)
+                    continue
+                
+                _, next_device_name, next_interface_name, _ = route
+                next_interface = self.devices[next_device_name].get_interface(next_interface_name)
+                packet.add_hop(next_device_name)
+                arrive(interface, next_interface, packet)
+        
+        return processed_count, dropped_count
+    
+    def _input_stage(self):
+        """
+        Etapa de entrada: entregar los paquetes que llegaron a su destino y
+        mover el resto a la cola de salida que indique la tabla de reenvío
+        
+        Returns:
+            tuple: (paquetes entregados, paquetes descartados)
+        """
+        delivered_count = 0
+        dropped_count = 0
+        
+        for interface in self._pending_interfaces():
+            device = interface.device
+            if not device.is_online() or not interface.is_up():
                 continue
+            
+            while interface.has_input_packets():
+                packet = interface.dequeue_input()
+                destination_device, _ = self.find_interface_by_ip(packet.destination_ip)
                 
-            for interface in device.get_interfaces():
-                if not interface.is_up():
+                # Si es el destino final
+                if destination_device is device:
+                    self._deliver_packet(device, packet)
+                    delivered_count += 1
                     continue
                 
-                while interface.has_input_packets():
-                    packet = interface.dequeue_input()
-                    
-                    # Si es el destino final
-                    if interface.ip_address == packet.destination_ip:
-                        device.add_to_history(packet)
-                    else:
-                        # Reenviar a otra interfaz del mismo dispositivo
-                        for other_interface in device.get_interfaces():
-                            if other_interface != interface and other_interface.is_up():
-                                for neighbor_device_name, neighbor_interface_name in other_interface.get_neighbors():
-                                    neighbor_device = self.get_device(neighbor_device_name)
-                                    if neighbor_device and neighbor_device.is_online():
-                                        neighbor_interface = neighbor_device.get_interface(neighbor_interface_name)
-                                        if neighbor_interface and neighbor_interface.is_up():
-                                            other_interface.enqueue_output(packet)
-                                            break
+                # Reenviar por la interfaz que indique la tabla de reenvío
+                route = self._next_hop(device, packet.destination_ip)
+                if route:
+                    device.get_interface(route[0]).enqueue_output(packet)
+                else:
+                    dropped_count += 1
+                    self._drop_packet(device)
         
-        return {
-            "processed": processed_count,
-            "delivered": delivered_count,
-            "dropped": dropped_count
-        }
+        return delivered_count, dropped_count
+    
+    def _prune_idle_interfaces(self):
+        """Retira de la lista de trabajo las interfaces que quedaron vacías"""
+        idle_interfaces = [interface for interface in self.active_interfaces
+                           if not interface.has_input_packets()
+                           and not interface.has_output_packets()]
+        for interface in idle_interfaces:
+            del self.active_interfaces[interface]
     
     def get_network_statistics(self):
-        """Retorna estadísticas globales de la red"""
+        """
+        Retorna estadísticas globales de la red
+        
+        Todos los valores se mantienen de forma incremental, por lo que la
+        consulta no recorre los dispositivos (solo los tipos distintos).
+        """
         total_devices = len(self.devices)
-        online_devices = sum(1 for d in self.devices.values() if d.is_online())
         total_connections = len(self.connections)
         
         avg_hops = 0
@@ -267,7 +702,10 @@ class Network:
         
         return {
             "total_devices": total_devices,
-            "online_devices": online_devices,
+            "online_devices": self.online_devices,
+            "offline_devices": total_devices - self.online_devices,
+            "devices_by_type": {device_type: {"total": total, "online": online}
+                                for device_type, (total, online) in self.device_type_counts.items()},
             "total_connections": total_connections,
             "total_packets_sent": self.global_statistics["total_packets_sent"],
             "total_packets_delivered": self.global_statistics["total_packets_delivered"],
@@ -276,12 +714,15 @@ class Network:
         }
     
     def to_dict(self):
-        """Convierte la red a diccionario para serialización"""
+        """Convierte la red a diccionario para serialización (sin compartir listas con la red)"""
         return {
             "devices": {name: device.to_dict() for name, device in self.devices.items()},
-            "connections": self.connections,
+            "connections": self.connections.to_list(),
+            "link_properties": [list(connection) + [latency, bandwidth]
+                                for connection, (latency, bandwidth) in self.link_properties.items()],
             "current_device": self.current_device.name if self.current_device else None,
-            "global_statistics": self.global_statistics
+            "history_size": self.history_size,
+            "global_statistics": dict(self.global_statistics)
         }
     
     def __str__(self):
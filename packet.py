@@ -3,11 +3,45 @@ Clase Packet para simular paquetes de red
 Encapsula toda la información necesaria para el envío de datos
 """
 
-import uuid
-from data_structures import LinkedList
+import itertools
+from array import array
+
+# Contador global de identificadores de paquete (monótono creciente)
+_packet_counter = itertools.count(1)
+
+# Tabla de nombres de dispositivo internados: el camino de cada paquete
+# guarda índices de 32 bits en lugar de referencias a cadenas
+_device_names = []
+_device_indices = {}
+
+def intern_device_name(device_name):
+    """Retorna el índice interno de un nombre de dispositivo, registrándolo si es nuevo"""
+    index = _device_indices.get(device_name)
+    if index is None:
+        index = len(_device_names)
+        _device_names.append(device_name)
+        _device_indices[device_name] = index
+    return index
+
+def device_name_at(index):
+    """Retorna el nombre de dispositivo de un índice interno"""
+    return _device_names[index]
+
+def format_path(path):
+    """Formatea un camino (índices internados) como 'A → B → C'"""
+    if not path:
+        return "Sin camino registrado"
+    return " → ".join([_device_names[index] for index in path])
 
 class Packet:
-    """Representa un paquete de red con toda su información"""
+    """
+    Representa un paquete de red con toda su información
+    
+    Usa __slots__, un identificador entero consecutivo (con forma de
+    texto opcional en id) y el camino como array('I') de índices de
+    dispositivo internados, para minimizar memoria con millones de paquetes.
+    """
+    __slots__ = ("number", "source_ip", "destination_ip", "message", "ttl", "path", "timestamp")
     
     def __init__(self, source_ip, destination_ip, message, ttl=10):
         """
@@ -19,17 +53,30 @@ class Packet:
             message (str): Contenido del mensaje
             ttl (int): Time To Live - número máximo de saltos
         """
-        self.id = str(uuid.uuid4())[:8]  # ID único corto
+        self.number = next(_packet_counter)  # ID único entero
         self.source_ip = source_ip
         self.destination_ip = destination_ip
         self.message = message
         self.ttl = ttl
-        self.path = LinkedList()  # Lista enlazada para el camino recorrido
+        self.path = array('I')  # Índices de los dispositivos del camino recorrido
         self.timestamp = None  # Se establecerá al enviar
     
+    @property
+    def id(self):
+        """ID en forma de texto (8 dígitos hexadecimales)"""
+        return f"{self.number:08x}"
+    
     def add_hop(self, device_name):
         """Añade un salto al camino del paquete"""
-        self.path.append(device_name)
+        self.path.append(intern_device_name(device_name))
+    
+    def get_path(self):
+        """Retorna el camino como lista de nombres de dispositivo"""
+        return [_device_names[index] for index in self.path]
+    
+    def get_hop_count(self):
+        """Retorna el número de dispositivos del camino"""
+        return len(self.path)
     
     def decrement_ttl(self):
         """Decrementa el TTL del paquete"""
@@ -43,10 +90,7 @@ class Packet:
     
     def get_path_string(self):
         """Retorna el camino como string para mostrar"""
-        path_list = self.path.to_list()
-        if not path_list:
-            return "Sin camino registrado"
-        return " → ".join(path_list)
+        return format_path(self.path)
     
     def to_dict(self):
         """Convierte el paquete a diccionario para serialización"""
@@ -56,10 +100,21 @@ class Packet:
             "destination_ip": self.destination_ip,
             "message": self.message,
             "ttl": self.ttl,
-            "path": self.path.to_list(),
+            "path": self.get_path(),
             "timestamp": self.timestamp
         }
     
+    def __getstate__(self):
+        """Serializa el camino por nombre: los índices internados son locales al proceso"""
+        return (self.number, self.source_ip, self.destination_ip, self.message,
+                self.ttl, self.get_path(), self.timestamp)
+    
+    def __setstate__(self, state):
+        """Reconstruye el paquete internando de nuevo los nombres del camino"""
+        (self.number, self.source_ip, self.destination_ip, self.message,
+         self.ttl, path, self.timestamp) = state
+        self.path = array('I', [intern_device_name(name) for name in path])
+    
     def __str__(self):
         """Representación string del paquete"""
         return (f"Packet {self.id}: {self.source_ip} → {self.destination_ip} "
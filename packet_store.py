@@ -0,0 +1,308 @@
+"""
+Almacén vectorizado de paquetes en vuelo para el Simulador de Red
+Guarda los campos de los paquetes en arrays de NumPy (estructura de arrays)
+para procesar un tick completo con operaciones por lotes
+"""
+
+from ip_utils import ip_to_int, int_to_ip
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usa el procesamiento por objetos
+    np = None
+
+NUMPY_AVAILABLE = np is not None
+
+# Arrays de una dimensión con un valor por paquete (hops tiene además una columna por salto)
+FIELDS = ("number", "source", "destination", "ttl", "device", "interface",
+          "target", "target_interface", "inbound", "hop_count")
+
+class PacketStore:
+    """
+    Paquetes en vuelo como estructura de arrays
+
+    Cada paquete ocupa una fila: id, IP origen y destino (uint32), TTL,
+    dispositivo e interfaz actuales, si está en la cola de entrada o en la
+    de salida de esa interfaz, dispositivo e interfaz destino y los saltos
+    recorridos dentro del almacén. Cada tick tiene las mismas dos etapas que
+    el modo por objetos (salida y entrada) y los paquetes de interfaces
+    caídas o dispositivos fuera de línea esperan igual que en sus colas. Se
+    descartan los expirados, se decrementan los TTL y se resuelve el
+    siguiente salto una sola vez por par (dispositivo, destino) distinto,
+    todo con operaciones vectorizadas; solo las entregas se procesan paquete
+    a paquete.
+    """
+
+    def __init__(self, network, capacity=1024):
+        """
+        Inicializa el almacén
+
+        Args:
+            network: Instancia de Network cuyos paquetes se procesan
+            capacity (int): Número inicial de filas reservadas
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("PacketStore requiere NumPy")
+
+        self.network = network
+        self.size = 0
+        self.devices = []  # índice -> Device
+        self.device_index = {}  # Device -> índice
+        self.interface_names = []  # índice -> nombre de interfaz
+        self.interface_index = {}  # nombre de interfaz -> índice
+        self.packets = []  # Objetos Packet (mensaje, camino previo, marca de tiempo)
+
+        self.number = np.zeros(capacity, dtype=np.int64)
+        self.source = np.zeros(capacity, dtype=np.uint32)
+        self.destination = np.zeros(capacity, dtype=np.uint32)
+        self.ttl = np.zeros(capacity, dtype=np.int32)
+        self.device = np.zeros(capacity, dtype=np.int32)
+        self.interface = np.zeros(capacity, dtype=np.int32)
+        self.target = np.zeros(capacity, dtype=np.int32)  # -1 si el destino no existe
+        self.target_interface = np.zeros(capacity, dtype=np.int32)
+        self.inbound = np.zeros(capacity, dtype=bool)  # En la cola de entrada de la interfaz
+        self.hop_count = np.zeros(capacity, dtype=np.int32)
+        self.hops = np.zeros((capacity, 1), dtype=np.int32)
+
+    def _get_device_index(self, device):
+        """Retorna el índice de un dispositivo, registrándolo si es nuevo"""
+        index = self.device_index.get(device)
+        if index is None:
+            index = len(self.devices)
+            self.devices.append(device)
+            self.device_index[device] = index
+        return index
+
+    def _get_interface_index(self, interface_name):
+        """Retorna el índice de un nombre de interfaz, registrándolo si es nuevo"""
+        index = self.interface_index.get(interface_name)
+        if index is None:
+            index = len(self.interface_names)
+            self.interface_names.append(interface_name)
+            self.interface_index[interface_name] = index
+        return index
+
+    def _ensure_capacity(self, rows, hop_columns):
+        """Amplía los arrays (duplicando) para admitir rows filas y hop_columns saltos"""
+        capacity = len(self.number)
+        if rows > capacity:
+            while capacity < rows:
+                capacity *= 2
+            for field in FIELDS:
+                old = getattr(self, field)
+                new = np.zeros(capacity, dtype=old.dtype)
+                new[:self.size] = old[:self.size]
+                setattr(self, field, new)
+            hops = np.zeros((capacity, self.hops.shape[1]), dtype=np.int32)
+            hops[:self.size] = self.hops[:self.size]
+            self.hops = hops
+
+        if hop_columns > self.hops.shape[1]:
+            columns = self.hops.shape[1]
+            while columns < hop_columns:
+                columns *= 2
+            hops = np.zeros((self.hops.shape[0], columns), dtype=np.int32)
+            hops[:self.size, :self.hops.shape[1]] = self.hops[:self.size]
+            self.hops = hops
+
+    def add(self, packet, device, interface_name, inbound=False):
+        """Añade un paquete de la cola de salida (o de entrada, con inbound) de una interfaz"""
+        try:
+            source = ip_to_int(packet.source_ip)
+            destination = ip_to_int(packet.destination_ip)
+        except (ValueError, AttributeError):
+            source = destination = 0
+        target_device, target_interface = self.network.find_interface_by_ip(packet.destination_ip)
+
+        row = self.size
+        # Las columnas de saltos crecen con el camino real (ver tick), no con el TTL
+        self._ensure_capacity(row + 1, 1)
+        self.number[row] = packet.number
+        self.source[row] = source
+        self.destination[row] = destination
+        self.ttl[row] = packet.ttl
+        self.device[row] = self._get_device_index(device)
+        self.interface[row] = self._get_interface_index(interface_name)
+        self.target[row] = self._get_device_index(target_device) if target_device else -1
+        self.target_interface[row] = (self._get_interface_index(target_interface.name)
+                                      if target_interface else 0)
+        self.inbound[row] = inbound
+        self.hop_count[row] = 0
+        self.packets.append(packet)
+        self.size += 1
+
+    def get_size(self):
+        """Retorna el número de paquetes en vuelo"""
+        return self.size
+
+    def load_queued_packets(self):
+        """Mueve al almacén los paquetes de las colas de las interfaces"""
+        network = self.network
+        for interface in network._pending_interfaces():
+            device = interface.device
+            if not device.is_online() or not interface.is_up():
+                continue  # Igual que en el modo por objetos, esperan en la cola
+            while interface.has_output_packets():
+                self.add(interface.dequeue_output(), device, interface.name)
+            while interface.has_input_packets():
+                self.add(interface.dequeue_input(), device, interface.name, inbound=True)
+            network._deactivate_interface(interface)
+
+    def flush_to_queues(self):
+        """Devuelve los paquetes del almacén a las colas de salida de sus interfaces"""
+        for row in range(self.size):
+            packet = self._materialize(row)
+            device = self.devices[self.device[row]]
+            if device.network is not self.network or not device.interfaces:
+                continue
+            interface = device.get_interface(self.interface_names[self.interface[row]])
+            if interface is None:
+                interface = next(iter(device.interfaces.values()))
+            if self.inbound[row]:
+                interface.enqueue_input(packet)
+            else:
+                interface.enqueue_output(packet)
+        self._compact(np.zeros(self.size, dtype=bool))
+
+    def _materialize(self, row):
+        """Actualiza el objeto Packet de una fila con su TTL y los saltos recorridos"""
+        packet = self.packets[row]
+        packet.ttl = int(self.ttl[row])
+        for device_index in self.hops[row, :self.hop_count[row]]:
+            packet.add_hop(self.devices[device_index].name)
+        return packet
+
+    def _compact(self, keep):
+        """Conserva solo las filas marcadas en keep"""
+        count = int(keep.sum())
+        for field in FIELDS:
+            array = getattr(self, field)
+            array[:count] = array[:self.size][keep]
+        self.hops[:count] = self.hops[:self.size][keep]
+        self.packets = [packet for packet, kept in zip(self.packets, keep.tolist()) if kept]
+        self.size = count
+
+    def _resolve_next_hops(self, devices, destinations):
+        """
+        Resuelve el siguiente salto de cada paquete consultando la tabla de
+        reenvío una sola vez por par (dispositivo, destino) distinto
+
+        Returns:
+            tuple: (índices de dispositivo siguiente o -1, índices de interfaz
+                    de llegada, índices de interfaz de salida)
+        """
+        keys = (devices.astype(np.int64) << 32) | destinations.astype(np.int64)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+
+        next_devices = np.full(len(unique_keys), -1, dtype=np.int32)
+        next_interfaces = np.zeros(len(unique_keys), dtype=np.int32)
+        out_interfaces = np.zeros(len(unique_keys), dtype=np.int32)
+        for position, key in enumerate(unique_keys.tolist()):
+            device = self.devices[key >> 32]
+            route = self.network._next_hop(device, int_to_ip(key & 0xFFFFFFFF))
+            if route:
+                out_interface_name, next_device_name, next_interface_name, _ = route
+                next_devices[position] = self._get_device_index(self.network.devices[next_device_name])
+                next_interfaces[position] = self._get_interface_index(next_interface_name)
+                out_interfaces[position] = self._get_interface_index(out_interface_name)
+
+        return next_devices[inverse], next_interfaces[inverse], out_interfaces[inverse]
+
+    def _ready(self, size):
+        """
+        Filas cuyo dispositivo está en línea y cuya interfaz está activa
+        (comprobado una sola vez por par (dispositivo, interfaz) distinto)
+        """
+        keys = (self.device[:size].astype(np.int64) << 32) | self.interface[:size].astype(np.int64)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+
+        ready = np.zeros(len(unique_keys), dtype=bool)
+        for position, key in enumerate(unique_keys.tolist()):
+            device = self.devices[key >> 32]
+            interface = device.get_interface(self.interface_names[key & 0xFFFFFFFF])
+            ready[position] = (device.network is self.network and device.is_online()
+                               and interface is not None and interface.is_up())
+        return ready[inverse]
+
+    def tick(self):
+        """
+        Procesa un tick en dos etapas, como el modo por objetos: en la de
+        salida cada paquete avanza un salto (o pasa a la entrada de su
+        dispositivo) y en la de entrada se entrega o pasa a la cola de salida
+        que indica la tabla de reenvío
+        """
+        network = self.network
+        self.load_queued_packets()
+        size = self.size
+        if not size:
+            return {"processed": 0, "delivered": 0, "dropped": 0}
+
+        device = self.device[:size]
+        interface = self.interface[:size]
+        ttl = self.ttl[:size]
+        target = self.target[:size]
+        inbound = self.inbound[:size]
+        destination = self.destination[:size]
+        unroutable = np.zeros(size, dtype=bool)
+
+        # Etapa de salida: solo transmiten las interfaces activas de dispositivos en línea
+        sending = ~inbound & self._ready(size)
+        expired = sending & (ttl <= 0)
+        moving = sending & ~expired
+        ttl[moving] -= 1
+
+        # Destino en el propio dispositivo: pasa a la entrada de la interfaz destino
+        local = moving & (device == target)
+        interface[local] = self.target_interface[:size][local]
+        inbound[local] = True
+
+        remote = np.flatnonzero(moving & ~local)
+        if len(remote):
+            next_devices, next_interfaces, _ = self._resolve_next_hops(device[remote], destination[remote])
+            routed = next_devices >= 0
+            unroutable[remote[~routed]] = True
+
+            moved = remote[routed]
+            if len(moved):
+                self._ensure_capacity(size, int(self.hop_count[moved].max()) + 1)
+            device[moved] = next_devices[routed]
+            interface[moved] = next_interfaces[routed]
+            inbound[moved] = True
+            self.hops[moved, self.hop_count[moved]] = next_devices[routed]
+            self.hop_count[moved] += 1
+
+        # Etapa de entrada, incluidos los que esperaban en interfaces caídas
+        receiving = inbound & self._ready(size)
+        delivered = receiving & (device == target)
+        forwarding = np.flatnonzero(receiving & ~delivered)
+        if len(forwarding):
+            next_devices, _, out_interfaces = self._resolve_next_hops(
+                device[forwarding], destination[forwarding]
+            )
+            routed = next_devices >= 0
+            unroutable[forwarding[~routed]] = True
+            interface[forwarding[routed]] = out_interfaces[routed]
+            inbound[forwarding[routed]] = False
+
+        dropped = expired | unroutable
+
+        # Contadores de descartes por dispositivo
+        dropped_rows = np.flatnonzero(dropped)
+        if len(dropped_rows):
+            counts = np.bincount(device[dropped_rows])
+            for device_index in np.flatnonzero(counts).tolist():
+                self.devices[device_index].packets_dropped += int(counts[device_index])
+            network.global_statistics["total_packets_dropped"] += len(dropped_rows)
+
+        # Las entregas actualizan historial y objetos Packet uno a uno
+        delivered_rows = np.flatnonzero(delivered).tolist()
+        for row in delivered_rows:
+            network._deliver_packet(self.devices[target[row]], self._materialize(row))
+
+        processed_count = int(sending.sum())
+        self._compact(~(dropped | delivered))
+        return {
+            "processed": processed_count,
+            "delivered": len(delivered_rows),
+            "dropped": len(dropped_rows)
+        }
@@ -0,0 +1,63 @@
+"""
+Perfilado bajo demanda para el Simulador de Red
+Ejecuta una operación sobre la red en marcha con cProfile (y opcionalmente
+tracemalloc) y resume las funciones y líneas que más tiempo y memoria usan
+"""
+
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+
+DEFAULT_TOP = 15  # Funciones y sitios de asignación que se muestran
+
+def profile_call(function, top=DEFAULT_TOP, memory=False, output=None):
+    """
+    Ejecuta function() bajo cProfile
+
+    Args:
+        function: Operación a perfilar (sin argumentos)
+        top (int): Número de funciones (y sitios de asignación) del informe
+        memory (bool): Medir también las asignaciones con tracemalloc
+        output (str): Archivo .pstats donde guardar el perfil completo
+
+    Returns:
+        tuple: (resultado de function, informe en texto)
+    """
+    profiler = cProfile.Profile()
+    tracing_memory = memory and not tracemalloc.is_tracing()
+    if tracing_memory:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            result = function()
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        memory_snapshot = tracemalloc.take_snapshot() if memory else None
+        peak_memory = tracemalloc.get_traced_memory()[1] if memory else None
+    finally:
+        if tracing_memory:
+            tracemalloc.stop()
+
+    report = io.StringIO()
+    report.write(f"Tiempo total: {elapsed:.3f} s (con la sobrecarga del perfilador)\n")
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats("cumulative").print_stats(top)
+    if output:
+        profiler.dump_stats(output)
+        report.write(f"Perfil completo guardado en {output}\n")
+
+    if memory_snapshot is not None:
+        report.write(f"Pico de memoria: {peak_memory / (1024 * 1024):.1f} MB\n")
+        report.write("Principales sitios de asignación:\n")
+        memory_snapshot = memory_snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        for statistic in memory_snapshot.statistics("lineno")[:top]:
+            report.write(f"  {statistic}\n")
+    return result, report.getvalue().rstrip()
@@ -0,0 +1,152 @@
+"""
+Motor de enrutamiento para el Simulador de Red
+Calcula tablas de reenvío (siguiente salto) por dispositivo mediante BFS
+"""
+
+from data_structures import Queue
+from fib import PrefixTrie
+from ip_utils import ip_to_int, network_address
+
+class RoutingEngine:
+    """
+    Mantiene una tabla de reenvío por dispositivo calculada con BFS sobre
+    el grafo de conexiones y, a partir de ella, una FIB por prefijos para
+    búsquedas por prefijo más largo. Las tablas se construyen de forma
+    perezosa la primera vez que se consultan y se descartan cuando la
+    topología o el estado de algún dispositivo o interfaz cambia; las FIB
+    también cuando cambian las direcciones.
+    """
+
+    def __init__(self, network):
+        """
+        Inicializa el motor de enrutamiento
+
+        Args:
+            network: Instancia de Network sobre la que se calculan las rutas
+        """
+        self.network = network
+        self.tables = {}  # nombre de dispositivo -> {destino: ruta}
+        self.fibs = {}  # nombre de dispositivo -> PrefixTrie de prefijo -> ruta
+        self.rebuilds = 0  # Número de tablas calculadas (para diagnóstico)
+
+    def invalidate(self):
+        """Descarta todas las tablas y FIB; se recalcularán bajo demanda"""
+        self.tables.clear()
+        self.fibs.clear()
+
+    def invalidate_addresses(self):
+        """Descarta solo las FIB (las direcciones cambiaron, la topología no)"""
+        self.fibs.clear()
+
+    def get_table(self, device_name):
+        """
+        Retorna la tabla de reenvío de un dispositivo
+
+        Cada entrada es destino -> (interfaz_salida, dispositivo_siguiente,
+        interfaz_siguiente, saltos)
+        """
+        table = self.tables.get(device_name)
+        if table is None:
+            table = self._build_table(device_name)
+            self.tables[device_name] = table
+            self.rebuilds += 1
+        return table
+
+    def get_next_hop(self, device_name, destination_name):
+        """Retorna la ruta hacia un destino o None si no es alcanzable"""
+        return self.get_table(device_name).get(destination_name)
+
+    def get_fib(self, device_name):
+        """
+        Retorna la FIB de un dispositivo
+
+        Contiene una entrada por red: las redes de sus propias interfaces
+        como conectadas (interfaz_salida, None, None, 0) y, para cada red
+        remota, la ruta hacia el dispositivo más cercano que pertenece a ella.
+        """
+        fib = self.fibs.get(device_name)
+        if fib is None:
+            fib = self._build_fib(device_name)
+            self.fibs[device_name] = fib
+        return fib
+
+    def lookup(self, device_name, destination_ip):
+        """Retorna la ruta del prefijo más largo que contiene la IP o None"""
+        try:
+            address = ip_to_int(destination_ip)
+        except (ValueError, AttributeError):
+            return None
+        return self.get_fib(device_name).lookup(address)
+
+    def _build_fib(self, device_name):
+        """Construye la FIB de un dispositivo a partir de su tabla de reenvío"""
+        fib = PrefixTrie()
+        device = self.network.get_device(device_name)
+        if not device:
+            return fib
+
+        for interface in device.interfaces.values():
+            self._add_prefix(fib, interface, (interface.name, None, None, 0))
+
+        # La tabla está en orden BFS: gana el dispositivo más cercano de cada red
+        for destination_name, route in self.get_table(device_name).items():
+            for interface in self.network.devices[destination_name].interfaces.values():
+                self._add_prefix(fib, interface, route)
+
+        return fib
+
+    def _add_prefix(self, fib, interface, route):
+        """Añade la red de una interfaz a la FIB si aún no tiene entrada"""
+        if not interface.ip_address:
+            return
+        try:
+            address = ip_to_int(interface.ip_address)
+        except ValueError:
+            return
+        prefix = network_address(address, interface.prefix_length)
+        if not fib.contains(prefix, interface.prefix_length):
+            fib.insert(prefix, interface.prefix_length, route)
+
+    def _live_links(self, device):
+        """Genera (interfaz, dispositivo_vecino, interfaz_vecina) de los enlaces activos"""
+        for interface in device.interfaces.values():
+            if not interface.is_up():
+                continue
+            for neighbor_device_name, neighbor_interface_name in interface.neighbors:
+                neighbor_device = self.network.get_device(neighbor_device_name)
+                if not neighbor_device or not neighbor_device.is_online():
+                    continue
+                neighbor_interface = neighbor_device.get_interface(neighbor_interface_name)
+                if neighbor_interface and neighbor_interface.is_up():
+                    yield interface, neighbor_device, neighbor_interface
+
+    def _build_table(self, source_name):
+        """Calcula la tabla de un dispositivo con un BFS desde él"""
+        table = {}
+        source = self.network.get_device(source_name)
+        if not source or not source.is_online():
+            return table
+
+        visited = {source_name}
+        pending = Queue()
+
+        # El primer salto de cada destino es el enlace por el que se descubrió
+        for interface, neighbor_device, neighbor_interface in self._live_links(source):
+            if neighbor_device.name in visited:
+                continue
+            visited.add(neighbor_device.name)
+            route = (interface.name, neighbor_device.name, neighbor_interface.name, 1)
+            table[neighbor_device.name] = route
+            pending.enqueue(neighbor_device)
+
+        while not pending.is_empty():
+            device = pending.dequeue()
+            out_interface, next_device, next_interface, hops = table[device.name]
+            for _, neighbor_device, _ in self._live_links(device):
+                if neighbor_device.name in visited:
+                    continue
+                visited.add(neighbor_device.name)
+                table[neighbor_device.name] = (out_interface, next_device, next_interface, hops + 1)
+                pending.enqueue(neighbor_device)
+
+        return table
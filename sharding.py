@@ -0,0 +1,307 @@
+"""
+Simulación por ticks repartida entre varios procesos para el Simulador de Red
+Divide los dispositivos en regiones y procesa cada una en un proceso de
+trabajo; solo los paquetes que cruzan de una región a otra se intercambian
+en las barreras de cada tick
+"""
+
+import multiprocessing
+import os
+import threading
+from array import array
+from data_structures import Queue
+from packet import intern_device_name, device_name_at
+from network import _interface_order
+
+def partition_devices(network, shard_count):
+    """
+    Reparte los dispositivos en regiones conexas de tamaño similar
+
+    Recorre el grafo de conexiones en anchura (empezando por el primer
+    dispositivo sin asignar, en orden de nombre) y corta el recorrido en
+    tramos consecutivos, de modo que los vecinos suelen quedar en la misma
+    región y pocos enlaces cruzan de una a otra.
+
+    Args:
+        network: Instancia de Network
+        shard_count (int): Número de regiones
+
+    Returns:
+        list: Listas de nombres de dispositivo, una por región no vacía
+    """
+    names = sorted(network.devices)
+    if not names:
+        return []
+    shard_count = max(1, min(shard_count, len(names)))
+
+    neighbors = {name: set() for name in names}
+    for device1_name, _, device2_name, _ in network.connections:
+        if device1_name in neighbors and device2_name in neighbors:
+            neighbors[device1_name].add(device2_name)
+            neighbors[device2_name].add(device1_name)
+
+    order = []
+    visited = set()
+    for start in names:
+        if start in visited:
+            continue
+        visited.add(start)
+        pending = Queue()
+        pending.enqueue(start)
+        while not pending.is_empty():
+            name = pending.dequeue()
+            order.append(name)
+            for neighbor_name in sorted(neighbors[name]):
+                if neighbor_name not in visited:
+                    visited.add(neighbor_name)
+                    pending.enqueue(neighbor_name)
+
+    chunk_size = -(-len(order) // shard_count)
+    return [order[start:start + chunk_size] for start in range(0, len(order), chunk_size)]
+
+def _history_to_names(record):
+    """Copia de un registro de historial con el camino como lista de nombres"""
+    record = list(record)
+    record[5] = [device_name_at(index) for index in record[5]]
+    return tuple(record)
+
+def _history_from_names(record):
+    """Registro de historial con el camino internado de nuevo en este proceso"""
+    record = list(record)
+    record[5] = array('I', [intern_device_name(name) for name in record[5]])
+    return tuple(record)
+
+class _ShardWorker:
+    """
+    Región de la red dentro de un proceso de trabajo
+
+    Trabaja sobre una copia completa de la red (para que las rutas sean las
+    mismas que en un solo proceso) pero solo procesa las interfaces de sus
+    propios dispositivos. Las llegadas a dispositivos de otra región se
+    devuelven al proceso principal en lugar de encolarse.
+    """
+
+    def __init__(self, network, owned_names, owners):
+        self.network = network
+        self.owned = set(owned_names)
+        self.owners = owners  # nombre de dispositivo -> índice de región
+        self.arrivals = []
+        self.sequence = 0
+
+        # Los paquetes de otras regiones no se procesan aquí
+        network.packet_store = None
+        for interface in list(network.active_interfaces):
+            if interface.device.name not in self.owned:
+                network._deactivate_interface(interface)
+
+        # Se devuelven solo las diferencias respecto al estado inicial
+        self.initial_statistics = dict(network.global_statistics)
+        self.initial_counters = {}
+        for name in self.owned:
+            device = network.devices[name]
+            self.initial_counters[name] = (device.packets_processed, device.packets_dropped)
+            device.history.clear()
+
+    def _collect_arrival(self, sender_interface, interface, packet):
+        """Guarda una llegada con su clave de orden global (emisor, secuencia)"""
+        key = _interface_order(sender_interface) + (self.sequence,)
+        self.sequence += 1
+        self.arrivals.append((key, interface.device.name, interface.name, packet))
+
+    def run_output(self):
+        """Etapa de salida; retorna (procesados, descartados, llegadas por región)"""
+        self.arrivals = []
+        self.sequence = 0
+        processed, dropped = self.network._output_stage(self._collect_arrival)
+
+        outgoing = {}
+        local = []
+        for arrival in self.arrivals:
+            shard = self.owners[arrival[1]]
+            if arrival[1] in self.owned:
+                local.append(arrival)
+            else:
+                outgoing.setdefault(shard, []).append(arrival)
+        self.arrivals = local
+        return processed, dropped, outgoing
+
+    def run_input(self, incoming):
+        """Encola las llegadas en orden global y ejecuta la etapa de entrada"""
+        arrivals = self.arrivals + incoming
+        arrivals.sort(key=lambda arrival: arrival[0])
+        for _, device_name, interface_name, packet in arrivals:
+            self.network.devices[device_name].get_interface(interface_name).enqueue_input(packet)
+        self.arrivals = []
+
+        delivered, dropped = self.network._input_stage()
+        self.network._prune_idle_interfaces()
+        return delivered, dropped
+
+    def get_results(self):
+        """Diferencias de contadores, historial nuevo y paquetes que siguen en cola"""
+        network = self.network
+        statistics = {key: value - self.initial_statistics.get(key, 0)
+                      for key, value in network.global_statistics.items()}
+
+        devices = {}
+        for name in self.owned:
+            device = network.devices[name]
+            processed, dropped = self.initial_counters[name]
+            queues = {}
+            for interface in device.interfaces.values():
+                queues[interface.name] = (list(interface.input_queue), list(interface.output_queue))
+            history = [_history_to_names(record) for record in reversed(device.history.to_list())]
+            devices[name] = (device.packets_processed - processed,
+                             device.packets_dropped - dropped,
+                             history, queues)
+        return statistics, devices
+
+def _worker_main(connection, network, owned_names, owners):
+    """Bucle de un proceso de trabajo: atiende las órdenes del proceso principal"""
+    worker = _ShardWorker(network, owned_names, owners)
+    while True:
+        command, payload = connection.recv()
+        if command == "output":
+            connection.send(worker.run_output())
+        elif command == "input":
+            connection.send(worker.run_input(payload))
+        elif command == "finish":
+            connection.send(worker.get_results())
+            break
+    connection.close()
+
+class ShardedSimulator:
+    """
+    Ejecuta ticks repartiendo la red entre varios procesos
+
+    Cada tick tiene dos barreras: tras la etapa de salida los procesos
+    devuelven las llegadas a dispositivos de otras regiones y el proceso
+    principal se las reenvía a su región antes de la etapa de entrada. Las
+    llegadas se encolan ordenadas por (interfaz emisora, orden de envío),
+    que es el mismo orden en que las produce un tick en un solo proceso, por
+    lo que las estadísticas, los contadores y los historiales resultantes
+    son idénticos (salvo las marcas de tiempo del historial).
+    """
+
+    def __init__(self, network, workers=None):
+        """
+        Inicializa el simulador
+
+        Args:
+            network: Instancia de Network a simular
+            workers (int): Número de procesos (por defecto, uno por CPU)
+        """
+        self.network = network
+        self.workers = workers or os.cpu_count() or 1
+
+    def _get_context(self):
+        """
+        Con fork los procesos heredan la red sin serializarla, pero solo es
+        seguro si no hay más hilos (guardado automático, servidor CLI o de
+        métricas): el proceso hijo heredaría tomados los candados que otro
+        hilo tuviera en ese momento. En ese caso se usa spawn y la red se
+        serializa para cada proceso.
+        """
+        if "fork" in multiprocessing.get_all_start_methods() and threading.active_count() == 1:
+            return multiprocessing.get_context("fork")
+        return multiprocessing.get_context("spawn")
+
+    def run(self, ticks=1):
+        """
+        Ejecuta varios ticks en paralelo y aplica el resultado a la red
+
+        Returns:
+            dict: Totales de procesados, entregados y descartados y número de regiones
+        """
+        network = self.network
+        if network.packet_store is not None:
+            network.packet_store.flush_to_queues()
+
+        shards = partition_devices(network, self.workers)
+        owners = {}
+        for index, names in enumerate(shards):
+            for name in names:
+                owners[name] = index
+
+        context = self._get_context()
+        connections = []
+        processes = []
+        # Los procesos no usan las métricas ni el almacén vectorizado (y con
+        # spawn no se pueden serializar): se retiran mientras se crean
+        metrics, packet_store = network.metrics, network.packet_store
+        network.metrics = network.packet_store = None
+        try:
+            for names in shards:
+                parent_end, child_end = context.Pipe()
+                process = context.Process(target=_worker_main,
+                                          args=(child_end, network, names, owners))
+                process.start()
+                child_end.close()
+                connections.append(parent_end)
+                processes.append(process)
+        finally:
+            network.metrics, network.packet_store = metrics, packet_store
+
+        totals = {"processed": 0, "delivered": 0, "dropped": 0}
+        try:
+            for _ in range(ticks):
+                for connection in connections:
+                    connection.send(("output", None))
+                incoming = [[] for _ in shards]
+                for connection in connections:
+                    processed, dropped, outgoing = connection.recv()
+                    totals["processed"] += processed
+                    totals["dropped"] += dropped
+                    for shard, arrivals in outgoing.items():
+                        incoming[shard].extend(arrivals)
+
+                for connection, arrivals in zip(connections, incoming):
+                    connection.send(("input", arrivals))
+                for connection in connections:
+                    delivered, dropped = connection.recv()
+                    totals["delivered"] += delivered
+                    totals["dropped"] += dropped
+
+            results = []
+            for connection in connections:
+                connection.send(("finish", None))
+            for connection in connections:
+                results.append(connection.recv())
+        finally:
+            for connection in connections:
+                connection.close()
+            for process in processes:
+                process.join()
+
+        for statistics, devices in results:
+            self._apply_results(statistics, devices)
+
+        totals["shards"] = len(shards)
+        totals["start_method"] = context.get_start_method()
+        return totals
+
+    def _apply_results(self, statistics, devices):
+        """Aplica a la red los resultados de una región"""
+        network = self.network
+        for key, delta in statistics.items():
+            network.global_statistics[key] = network.global_statistics.get(key, 0) + delta
+
+        for name, (processed, dropped, history, queues) in devices.items():
+            device = network.devices[name]
+            device.packets_processed += processed
+            device.packets_dropped += dropped
+            for record in history:
+                device.history.push(_history_from_names(record))
+
+            for interface_name, (input_packets, output_packets) in queues.items():
+                interface = device.get_interface(interface_name)
+                # Las colas del proceso principal se sustituyen por las de la región
+                while interface.has_input_packets():
+                    interface.dequeue_input()
+                while interface.has_output_packets():
+                    interface.dequeue_output()
+                network._deactivate_interface(interface)
+                for packet in input_packets:
+                    interface.enqueue_input(packet)
+                for packet in output_packets:
+                    interface.enqueue_output(packet)
@@ -0,0 +1,379 @@
+"""
+Instantáneas binarias de la red para el Simulador de Red
+Formato compacto para guardar y abrir redes grandes más rápido que con JSON:
+tablas de nombres internados, IPs enteras y adyacencia en formato CSR
+"""
+
+import gc
+import json
+import math
+import mmap
+import socket
+import struct
+from array import array
+from device import Device, Interface
+from network import Network
+
+SNAPSHOT_MAGIC = b"NSNP"
+SNAPSHOT_VERSION = 1
+
+# Cabecera: firma, versión, número de cadenas, bytes de cadenas,
+# dispositivos, interfaces, entradas de adyacencia, conexiones, enlaces
+# con propiedades y bytes de metadatos (JSON)
+_HEADER = struct.Struct("<4sIIIIIIIII")
+_ALIGNMENT = 8
+
+# Indicadores por interfaz
+_HAS_IP = 1
+_IP_AS_TEXT = 2  # La IP no es canónica: el campo ip es un índice de cadena
+_IS_UP = 4
+
+# Indicadores por dispositivo
+_IS_ONLINE = 1
+_HAS_HISTORY_SIZE = 2
+
+def _padding(length):
+    """Bytes de relleno para alinear una sección a _ALIGNMENT"""
+    return b"\0" * (-length % _ALIGNMENT)
+
+class _StringTable:
+    """Tabla de cadenas internadas: cada texto distinto se guarda una vez"""
+
+    def __init__(self):
+        self.indices = {}
+        self.offsets = array("I", [0])
+        self.data = bytearray()
+
+    def intern(self, text):
+        """Retorna el índice de una cadena, añadiéndola si es nueva"""
+        index = self.indices.get(text)
+        if index is None:
+            index = len(self.indices)
+            self.indices[text] = index
+            self.data += text.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return index
+
+def _encode_ip(strings, ip_address):
+    """
+    Retorna (valor, indicadores) de la IP de una interfaz
+
+    Se usa inet_aton/inet_ntoa (en C) en lugar de ip_to_int: solo se guarda
+    como entero la IP que vuelve a escribirse igual; cualquier otra se
+    guarda como texto para reproducirla tal cual.
+    """
+    if not ip_address:
+        return 0, 0
+    try:
+        packed = socket.inet_aton(ip_address)
+        if socket.inet_ntoa(packed) == ip_address:
+            return int.from_bytes(packed, "big"), _HAS_IP
+    except (OSError, TypeError):
+        pass
+    return strings.intern(ip_address), _HAS_IP | _IP_AS_TEXT
+
+def save_snapshot(network, filename):
+    """
+    Guarda la red en una instantánea binaria
+
+    Las interfaces de cada dispositivo son contiguas (CSR dispositivo ->
+    interfaces) y los vecinos de cada interfaz también (CSR interfaz ->
+    interfaces vecinas). Los vecinos y conexiones que nombran interfaces
+    inexistentes no se guardan. Los paquetes en cola y el historial no
+    forman parte de la instantánea.
+
+    Returns:
+        int: Tamaño del archivo en bytes
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()  # Las tablas auxiliares son muchos objetos nuevos sin ciclos
+    try:
+        return _write_snapshot(network, filename)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def _write_snapshot(network, filename):
+    """Construye las secciones y escribe el archivo (ver save_snapshot)"""
+    strings = _StringTable()
+    device_names = array("I")
+    device_types = array("I")
+    device_flags = array("B")
+    device_history_sizes = array("I")
+    device_processed = array("Q")
+    device_dropped = array("Q")
+    device_first_interface = array("I", [0])
+
+    interface_names = array("I")
+    interface_ips = array("I")
+    interface_prefixes = array("B")
+    interface_flags = array("B")
+    interface_index = {}  # (dispositivo, interfaz) -> índice global
+
+    interfaces = []
+    for device in network.devices.values():
+        device_names.append(strings.intern(device.name))
+        device_types.append(strings.intern(device.type))
+        flags = _IS_ONLINE if device.is_online() else 0
+        if device.history_size is not None:
+            flags |= _HAS_HISTORY_SIZE
+        device_flags.append(flags)
+        device_history_sizes.append(device.history_size or 0)
+        device_processed.append(device.packets_processed)
+        device_dropped.append(device.packets_dropped)
+
+        for interface in device.interfaces.values():
+            interface_index[(device.name, interface.name)] = len(interfaces)
+            interfaces.append(interface)
+            interface_names.append(strings.intern(interface.name))
+            ip_value, flags = _encode_ip(strings, interface.ip_address)
+            if interface.is_up():
+                flags |= _IS_UP
+            interface_ips.append(ip_value)
+            interface_prefixes.append(interface.prefix_length)
+            interface_flags.append(flags)
+        device_first_interface.append(len(interfaces))
+
+    adjacency_offsets = array("I", [0])
+    adjacency = array("I")
+    for interface in interfaces:
+        for neighbor in interface.neighbors:
+            target = interface_index.get(neighbor)
+            if target is not None:
+                adjacency.append(target)
+        adjacency_offsets.append(len(adjacency))
+
+    connections = array("I")
+    connection_index = {}
+    for connection in network.connections:
+        first = interface_index.get((connection[0], connection[1]))
+        second = interface_index.get((connection[2], connection[3]))
+        if first is not None and second is not None:
+            connection_index[tuple(connection)] = len(connections) // 2
+            connections.extend((first, second))
+
+    link_connections = array("I")
+    link_latencies = array("d")
+    link_bandwidths = array("d")
+    for connection, (latency, bandwidth) in network.link_properties.items():
+        index = connection_index.get(tuple(connection))
+        if index is not None:
+            link_connections.append(index)
+            link_latencies.append(latency)
+            link_bandwidths.append(math.nan if bandwidth is None else bandwidth)
+
+    metadata = json.dumps({
+        "current_device": network.current_device.name if network.current_device else None,
+        "history_size": network.history_size,
+        "global_statistics": network.global_statistics
+    }).encode("utf-8")
+
+    header = _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(strings.indices),
+                          len(strings.data), len(device_names), len(interfaces),
+                          len(adjacency), len(connections) // 2, len(link_connections),
+                          len(metadata))
+    sections = [
+        header, strings.offsets, strings.data,
+        device_names, device_types, device_flags, device_history_sizes,
+        device_processed, device_dropped, device_first_interface,
+        interface_names, interface_ips, interface_prefixes, interface_flags,
+        adjacency_offsets, adjacency, connections,
+        link_connections, link_latencies, link_bandwidths, metadata
+    ]
+
+    size = 0
+    with open(filename, "wb") as f:
+        for section in sections:
+            data = section.tobytes() if isinstance(section, array) else bytes(section)
+            f.write(data)
+            f.write(_padding(len(data)))
+            size += len(data) + len(_padding(len(data)))
+    return size
+
+class SnapshotReader:
+    """
+    Vista de una instantánea abierta con mmap
+
+    Al abrirla solo se lee la cabecera; cada sección es un memoryview sobre
+    el archivo mapeado, sin copiarlo, y los datos se leen bajo demanda.
+    """
+
+    def __init__(self, filename):
+        self.file = open(filename, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Archivo vacío
+            self.file.close()
+            raise ValueError(f"{filename} no es una instantánea válida")
+        self.buffer = memoryview(self.map)
+        self.views = []
+
+        if len(self.map) < _HEADER.size:
+            self.close()
+            raise ValueError(f"{filename} no es una instantánea válida")
+        (magic, version, self.string_count, string_bytes, self.device_count,
+         self.interface_count, adjacency_count, self.connection_count,
+         self.link_count, metadata_bytes) = _HEADER.unpack_from(self.map, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            self.close()
+            raise ValueError(f"{filename} no es una instantánea válida (versión {version})")
+
+        self.offset = _HEADER.size + len(_padding(_HEADER.size))
+        self.string_offsets = self._section("I", self.string_count + 1)
+        self.string_data = self._section("B", string_bytes)
+        self.device_names = self._section("I", self.device_count)
+        self.device_types = self._section("I", self.device_count)
+        self.device_flags = self._section("B", self.device_count)
+        self.device_history_sizes = self._section("I", self.device_count)
+        self.device_processed = self._section("Q", self.device_count)
+        self.device_dropped = self._section("Q", self.device_count)
+        self.device_first_interface = self._section("I", self.device_count + 1)
+        self.interface_names = self._section("I", self.interface_count)
+        self.interface_ips = self._section("I", self.interface_count)
+        self.interface_prefixes = self._section("B", self.interface_count)
+        self.interface_flags = self._section("B", self.interface_count)
+        self.adjacency_offsets = self._section("I", self.interface_count + 1)
+        self.adjacency = self._section("I", adjacency_count)
+        self.connections = self._section("I", self.connection_count * 2)
+        self.link_connections = self._section("I", self.link_count)
+        self.link_latencies = self._section("d", self.link_count)
+        self.link_bandwidths = self._section("d", self.link_count)
+        self.metadata = json.loads(bytes(self._section("B", metadata_bytes)).decode("utf-8"))
+
+    def _section(self, typecode, count):
+        """Retorna la siguiente sección como memoryview del tipo indicado"""
+        length = count * struct.calcsize(typecode)
+        if self.offset + length > len(self.map):
+            self.close()
+            raise ValueError("Instantánea truncada")
+        view = self.buffer[self.offset:self.offset + length].cast(typecode)
+        self.views.append(view)
+        self.offset += length + len(_padding(length))
+        return view
+
+    def get_strings(self):
+        """Retorna la tabla de cadenas decodificada"""
+        data = bytes(self.string_data)
+        offsets = self.string_offsets.tolist()
+        return [data[offsets[index]:offsets[index + 1]].decode("utf-8")
+                for index in range(self.string_count)]
+
+    def close(self):
+        """Libera las vistas y cierra el archivo mapeado"""
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.buffer.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def load_snapshot(network, filename):
+    """
+    Reconstruye la red a partir de una instantánea
+
+    Los objetos se crean directamente a partir de las secciones (sin pasar
+    por connect_interfaces ni recalcular nada por elemento) y las rutas se
+    invalidan una sola vez al final. La red se construye aparte y solo
+    reemplaza a la actual si la instantánea se leyó entera: una corrupta
+    deja la red como estaba. El recolector de ciclos se pausa durante la
+    carga: con millones de objetos nuevos sus pasadas completas dominarían
+    el tiempo.
+
+    Returns:
+        dict: Número de dispositivos, interfaces y conexiones cargados
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with SnapshotReader(filename) as reader:
+            strings = reader.get_strings()
+            device_names = [strings[index] for index in reader.device_names.tolist()]
+            device_types = reader.device_types.tolist()
+            device_flags = reader.device_flags.tolist()
+            device_history_sizes = reader.device_history_sizes.tolist()
+            device_processed = reader.device_processed.tolist()
+            device_dropped = reader.device_dropped.tolist()
+            device_first_interface = reader.device_first_interface.tolist()
+            interface_names = [strings[index] for index in reader.interface_names.tolist()]
+            interface_ips = reader.interface_ips.tolist()
+            interface_prefixes = reader.interface_prefixes.tolist()
+            interface_flags = reader.interface_flags.tolist()
+            adjacency_offsets = reader.adjacency_offsets.tolist()
+            adjacency = reader.adjacency.tolist()
+            connections = reader.connections.tolist()
+            link_connections = reader.link_connections.tolist()
+            link_latencies = reader.link_latencies.tolist()
+            link_bandwidths = reader.link_bandwidths.tolist()
+            metadata = reader.metadata
+
+        live_network = network
+        network = Network()
+        # Igual que al cargar JSON, los contadores que no estén en la instantánea se conservan
+        network.global_statistics.update(live_network.global_statistics)
+        network.set_history_size(metadata["history_size"])
+        inet_ntoa = socket.inet_ntoa
+
+        # Nombre de dispositivo de cada interfaz (para las tuplas de vecinos)
+        owners = [None] * len(interface_names)
+        interfaces = [None] * len(interface_names)
+        for device_index, device_name in enumerate(device_names):
+            device = Device(device_name, strings[device_types[device_index]])
+            flags = device_flags[device_index]
+            if not flags & _IS_ONLINE:
+                device.status = "offline"
+            if flags & _HAS_HISTORY_SIZE:
+                device.history_size = device_history_sizes[device_index]
+            device.packets_processed = device_processed[device_index]
+            device.packets_dropped = device_dropped[device_index]
+
+            for index in range(device_first_interface[device_index],
+                               device_first_interface[device_index + 1]):
+                flags = interface_flags[index]
+                ip_address = None
+                if flags & _IP_AS_TEXT:
+                    ip_address = strings[interface_ips[index]]
+                elif flags & _HAS_IP:
+                    ip_address = inet_ntoa(interface_ips[index].to_bytes(4, "big"))
+                interface = Interface(interface_names[index], ip_address, interface_prefixes[index])
+                if flags & _IS_UP:
+                    interface.status = "up"
+                device.interfaces[interface.name] = interface
+                interfaces[index] = interface
+                owners[index] = device_name
+
+            network.register_device(device)
+
+        # Vecinos: la lista de cada interfaz se recorre en el orden guardado
+        for index, interface in enumerate(interfaces):
+            neighbors = interface.neighbors
+            for target in adjacency[adjacency_offsets[index]:adjacency_offsets[index + 1]]:
+                neighbors.append((owners[target], interfaces[target].name))
+
+        connections = [
+            (owners[first], interfaces[first].name, owners[second], interfaces[second].name)
+            for first, second in zip(connections[0::2], connections[1::2])
+        ]
+        add_connection = network.connections.add
+        for connection in connections:
+            add_connection(connection)
+        for index, latency, bandwidth in zip(link_connections, link_latencies, link_bandwidths):
+            network.link_properties[connections[index]] = (
+                latency, None if math.isnan(bandwidth) else bandwidth
+            )
+
+        if metadata["current_device"]:
+            network.set_current_device(metadata["current_device"])
+        network.global_statistics.update(metadata["global_statistics"])
+
+        live_network.replace_contents(network)
+        return {"devices": len(device_names), "interfaces": len(interfaces),
+                "connections": len(live_network.connections)}
+    finally:
+        if gc_enabled:
+            gc.enable()
@@ -18,7 +18,7 @@ def test_data_structures():
     """Prueba las estructuras de datos"""
     print("=== Prueba de Estructuras de Datos ===")
     
-    from data_structures import LinkedList, Queue, Stack
+    from data_structures import LinkedList, Queue, Stack, RingBuffer
     
     # Prueba Lista Enlazada
     print("\n1. Prueba Lista Enlazada:")
@@ -29,6 +29,10 @@ def test_data_structures():
     print(f"   Lista: {ll.to_list()}")
     print(f"   Tamaño: {ll.get_size()}")
     print(f"   Contiene 'Switch1': {ll.contains('Switch1')}")
+    ll.remove("PC1")
+    ll.append("PC2")  # El puntero al último nodo debe seguir siendo válido
+    print(f"   Recorrido tras eliminar y añadir: {[item for item in ll]} (len={len(ll)})")
+    assert list(ll) == ["Router1", "Switch1", "PC2"] and len(ll) == 3
     
     # Prueba Cola
     print("\n2. Prueba Cola:")
@@ -51,6 +55,17 @@ def test_data_structures():
     print(f"   Cima: {stack.peek()}")
     print(f"   Desapilado: {stack.pop()}")
     print(f"   Pila después: {stack.to_list()}")
+    
+    # Prueba Buffer Circular
+    print("\n4. Prueba Buffer Circular:")
+    ring = RingBuffer(3)
+    for index in range(1, 6):
+        ring.push(f"Paquete{index}")
+    print(f"   Buffer (más reciente primero): {ring.to_list()}")
+    assert ring.to_list() == ["Paquete5", "Paquete4", "Paquete3"]
+    ring.resize(2)
+    print(f"   Tras reducir a 2: {ring.to_list()}")
+    assert ring.to_list() == ["Paquete5", "Paquete4"]
 
 def test_packet():
     """Prueba la clase Packet"""
@@ -65,6 +80,11 @@ def test_packet():
     packet.add_hop("Router1")
     packet.add_hop("Switch1")
     print(f"Camino: {packet.get_path_string()}")
+    assert packet.to_dict()["path"] == ["Router1", "Switch1"]
+    
+    other = Packet("192.168.1.2", "192.168.1.1", "Respuesta")
+    print(f"IDs consecutivos: {packet.id} -> {other.id}")
+    assert other.number == packet.number + 1
     
     packet.decrement_ttl()
     print(f"TTL después de decremento: {packet.ttl}")
@@ -138,14 +158,654 @@ def test_network():
     success, message = network.send_packet("10.0.0.2", "192.168.1.4", "Prueba de comunicación")
     print(f"Envio de paquete: {message}")
     
-    # Procesar paquetes
-    result = network.process_packets()
-    print(f"Procesamiento: {result}")
+    # Procesar paquetes (PC1 → Router1 → Switch1 → PC2: un salto por tick)
+    for tick in range(3):
+        result = network.process_packets()
+        print(f"Procesamiento tick {tick + 1}: {result}")
     
     # Mostrar estadísticas
     stats = network.get_network_statistics()
     print(f"Estadísticas: {stats}")
 
+def test_connection_store():
+    """Prueba el conjunto de conexiones indexado y la limpieza de vecinos"""
+    print("\n=== Prueba de Conjunto de Conexiones ===")
+    
+    from data_structures import ConnectionStore
+    
+    store = ConnectionStore()
+    assert store.add(("A", "e0", "B", "e0"))
+    assert not store.add(("B", "e0", "A", "e0"))  # Mismo enlace en sentido inverso
+    assert store.add(("C", "e0", "A", "e1"))
+    assert ("B", "e0", "A", "e0") in store
+    assert store.find(("A", "e1", "C", "e0")) == ("C", "e0", "A", "e1")
+    assert store.get_device_connections("A") == [("A", "e0", "B", "e0"), ("C", "e0", "A", "e1")]
+    assert store.remove_device("A") == [("A", "e0", "B", "e0"), ("C", "e0", "A", "e1")]
+    assert len(store) == 0 and not store.adjacency
+    
+    network = Network()
+    for name in ["A", "B", "C"]:
+        network.add_device(name)
+        network.get_device(name).add_interface("e0")
+        network.get_device(name).add_interface("e1")
+    network.connect_interfaces("A", "e0", "B", "e0", latency=3)
+    network.connect_interfaces("B", "e1", "C", "e0")
+    # El enlace repetido se rechaza antes de tocar los vecinos
+    assert not network.connect_interfaces("B", "e0", "A", "e0")[0]
+    assert network.get_device("A").get_interface("e0").get_neighbors() == [("B", "e0")]
+    assert network.get_device("B").get_interface("e0").get_neighbors() == [("A", "e0")]
+    success, message = network.disconnect_interfaces("B", "e0", "A", "e0")  # Sentido inverso
+    print(f"Desconexión: {message}")
+    assert success and network.connections == [("B", "e1", "C", "e0")]
+    assert not network.link_properties
+    
+    network.connect_interfaces("A", "e0", "B", "e0")
+    network.remove_device("B")
+    print(f"Tras eliminar B: {network.connections.to_list()}")
+    assert len(network.connections) == 0
+    assert network.get_device("A").get_interface("e0").get_neighbors() == []
+    assert network.get_device("C").get_interface("e0").get_neighbors() == []
+
+def test_worklist():
+    """Prueba la lista de trabajo de interfaces con paquetes pendientes"""
+    print("\n=== Prueba de Lista de Trabajo ===")
+    
+    from packet import Packet
+    
+    network = Network()
+    for index, name in enumerate(["A", "B", "C"]):
+        network.add_device(name, "router")
+        device = network.get_device(name)
+        device.add_interface("e0", f"10.0.{index}.1")
+        device.add_interface("e1", f"10.0.{index}.2")
+        for interface in device.get_interfaces():
+            interface.no_shutdown()
+    network.connect_interfaces("A", "e1", "B", "e0")
+    network.connect_interfaces("B", "e1", "C", "e0")
+    a_e1 = network.get_device("A").get_interface("e1")
+    b_e0 = network.get_device("B").get_interface("e0")
+    assert not network.active_interfaces
+    
+    # Se activa al encolar y se retira cuando sus dos colas quedan vacías
+    network.send_packet("10.0.0.1", "10.0.1.1", "vecino")
+    assert list(network.active_interfaces) == [a_e1]
+    network.process_packets()
+    assert network.global_statistics["total_packets_delivered"] == 1
+    assert not network.active_interfaces
+    
+    # Una interfaz caída conserva sus paquetes y sigue en la lista
+    a_e1.shutdown()
+    a_e1.enqueue_output(Packet("10.0.0.1", "10.0.1.1", "retenido"))
+    for _ in range(2):
+        network.process_packets()
+    assert list(network.active_interfaces) == [a_e1] and a_e1.has_output_packets()
+    network.get_device("A").remove_interface("e1")
+    assert not network.active_interfaces
+    
+    # Al eliminar un dispositivo salen todas sus interfaces pendientes
+    b_e0.enqueue_input(Packet("10.0.2.1", "10.0.1.1", "entrada"))
+    network.send_packet("10.0.1.2", "10.0.2.1", "salida")
+    assert len(network.active_interfaces) == 2
+    network.remove_device("B")
+    print(f"Tras eliminar B: {len(network.active_interfaces)} interfaces pendientes")
+    assert not network.active_interfaces
+
+def test_statistics():
+    """Prueba las estadísticas incrementales y el conteo de saltos"""
+    print("\n=== Prueba de Estadísticas Incrementales ===")
+    
+    network = Network()
+    for index, (name, device_type) in enumerate([("R1", "router"), ("S1", "switch"), ("PC1", "host")]):
+        network.add_device(name, device_type)
+        device = network.get_device(name)
+        device.add_interface("e0", f"10.0.{index}.1/24")
+        device.add_interface("e1", f"10.1.{index}.1/24")
+        for interface in device.interfaces.values():
+            interface.no_shutdown()
+    network.connect_interfaces("R1", "e1", "S1", "e0")
+    network.connect_interfaces("S1", "e1", "PC1", "e0")
+    
+    network.send_packet("10.0.0.1", "10.0.2.1", "dos saltos")
+    network.send_packet("10.0.0.1", "10.0.1.1", "un salto")
+    for _ in range(5):
+        network.process_packets()
+    
+    stats = network.get_network_statistics()
+    print(stats)
+    assert stats["total_packets_delivered"] == 2
+    assert network.global_statistics["total_hops"] == 3
+    assert stats["average_hops_per_packet"] == 1.5
+    
+    network.get_device("PC1").set_status("offline")
+    network.get_device("PC1").set_status("offline")  # Sin cambio: no se cuenta dos veces
+    network.remove_device("S1")
+    stats = network.get_network_statistics()
+    assert stats["online_devices"] == 1 and stats["offline_devices"] == 1
+    assert stats["devices_by_type"] == {"router": {"total": 1, "online": 1},
+                                        "host": {"total": 1, "online": 0}}
+
+def test_metrics():
+    """Prueba la instrumentación de ticks y la exportación de métricas"""
+    print("\n=== Prueba de Métricas ===")
+    
+    import tempfile
+    import threading
+    import urllib.request
+    
+    def build():
+        network = Network()
+        for index in range(4):
+            network.add_device(f"D{index}", "router")
+            device = network.get_device(f"D{index}")
+            device.add_interface("e0", f"10.0.{index}.1/24")
+            device.add_interface("e1", f"10.1.{index}.1/24")
+            for interface in device.interfaces.values():
+                interface.no_shutdown()
+        for index in range(3):
+            network.connect_interfaces(f"D{index}", "e1", f"D{index + 1}", "e0")
+        for index in range(6):
+            network.send_packet("10.0.0.1", f"10.0.{index}.1", f"m{index}")
+        return network
+    
+    plain = build()
+    network = build()
+    sent = network.get_device("D0").get_interface("e0").get_output_queue_size()
+    network.enable_metrics()
+    for _ in range(5):
+        assert network.process_packets() == plain.process_packets()
+    
+    metrics = network.metrics
+    print(metrics.summary())
+    assert metrics.ticks == 5
+    assert metrics.packets[("input", "delivered")] == plain.global_statistics["total_packets_delivered"]
+    assert metrics.queue_high_water[("D0", "e0", "output")] == sent
+    
+    text = metrics.render(network)
+    assert 'simulator_tick_seconds_bucket{le="+Inf"} 5' in text
+    assert f'simulator_queue_depth_max{{device="D0",interface="e0",queue="output"}} {sent}' in text
+    
+    parser = CLIParser(network, ConfigManager())
+    parser.parse_command("enable")
+    with tempfile.NamedTemporaryFile(suffix=".prom", delete=False) as f:
+        filename = f.name
+    try:
+        print(parser.parse_command(f"metrics export {filename}"))
+        with open(filename, encoding="utf-8") as f:
+            assert "simulator_ticks_total 5" in f.read()
+    finally:
+        os.remove(filename)
+    
+    print(parser.parse_command("metrics serve 0"))
+    host, port = parser.commands["metrics"].server.address
+    with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+        assert "simulator_hops_total" in response.read().decode("utf-8")
+    
+    # Mientras un comando modifica la red, la petición espera al candado de la CLI
+    responses = []
+    with parser.config_manager.lock:
+        request = threading.Thread(target=lambda: responses.append(
+            urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=10).read()))
+        request.start()
+        request.join(0.2)
+        assert not responses
+    request.join()
+    assert b"simulator_devices" in responses[0]
+    print(parser.parse_command("metrics serve stop"))
+    
+    parser.parse_command("metrics off")
+    assert network.metrics is None
+
+def test_profile():
+    """Prueba el perfilado bajo demanda de ticks y comandos"""
+    print("\n=== Prueba de Perfilado ===")
+    
+    import pstats
+    import tempfile
+    
+    network = Network()
+    for index in range(3):
+        network.add_device(f"D{index}", "router")
+        device = network.get_device(f"D{index}")
+        device.add_interface("e0", f"10.0.{index}.1/24")
+        device.add_interface("e1", f"10.1.{index}.1/24")
+        for interface in device.interfaces.values():
+            interface.no_shutdown()
+    for index in range(2):
+        network.connect_interfaces(f"D{index}", "e1", f"D{index + 1}", "e0")
+    for index in range(3):
+        network.send_packet("10.0.0.1", f"10.0.{index}.1", f"m{index}")
+    
+    parser = CLIParser(network, ConfigManager())
+    parser.parse_command("enable")
+    with tempfile.NamedTemporaryFile(suffix=".pstats", delete=False) as f:
+        filename = f.name
+    try:
+        report = parser.parse_command(f"profile tick 5 memory top 5 output {filename}")
+        print(report)
+        assert "process_packets" in report
+        assert "Pico de memoria" in report
+        # El perfil se ejecuta sobre la red real: los paquetes se entregan
+        assert network.global_statistics["total_packets_delivered"] > 0
+        stats = pstats.Stats(filename)
+        assert any(function[2] == "process_packets" for function in stats.stats)
+    finally:
+        os.remove(filename)
+    
+    report = parser.parse_command('profile command "show statistics"')
+    assert "get_network_statistics" in report
+    assert parser.parse_command("profile tick cero").startswith("Error")
+    assert parser.parse_command('profile command "profile tick 1"').startswith("Error")
+    assert parser.parse_command("profile tick 1 top -1").startswith("Error")
+    assert parser.parse_command("profile tick 1 workers 0").startswith("Error")
+    assert parser.parse_command('profile command "show statistics" workers 2').startswith("Error")
+    
+    # Con workers se perfila el mismo reparto en procesos que el comando tick
+    network.send_packet("10.0.0.1", "10.0.2.1", "m3")
+    report = parser.parse_command("profile tick 2 workers 2 top 5")
+    print(report)
+    assert report.startswith("[Tick x2, ") and "procesos" in report
+    assert "sharding.py" in report
+
+def test_ip_index():
+    """Prueba el índice de direcciones IP de la red"""
+    print("\n=== Prueba del Índice de IPs ===")
+    
+    network = Network()
+    network.add_device("Router1", "router")
+    network.add_device("PC1", "host")
+    
+    router = network.get_device("Router1")
+    router.add_interface("g0/0", "192.168.1.1")
+    pc1 = network.get_device("PC1")
+    pc1.add_interface("eth0", "192.168.1.2")
+    
+    device, interface = network.find_interface_by_ip("192.168.1.2")
+    print(f"192.168.1.2 -> {device.name} {interface.name}")
+    assert device is pc1
+    
+    # Cambio de IP y detección de duplicados
+    pc1.get_interface("eth0").set_ip_address("192.168.1.1")
+    print(f"IPs duplicadas: {network.get_duplicate_ips()}")
+    assert "192.168.1.1" in network.get_duplicate_ips()
+    assert network.find_interface_by_ip("192.168.1.2") == (None, None)
+    
+    # Al eliminar el propietario, el índice pasa al siguiente
+    network.remove_device("Router1")
+    device, interface = network.find_interface_by_ip("192.168.1.1")
+    print(f"192.168.1.1 tras eliminar Router1 -> {device.name} {interface.name}")
+    assert device is pc1
+    assert not network.get_duplicate_ips()
+    
+    pc1.remove_interface("eth0")
+    assert network.find_interface_by_ip("192.168.1.1") == (None, None)
+
+def test_routing():
+    """Prueba el enrutamiento por camino más corto"""
+    print("\n=== Prueba de Enrutamiento ===")
+    
+    network = Network()
+    # Anillo A - B - C - D - A: de A a C hay dos caminos de 2 saltos
+    names = ["A", "B", "C", "D"]
+    for index, name in enumerate(names):
+        network.add_device(name, "router")
+        device = network.get_device(name)
+        device.add_interface("e0", f"10.0.{index}.1")
+        device.add_interface("e1", f"10.0.{index}.2")
+        for interface in device.get_interfaces():
+            interface.no_shutdown()
+    for index, name in enumerate(names):
+        network.connect_interfaces(name, "e1", names[(index + 1) % 4], "e0")
+    
+    table = network.routing.get_table("A")
+    print(f"Tabla de A: {table}")
+    assert table["B"][3] == 1 and table["C"][3] == 2 and table["D"][3] == 1
+    
+    network.send_packet("10.0.0.1", "10.0.2.1", "Hola C")
+    for _ in range(5):
+        network.process_packets()
+    history = network.get_device("C").get_history()
+    print(f"Camino hasta C: {history[0]['path']}")
+    assert len(history) == 1 and history[0]["path"].count("→") == 2
+    
+    # Apagar B obliga a recalcular la ruta por D
+    rebuilds = network.routing.rebuilds
+    network.get_device("B").set_status("offline")
+    assert network.routing.get_table("A")["C"][1] == "D"
+    assert network.routing.rebuilds == rebuilds + 1
+    network.routing.get_table("A")
+    assert network.routing.rebuilds == rebuilds + 1
+
+def test_fib():
+    """Prueba la FIB por prefijo más largo y las subredes CIDR"""
+    print("\n=== Prueba de FIB (prefijo más largo) ===")
+    
+    from fib import PrefixTrie
+    from ip_utils import ip_to_int
+    
+    trie = PrefixTrie()
+    trie.insert(ip_to_int("10.0.0.0"), 8, "red-10")
+    trie.insert(ip_to_int("10.1.0.0"), 16, "red-10.1")
+    trie.insert(ip_to_int("10.1.2.0"), 24, "red-10.1.2")
+    trie.insert(ip_to_int("0.0.0.0"), 0, "por-defecto")
+    print(f"Trie: {trie}")
+    assert trie.lookup(ip_to_int("10.1.2.3")) == "red-10.1.2"
+    assert trie.lookup(ip_to_int("10.1.9.9")) == "red-10.1"
+    assert trie.lookup(ip_to_int("10.200.0.1")) == "red-10"
+    assert trie.lookup(ip_to_int("192.168.0.1")) == "por-defecto"
+    assert len(trie) == 4
+    
+    # Router con dos subredes /24; los hosts se alcanzan por su red
+    network = Network()
+    network.add_device("R1", "router")
+    network.add_device("R2", "router")
+    network.add_device("H1", "host")
+    network.add_device("H2", "host")
+    network.get_device("R1").add_interface("g0/0", "10.0.1.1/24")
+    network.get_device("R1").add_interface("g0/1", "172.16.0.1/30")
+    network.get_device("R2").add_interface("g0/0", "172.16.0.2/30")
+    network.get_device("R2").add_interface("g0/1", "10.0.2.1/24")
+    network.get_device("H1").add_interface("eth0", "10.0.1.10/24")
+    network.get_device("H2").add_interface("eth0", "10.0.2.20/24")
+    for device in network.devices.values():
+        for interface in device.get_interfaces():
+            interface.no_shutdown()
+    network.connect_interfaces("H1", "eth0", "R1", "g0/0")
+    network.connect_interfaces("R1", "g0/1", "R2", "g0/0")
+    network.connect_interfaces("R2", "g0/1", "H2", "eth0")
+    
+    fib = network.routing.get_fib("R1")
+    print(f"FIB de R1: {fib}")
+    assert fib.get_size() == 3  # una entrada por red, no por host
+    
+    network.send_packet("10.0.1.10", "10.0.2.20", "Hola H2")
+    for _ in range(4):
+        network.process_packets()
+    history = network.get_device("H2").get_history()
+    print(f"Camino hasta H2: {history[0]['path']}")
+    assert history[0]["path"] == "H1 → R1 → R2 → H2"
+    
+    # 'ip address' admite notación CIDR; sin prefijo la dirección es /32
+    parser = CLIParser(network, ConfigManager())
+    network.set_current_device("R1")
+    for command in ["enable", "configure terminal", "interface g0/2", "ip address 10.0.3.1/24"]:
+        parser.parse_command(command)
+    interface = network.get_device("R1").get_interface("g0/2")
+    assert (interface.ip_address, interface.prefix_length) == ("10.0.3.1", 24)
+    assert interface.get_cidr() == "10.0.3.1/24"
+    parser.parse_command("ip address 10.0.3.2")
+    assert (interface.ip_address, interface.prefix_length) == ("10.0.3.2", 32)
+    assert parser.parse_command("ip address 10.0.3.1/33").startswith("Error")
+
+def test_event_engine():
+    """Prueba la simulación por eventos discretos con latencia por enlace"""
+    print("\n=== Prueba del Motor de Eventos ===")
+    
+    network = Network()
+    for index, name in enumerate(["A", "B", "C"]):
+        network.add_device(name, "router")
+        device = network.get_device(name)
+        device.add_interface("e0", f"10.0.{index}.1")
+        device.add_interface("e1", f"10.0.{index}.2")
+        for interface in device.get_interfaces():
+            interface.no_shutdown()
+    network.connect_interfaces("A", "e1", "B", "e0", latency=5)
+    # 8000 bps: un paquete de 100 bytes (80 + 20 de cabecera) tarda 100 ms
+    network.connect_interfaces("B", "e1", "C", "e0", latency=2, bandwidth=8000)
+    
+    network.send_packet("10.0.0.1", "10.0.2.1", "x" * 80)
+    network.send_packet("10.0.0.1", "10.0.2.1", "x" * 80)
+    
+    result = network.events.run_until(100)
+    print(f"Hasta 100 ms: {result}")
+    assert result["delivered"] == 0
+    
+    result = network.events.run_until(300)
+    print(f"Hasta 300 ms: {result}")
+    # Llegadas a C: 5 + 100 + 2 = 107 ms y, tras esperar el enlace, 207 ms
+    assert result["delivered"] == 2 and result["pending"] == 0
+    assert network.get_device("C").get_history()[0]["path"] == "A → B → C"
+    
+    # Opciones de enlace incompletas o no positivas se rechazan sin conectar
+    from config_manager import parse_link_options
+    assert parse_link_options(["latency", "1.5", "bandwidth", "100"]) == (1.5, 100.0)
+    for options in (["latency"], ["latency", "2", "bandwidth"], ["latency", "-1"],
+                    ["latency", "0"], ["latency", "nan"], ["bandwidth", "inf"]):
+        try:
+            parse_link_options(options)
+            assert False, f"Opciones aceptadas: {options}"
+        except ValueError as e:
+            print(f"  {' '.join(options)} -> {e}")
+    parser = CLIParser(network, ConfigManager())
+    network.get_device("A").add_interface("e2", "10.0.0.3")
+    network.set_current_device("A")
+    parser.parse_command("enable")
+    assert parser.parse_command("connect e2 C e1 latency").startswith("Error")
+    assert network.connections.find(("A", "e2", "C", "e1")) is None
+
+def test_send_batch():
+    """Prueba el envío de paquetes por lotes desde archivo"""
+    print("\n=== Prueba de Envío por Lotes ===")
+    
+    network = Network()
+    network.add_device("A", "host")
+    network.add_device("B", "host")
+    network.get_device("A").add_interface("eth0", "10.0.0.1")
+    network.get_device("B").add_interface("eth0", "10.0.0.2")
+    for device in network.devices.values():
+        device.get_interface("eth0").no_shutdown()
+    network.connect_interfaces("A", "eth0", "B", "eth0")
+    
+    import tempfile
+    
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8", delete=False) as f:
+        filename = f.name
+        f.write("source_ip,destination_ip,message,ttl\n")
+        f.write("10.0.0.1,10.0.0.2,hola,5\n")
+        f.write("10.0.0.2,10.0.0.1,adios\n")
+        f.write("10.9.9.9,10.0.0.1,sin origen\n")
+        f.write("10.0.0.1,10.0.0.2,ttl,malo\n")
+    
+    parser = CLIParser(network, ConfigManager())
+    try:
+        print(parser.parse_command(f"send batch {filename}"))
+    finally:
+        os.remove(filename)
+    assert network.global_statistics["total_packets_sent"] == 2
+    
+    network.process_packets()
+    assert network.get_device("B").get_history()[0]["message"] == "hola"
+    assert network.get_device("A").get_history()[0]["message"] == "adios"
+
+def test_history_size():
+    """Prueba el historial acotado por dispositivo"""
+    print("\n=== Prueba de Historial Acotado ===")
+    
+    network = Network()
+    network.add_device("A", "host")
+    network.add_device("B", "host")
+    network.get_device("A").add_interface("eth0", "10.0.0.1")
+    network.get_device("B").add_interface("eth0", "10.0.0.2")
+    for device in network.devices.values():
+        device.get_interface("eth0").no_shutdown()
+    network.connect_interfaces("A", "eth0", "B", "eth0")
+    
+    parser = CLIParser(network, ConfigManager())
+    for cmd in ["enable", "configure terminal", "history-size 2", "history-size 5 A"]:
+        print(f"  {cmd} -> {parser.parse_command(cmd)}")
+    
+    for index in range(4):
+        network.send_packet("10.0.0.1", "10.0.0.2", f"msg{index}")
+        network.send_packet("10.0.0.2", "10.0.0.1", f"msg{index}")
+    network.process_packets()
+    
+    device_b = network.get_device("B")
+    print(f"Historial de B: {[info['message'] for info in device_b.get_history()]}")
+    assert [info["message"] for info in device_b.get_history()] == ["msg3", "msg2"]
+    assert device_b.packets_processed == 4
+    assert len(network.get_device("A").get_history()) == 4
+
+def test_history_paths():
+    """Prueba el formateo perezoso de los caminos guardados en el historial"""
+    print("\n=== Prueba de Caminos en el Historial ===")
+    
+    import gc
+    from array import array
+    from device import Device
+    from packet import Packet
+    
+    device = Device("C", "host")
+    device.set_history_size(3)
+    packet = Packet("10.0.0.1", "10.0.0.3", "primero")
+    for name in ["A", "B", "C"]:
+        packet.add_hop(name)
+    device.add_to_history(packet)
+    
+    # Se guarda la referencia al array del camino, no el texto
+    record = next(iter(device.history))
+    assert isinstance(record[5], array) and record[5] is packet.path
+    
+    # Reutilizar el objeto paquete con otro camino y liberarlo no altera el historial
+    packet.path = array("I")
+    packet.add_hop("X")
+    del packet
+    gc.collect()
+    assert device.get_history()[0]["path"] == "A → B → C"
+    
+    # Al llenarse, el búfer circular descarta los más antiguos y los caminos siguen bien
+    for index in range(4):
+        packet = Packet("10.0.0.1", "10.0.0.3", f"msg{index}")
+        for name in ["A", f"R{index}", "C"]:
+            packet.add_hop(name)
+        device.add_to_history(packet)
+    history = device.get_history()
+    print(f"Caminos: {[info['path'] for info in history]}")
+    assert [info["message"] for info in history] == ["msg3", "msg2", "msg1"]
+    assert [info["path"] for info in history] == ["A → R3 → C", "A → R2 → C", "A → R1 → C"]
+
+def test_packet_store():
+    """Prueba el almacén vectorizado de paquetes (o su ausencia sin NumPy)"""
+    print("\n=== Prueba del Almacén Vectorizado ===")
+    
+    from packet_store import NUMPY_AVAILABLE
+    
+    def build_and_run(vectorized):
+        network = Network()
+        for index, name in enumerate(["A", "B", "C", "D"]):
+            network.add_device(name, "router")
+            device = network.get_device(name)
+            device.add_interface("e0", f"10.0.{index}.1")
+            device.add_interface("e1", f"10.0.{index}.2")
+            for interface in device.get_interfaces():
+                interface.no_shutdown()
+        for first, second in [("A", "B"), ("B", "C"), ("C", "D")]:
+            network.connect_interfaces(first, "e1", second, "e0")
+        success, message = network.enable_packet_store(vectorized)
+        print(f"  {message}")
+        
+        # Un TTL enorme no debe reservar columnas de saltos para todo el TTL
+        network.send_packets([("10.0.0.1", "10.0.3.1", "lejos", 1000000),
+                              ("10.0.0.1", "10.0.3.1", "sin ttl", 2),
+                              ("10.0.3.2", "10.0.1.1", "vuelta", 10),
+                              ("10.0.1.1", "10.9.9.9", "sin destino", 10)])
+        for _ in range(5):
+            network.process_packets()
+        if network.packet_store is not None:
+            assert network.packet_store.hops.shape[1] <= 4  # Caminos de como mucho 3 saltos
+        
+        # Interfaces caídas: los paquetes esperan en sus colas (salida de A e0,
+        # entrada local de D e1) y el que cruza C e0 se queda sin ruta
+        network.get_device("A").get_interface("e0").shutdown()
+        network.get_device("D").get_interface("e1").shutdown()
+        network.send_packets([("10.0.0.1", "10.0.1.1", "retenido", 10),
+                              ("10.0.3.1", "10.0.3.2", "local", 10),
+                              ("10.0.0.2", "10.0.3.2", "por e0", 10),
+                              ("10.0.1.2", "10.0.3.1", "cortado", 10)])
+        network.process_packets()
+        network.get_device("C").get_interface("e0").shutdown()
+        for _ in range(4):
+            network.process_packets()
+        down = dict(network.global_statistics)
+        for name, interface_name in [("A", "e0"), ("C", "e0"), ("D", "e1")]:
+            network.get_device(name).get_interface(interface_name).no_shutdown()
+        for _ in range(4):
+            network.process_packets()
+        return (down, dict(network.global_statistics),
+                {name: (device.packets_dropped,
+                        [(info["message"], info["path"]) for info in device.get_history()])
+                 for name, device in network.devices.items()})
+    
+    expected = build_and_run(False)
+    print(f"Por objetos: {expected[1]}")
+    if not NUMPY_AVAILABLE:
+        success, message = Network().enable_packet_store(True)
+        assert not success
+        return
+    
+    vectorized = build_and_run(True)
+    print(f"Vectorizado: {vectorized[1]}")
+    assert vectorized == expected
+
+def test_sharding():
+    """Prueba la simulación repartida entre procesos frente a un solo proceso"""
+    print("\n=== Prueba de Simulación en Varios Procesos ===")
+    
+    from sharding import ShardedSimulator, partition_devices
+    
+    def build():
+        network = Network()
+        names = ["A", "B", "C", "D", "E", "F"]
+        for index, name in enumerate(names):
+            network.add_device(name, "router")
+            device = network.get_device(name)
+            device.add_interface("e0", f"10.0.{index}.1")
+            device.add_interface("e1", f"10.0.{index}.2")
+            for interface in device.get_interfaces():
+                interface.no_shutdown()
+        for first, second in zip(names, names[1:]):
+            network.connect_interfaces(first, "e1", second, "e0")
+        network.send_packets([("10.0.0.1", "10.0.5.1", "lejos", 10),
+                              ("10.0.0.1", "10.0.5.1", "sin ttl", 3),
+                              ("10.0.5.2", "10.0.1.1", "vuelta", 10),
+                              ("10.0.2.1", "10.0.3.1", "vecino", 10),
+                              ("10.0.1.1", "10.9.9.9", "sin destino", 10)])
+        return network
+    
+    def snapshot(network):
+        return (dict(network.global_statistics),
+                {name: (device.packets_processed, device.packets_dropped,
+                        [(info["message"], info["ttl_at_arrival"], info["path"])
+                         for info in device.get_history()])
+                 for name, device in network.devices.items()})
+    
+    single = build()
+    for _ in range(8):
+        single.process_packets()
+    
+    sharded = build()
+    print(f"Regiones: {partition_devices(sharded, 3)}")
+    result = ShardedSimulator(sharded, 3).run(4)
+    result = ShardedSimulator(sharded, 2).run(4)
+    print(f"Varios procesos: {result}")
+    print(f"Estadísticas: {sharded.global_statistics}")
+    assert snapshot(sharded) == snapshot(single)
+    
+    # Con otros hilos vivos no se usa fork: los procesos arrancan con spawn
+    import threading
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        sharded = build()
+        sharded.enable_metrics()
+        parser = CLIParser(sharded, ConfigManager())
+        output = parser.parse_command("tick 8 workers 2")
+        print(output)
+        assert "(spawn)" in output and "Advertencia: las métricas" in output
+    finally:
+        stop.set()
+        thread.join()
+    assert snapshot(sharded) == snapshot(single)
+
 def test_cli_parser():
     """Prueba el parser CLI"""
     print("\n=== Prueba del Parser CLI ===")
@@ -171,7 +831,8 @@ def test_cli_parser():
         "no shutdown",
         "exit",
         "exit",
-        "show interfaces"
+        "show interfaces",
+        "show ip route"
     ]
     
     print("Ejecutando comandos CLI:")
@@ -179,6 +840,133 @@ def test_cli_parser():
         result = parser.parse_command(cmd)
         print(f"  {cmd} -> {result}")
 
+def test_run_script():
+    """Prueba la ejecución de comandos desde un archivo"""
+    print("\n=== Prueba de Scripts ===")
+    
+    import io
+    import tempfile
+    
+    network = Network()
+    network.add_device("R1", "router")
+    parser = CLIParser(network, ConfigManager())
+    
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as script:
+        script.write("# Configuración de R1\n"
+                     "enable\n"
+                     "configure terminal\n"
+                     "interface g0/0\n"
+                     "ip address 10.0.0.1/24\n"
+                     "no shutdown\n"
+                     "end\n"
+                     "\n"
+                     "comando-inexistente\n"
+                     "show interfaces\n")
+        filename = script.name
+    
+    try:
+        output = io.StringIO()
+        summary = parser.run_script(filename, output=output)
+        print(output.getvalue())
+        print(parser.format_script_summary(filename, summary))
+        assert summary["commands"] == 8 and summary["errors"] == 1
+        assert "10.0.0.1/24" in output.getvalue()
+        assert parser.mode == "privileged"
+        
+        quiet = parser.parse_command(f"run-script {filename} quiet")
+        print(quiet)
+        assert quiet.startswith("Script ")
+    finally:
+        os.remove(filename)
+
+def test_cli_server():
+    """Prueba varias sesiones CLI concurrentes sobre la misma red"""
+    print("\n=== Prueba del Servidor CLI ===")
+    
+    import asyncio
+    import threading
+    import time
+    from cli_server import CLIServer
+    
+    network = Network()
+    network.add_device("R1", "router")
+    network.add_device("R2", "router")
+    network.get_device("R2").add_interface("g0/0", "10.0.0.2")
+    network.get_device("R2").get_interface("g0/0").no_shutdown()
+    
+    async def scenario():
+        cli_server = CLIServer(network, ConfigManager())
+        server = await cli_server.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        
+        async def open_session():
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await reader.readuntil(b"> ")
+            return reader, writer
+        
+        async def command(session, line):
+            reader, writer = session
+            writer.write(f"{line}\n".encode())
+            return (await reader.readuntil(b"# " if line != "disable" else b"> ")).decode()
+        
+        first = await open_session()
+        second = await open_session()
+        await command(first, "enable")
+        await command(first, "configure terminal")
+        output = await command(first, "interface g0/1")
+        assert "R1(config-if)# " in output
+        await command(first, "ip address 10.0.0.1/24")
+        
+        # La segunda sesión conserva su propio modo
+        output = await command(second, "enable")
+        assert output.endswith("R1# ")
+        
+        # Consultas simultáneas desde varias sesiones
+        sessions = [second] + [await open_session() for _ in range(4)]
+        for session in sessions[1:]:
+            await command(session, "enable")
+        outputs = await asyncio.gather(*[command(session, "show interfaces") for session in sessions])
+        assert all("10.0.0.1/24" in output for output in outputs)
+        print(f"Sesiones abiertas: {cli_server.get_session_count()}")
+        
+        # Si otra sesión reemplaza la red, la primera no modifica el dispositivo huérfano
+        configured = network.get_device("R1").get_interface("g0/1")
+        print(f"Interfaz configurada desde la sesión: {configured}")
+        await command(second, "generate star 2")
+        output = await command(first, "ip address 10.0.0.5")
+        print(f"Tras reemplazar la red: {output.strip()}")
+        assert "no disponible en modo privileged" in output
+        assert configured.get_cidr() == "10.0.0.1/24"
+        assert "R1" not in network.devices
+        
+        # Con el candado de la red en otro hilo (p. ej. el guardado automático),
+        # la consulta espera en un hilo aparte y el bucle sigue atendiendo
+        held = threading.Event()
+        
+        def hold():
+            with cli_server.config_manager.lock:
+                held.set()
+                time.sleep(0.3)
+        
+        holder = threading.Thread(target=hold)
+        holder.start()
+        held.wait()
+        query = asyncio.ensure_future(command(sessions[1], "show interfaces"))
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        assert time.perf_counter() - start < 0.2 and not query.done()
+        assert (await query).endswith("# ")
+        holder.join()
+        
+        for reader, writer in [first] + sessions:
+            writer.write(b"quit\n")
+            await reader.read()
+            writer.close()
+        server.close()
+        await server.wait_closed()
+    
+    asyncio.run(scenario())
+
 def test_config_manager():
     """Prueba el gestor de configuración"""
     print("\n=== Prueba del Gestor de Configuración ===")
@@ -210,14 +998,375 @@ def test_config_manager():
     success, message = config_manager.load_from_dict(network, test_config)
     print(f"Carga de configuración: {message}")
     
-    # Guardar configuración
-    success, message = config_manager.save_config(network, "test_config.json")
+    # Guardar configuración (el archivo respeta la umask vigente)
+    umask = os.umask(0o027)
+    try:
+        success, message = config_manager.save_config(network, "test_config.json")
+    finally:
+        os.umask(umask)
     print(f"Guardado de configuración: {message}")
+    assert success and os.stat("test_config.json").st_mode & 0o777 == 0o640
     
     # Exportar CLI
     success, message = config_manager.export_cli_config(network, "test_running-config.txt")
     print(f"Exportación CLI: {message}")
 
+def test_import_cli_config():
+    """Prueba la importación masiva de configuración CLI"""
+    print("\n=== Prueba de Importación CLI ===")
+    
+    import tempfile
+    
+    network = Network()
+    for index, name in enumerate(["A", "B", "C"]):
+        network.add_device(name, "router")
+        device = network.get_device(name)
+        device.add_interface("e0", f"10.0.{index}.1/24")
+        device.add_interface("e1")
+        device.get_interface("e0").no_shutdown()
+    network.connect_interfaces("A", "e0", "B", "e0", latency=2.5)
+    network.connect_interfaces("B", "e1", "C", "e0")
+    
+    config_manager = ConfigManager()
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        filename = f.name
+    try:
+        config_manager.export_cli_config(network, filename)
+        with open(filename, "a", encoding="utf-8") as f:
+            f.write("\nconnect A e0 B e0\n"      # Duplicada
+                    "connect B e0 A e0\n"        # Duplicada en sentido inverso
+                    "connect A e9 C e1\n"        # Interfaz inexistente
+                    "connect A e1\n"             # Faltan argumentos
+                    "ip address 10.0.0.9\n")     # Fuera de un bloque interface
+        
+        imported = Network()
+        success, message = config_manager.import_cli_config(imported, filename)
+        print(message)
+        assert success and "5 líneas con error" in message
+        assert imported.connections == network.connections
+        assert imported.link_properties == network.link_properties
+        for name, device in network.devices.items():
+            for interface in device.interfaces.values():
+                copy = imported.get_device(name).get_interface(interface.name)
+                assert copy.get_cidr() == interface.get_cidr() and copy.status == interface.status
+                assert copy.get_neighbors() == interface.get_neighbors()
+    finally:
+        os.remove(filename)
+
+def test_topology():
+    """Prueba el generador de topologías sintéticas"""
+    print("\n=== Prueba de Topologías ===")
+    
+    import json
+    import tempfile
+    import time
+    import topology
+    
+    expected = {  # (tipo, parámetros) -> (dispositivos, enlaces)
+        ("line", (5,)): (5, 4),
+        ("ring", (5,)): (5, 5),
+        ("star", (4,)): (5, 4),
+        ("tree", (2, 3)): (13, 12),
+        ("mesh", (4,)): (4, 6),
+        ("fat-tree", (4,)): (36, 48),
+        ("random", (10, 20)): (10, 20)
+    }
+    for (kind, params), (devices, links) in expected.items():
+        generated = topology.generate(kind, list(params), seed=1)
+        print(generated)
+        assert (len(generated.devices), len(generated.links)) == (devices, links)
+    assert topology.generate("random", [10, 20], 7).links == topology.generate("random", [10, 20], 7).links
+    
+    network = Network()
+    parser = CLIParser(network, ConfigManager())
+    parser.parse_command("enable")
+    print(parser.parse_command("generate fat-tree 4"))
+    assert len(network.devices) == 36 and len(network.connections) == 48
+    source = network.get_device("H0-0-0").get_interface("e0").ip_address
+    destination = network.get_device("H3-1-1").get_interface("e0").ip_address
+    network.send_packet(source, destination, "fat-tree")
+    for _ in range(10):
+        network.process_packets()
+    assert network.global_statistics["total_packets_delivered"] == 1
+    
+    with tempfile.TemporaryDirectory() as directory:
+        config_file = os.path.join(directory, "generated.json")
+        cli_file = os.path.join(directory, "generated.txt")
+        print(parser.parse_command(f"generate ring 6 output {config_file}"))
+        print(parser.parse_command(f"generate ring 6 output {cli_file}"))
+        assert len(network.devices) == 36  # Con output la red no cambia
+        
+        ring = Network()
+        topology.build(topology.generate("ring", [6]), ring)
+        with open(config_file, encoding="utf-8") as f:
+            assert json.load(f) == json.loads(json.dumps(ring.to_dict()))
+        imported = Network()
+        assert ConfigManager().import_cli_config(imported, cli_file)[0]
+        assert imported.connections == ring.connections
+    
+    assert parser.parse_command("generate ring 2").startswith("Error")
+    assert parser.parse_command("generate random 5 3").startswith("Error")
+    assert parser.parse_command("generate torus 3").startswith("Error")
+    # Los límites se comprueban sin calcular fanout ** depth
+    start = time.perf_counter()
+    assert parser.parse_command("generate tree 1000000000 10").startswith("Error")
+    assert parser.parse_command("generate tree 10 1000000000").startswith("Error")
+    assert time.perf_counter() - start < 1
+
+def test_config_stream():
+    """Prueba la carga incremental de configuraciones JSON"""
+    print("\n=== Prueba de Carga Incremental ===")
+    
+    import json
+    import tempfile
+    import config_stream
+    
+    network = Network()
+    for index, name in enumerate(["A", "B", "C"]):
+        network.add_device(name, "router")
+        device = network.get_device(name)
+        device.add_interface("e0", f"10.0.{index}.1/24")
+        device.add_interface("e1", f"10.1.{index}.1")
+        device.get_interface("e0").no_shutdown()
+    network.connect_interfaces("A", "e1", "B", "e0", latency=2.5)
+    network.connect_interfaces("B", "e1", "C", "e0")
+    network.set_history_size(50)
+    expected = network.to_dict()
+    
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(expected, f, indent=2)
+        filename = f.name
+    
+    # Conexiones antes que los dispositivos: se reintentan al final
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        f.write('{"connections": [["A", "e1", "B", "e0"]], "devices": {'
+                '"A": {"interfaces": {"e1": {"ip_address": "10.0.0.1"}}}, '
+                '"B": {"interfaces": {"e0": {"ip_address": "10.0.0.2"}}}}}')
+        reordered = f.name
+    
+    chunk_size = config_stream.CHUNK_SIZE
+    try:
+        config_stream.CHUNK_SIZE = 7  # Fuerza valores repartidos entre bloques
+        for use_ijson in [False, True] if config_stream.IJSON_AVAILABLE else [False]:
+            loaded = Network()
+            success, message = ConfigManager().load_config(loaded, filename, measure_memory=True,
+                                                           use_ijson=use_ijson)
+            print(message)
+            assert success and loaded.to_dict() == expected
+        
+        loaded = Network()
+        success, message = ConfigManager().load_config(loaded, reordered)
+        print(message)
+        assert loaded.connections == [("A", "e1", "B", "e0")]
+        
+        # Un archivo truncado no debe vaciar ni cargar a medias la red actual
+        with open(filename, encoding="utf-8") as f:
+            text = f.read()
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(text[:len(text) * 2 // 3])
+        for use_ijson in [False, True] if config_stream.IJSON_AVAILABLE else [False]:
+            success, message = ConfigManager().load_config(loaded, filename, use_ijson=use_ijson)
+            print(message)
+            assert not success
+            assert sorted(loaded.devices) == ["A", "B"]
+            assert all(device.network is loaded for device in loaded.devices.values())
+            assert loaded.connections == [("A", "e1", "B", "e0")]
+            assert loaded.find_interface_by_ip("10.0.0.2")[0] is loaded.get_device("B")
+    finally:
+        config_stream.CHUNK_SIZE = chunk_size
+        os.remove(filename)
+        os.remove(reordered)
+
+def test_snapshot():
+    """Prueba las instantáneas binarias de la red"""
+    print("\n=== Prueba de Instantáneas Binarias ===")
+    
+    import tempfile
+    import snapshot
+    
+    network = Network()
+    for index, name in enumerate(["A", "B", "C"]):
+        network.add_device(name, "router" if index else "host")
+        device = network.get_device(name)
+        device.add_interface("e0", f"10.0.{index}.1/24")
+        device.add_interface("e1", "010.1.1.1" if index == 2 else None)
+        device.get_interface("e0").no_shutdown()
+    network.connect_interfaces("A", "e0", "B", "e0", latency=2.5, bandwidth=100)
+    network.connect_interfaces("B", "e1", "C", "e0")
+    network.get_device("C").set_status("offline")
+    network.get_device("B").set_history_size(5)
+    network.set_current_device("B")
+    expected = network.to_dict()
+    
+    with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as f:
+        filename = f.name
+    try:
+        config_manager = ConfigManager()
+        success, message = config_manager.save_snapshot(network, filename)
+        print(message)
+        assert success
+        
+        with snapshot.SnapshotReader(filename) as reader:
+            print(f"Cabecera: {reader.device_count} dispositivos, "
+                  f"{reader.interface_count} interfaces, {reader.connection_count} conexiones")
+            assert reader.interface_count == 6
+        
+        loaded = Network()
+        success, message = config_manager.load_snapshot(loaded, filename)
+        print(message)
+        assert success and loaded.to_dict() == expected
+        assert loaded.find_interface_by_ip("10.0.2.1")[0].name == "C"
+        assert loaded.current_device.name == "B"
+        
+        # Un índice de cadena fuera de rango en el tipo del último dispositivo
+        # solo se detecta al construirlo: la red cargada no debe cambiar
+        with snapshot.SnapshotReader(filename) as reader:
+            offset = sum(length + len(snapshot._padding(length)) for length in [
+                snapshot._HEADER.size, 4 * (reader.string_count + 1),
+                len(reader.string_data), 4 * reader.device_count])
+        with open(filename, "r+b") as f:
+            f.seek(offset + 4 * 2)
+            f.write(b"\xff" * 4)
+        success, message = config_manager.load_snapshot(loaded, filename)
+        print(message)
+        assert not success and loaded.to_dict() == expected
+        assert all(device.network is loaded for device in loaded.devices.values())
+        
+        with open(filename, "wb") as f:
+            f.write(b"no es una instantanea")
+        success, message = config_manager.load_snapshot(Network(), filename)
+        print(message)
+        assert not success
+    finally:
+        os.remove(filename)
+
+def test_journal():
+    """Prueba el diario de cambios y su compactación"""
+    print("\n=== Prueba de Diario de Cambios ===")
+    
+    import tempfile
+    from main import persist
+    
+    directory = tempfile.mkdtemp()
+    checkpoint_file = os.path.join(directory, "network_config.json")
+    journal_file = os.path.join(directory, "network_config.journal")
+    
+    def start():
+        network = Network()
+        config_manager = ConfigManager()
+        if os.path.exists(checkpoint_file):
+            config_manager.load_config(network, checkpoint_file)
+        else:
+            network.add_device("R1", "router")
+            network.add_device("R2", "router")
+            network.get_device("R2").add_interface("g0", "10.0.0.2")
+        parser = CLIParser(network, config_manager)
+        success, message = config_manager.open_journal(parser, journal_file, checkpoint_file)
+        print(message)
+        assert success
+        return network, config_manager, parser
+    
+    try:
+        network, config_manager, parser = start()
+        for command in ["enable", "configure terminal", "interface g0", "ip address 10.0.0.1/24",
+                        "no shutdown", "end", "connect g0 R2 g0", "connect g0 R2 g0",
+                        "set_device_status R2 offline", "show interfaces"]:
+            parser.parse_command(command)
+        assert config_manager.journal.records == 5  # El connect repetido falla y no se registra
+        expected = network.to_dict()
+        print(config_manager.close_journal()[1])
+        
+        network, config_manager, parser = start()
+        assert network.to_dict()["devices"] == expected["devices"]
+        assert network.connections == [("R1", "g0", "R2", "g0")]
+        
+        # Al superar el umbral se reescribe el checkpoint y el diario queda vacío
+        config_manager.journal.compact_records = 2
+        parser.parse_command("set_device_status R2 online")
+        assert config_manager.journal.records == 0
+        parser.parse_command("set_device_status R1 offline")
+        config_manager.close_journal()
+        
+        network, config_manager, parser = start()
+        assert network.get_device("R2").is_online() and not network.get_device("R1").is_online()
+        
+        # El tráfico no pasa por el diario: al salir se escribe un checkpoint final
+        parser.parse_command("set_device_status R1 online")
+        network.get_device("R2").get_interface("g0").no_shutdown()
+        network.send_packet("10.0.0.1", "10.0.0.2", "hola")
+        for _ in range(3):
+            network.process_packets()
+        statistics = dict(network.global_statistics)
+        assert statistics["total_packets_delivered"] == 1
+        print(persist(network, config_manager)[1])
+        
+        network, config_manager, parser = start()
+        assert network.global_statistics == statistics
+        assert network.get_device("R2").packets_processed == 1
+        print(persist(network, config_manager)[1])  # Sin tráfico nuevo solo se cierra el diario
+        assert config_manager.journal is None
+    finally:
+        for filename in [checkpoint_file, journal_file]:
+            if os.path.exists(filename):
+                os.remove(filename)
+        os.rmdir(directory)
+
+def test_autosave():
+    """Prueba el guardado automático en segundo plano"""
+    print("\n=== Prueba de Guardado Automático ===")
+    
+    import json
+    import tempfile
+    import time
+    from autosave import Autosave
+    
+    directory = tempfile.mkdtemp()
+    checkpoint_file = os.path.join(directory, "network_config.json")
+    journal_file = os.path.join(directory, "network_config.journal")
+    
+    network = Network()
+    network.add_device("R1", "router")
+    config_manager = ConfigManager()
+    parser = CLIParser(network, config_manager)
+    config_manager.open_journal(parser, journal_file, checkpoint_file)
+    autosave = Autosave(network, config_manager, interval=0.01)
+    autosave.start()
+    try:
+        for command in ["enable", "configure terminal", "interface g0", "ip address 10.0.0.1/24"]:
+            parser.parse_command(command)
+        deadline = time.time() + 5
+        while config_manager.is_dirty() and time.time() < deadline:
+            time.sleep(0.01)
+        assert not config_manager.is_dirty() and config_manager.journal.records == 0
+        
+        # Sin cambios no se reescribe el checkpoint
+        saves = autosave.saves
+        modified = os.stat(checkpoint_file).st_mtime_ns
+        time.sleep(0.05)
+        assert autosave.saves == saves and os.stat(checkpoint_file).st_mtime_ns == modified
+        
+        # El tráfico no se registra en el diario, pero también cuenta como cambio
+        with config_manager.lock:
+            network.send_packet("10.0.0.1", "10.0.0.9", "sin destino")
+            network.process_packets()
+        deadline = time.time() + 5
+        while config_manager.is_dirty(network) and time.time() < deadline:
+            time.sleep(0.01)
+        assert autosave.saves == saves + 1
+        print(f"Guardados automáticos: {autosave.saves}")
+    finally:
+        autosave.stop()
+        config_manager.close_journal()
+    
+    with open(checkpoint_file, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved["devices"]["R1"]["interfaces"]["g0"]["ip_address"] == "10.0.0.1"
+    assert saved["global_statistics"]["total_packets_sent"] == 1
+    assert sorted(os.listdir(directory)) == ["network_config.journal", "network_config.json"]
+    for filename in os.listdir(directory):
+        os.remove(os.path.join(directory, filename))
+    os.rmdir(directory)
+
 def run_all_tests():
     """Ejecuta todas las pruebas"""
     print("Iniciando pruebas del Simulador de Red...")
@@ -228,8 +1377,30 @@ def run_all_tests():
         test_packet()
         test_device_and_interface()
         test_network()
+        test_connection_store()
+        test_worklist()
+        test_statistics()
+        test_metrics()
+        test_profile()
+        test_ip_index()
+        test_routing()
+        test_fib()
+        test_event_engine()
+        test_send_batch()
+        test_history_size()
+        test_history_paths()
+        test_packet_store()
+        test_sharding()
         test_cli_parser()
+        test_run_script()
+        test_cli_server()
         test_config_manager()
+        test_import_cli_config()
+        test_topology()
+        test_config_stream()
+        test_snapshot()
+        test_journal()
+        test_autosave()
         
         print("\n" + "=" * 50)
         print("Todas las pruebas completadas exitosamente!")
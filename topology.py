@@ -0,0 +1,336 @@
+"""
+Generador de topologías sintéticas para el Simulador de Red
+Crea los dispositivos, interfaces, direcciones y conexiones de topologías
+clásicas (línea, anillo, estrella, árbol, malla, fat-tree y aleatoria) y las
+construye en la red con las operaciones masivas de Network o las escribe
+directamente en disco (JSON de configuración o formato CLI)
+"""
+
+import gc
+import json
+import os
+import random
+from device import Device, DEFAULT_HISTORY_SIZE
+from ip_utils import ip_to_int, int_to_ip
+
+LINK_BASE = ip_to_int("10.0.0.0")  # Cada enlace recibe una subred /30 consecutiva
+LINK_PREFIX = 30
+MAX_LINKS = 1 << 22  # Subredes /30 que caben en 10.0.0.0/8
+
+class Topology:
+    """
+    Topología generada: dispositivos y enlaces punto a punto
+
+    Cada enlace crea una interfaz nueva (e0, e1, ...) en cada extremo, y
+    las direcciones se derivan del índice del enlace, de modo que no hace
+    falta guardarlas: el enlace k usa la subred 10.0.0.0 + 4k /30, con .1
+    en el primer extremo y .2 en el segundo.
+    """
+
+    def __init__(self, kind):
+        """
+        Inicializa una topología vacía
+
+        Args:
+            kind (str): Tipo de topología (line, ring, ...)
+        """
+        self.kind = kind
+        self.devices = {}  # nombre -> (tipo, índices de los enlaces de sus interfaces)
+        self.links = []  # (dispositivo1, interfaz1, dispositivo2, interfaz2)
+
+    def add_device(self, name, device_type="router"):
+        """Añade un dispositivo sin interfaces"""
+        self.devices[name] = (device_type, [])
+
+    def connect(self, name1, name2):
+        """Une dos dispositivos con un enlace nuevo"""
+        index = len(self.links)
+        if index >= MAX_LINKS:
+            raise ValueError(f"Demasiados enlaces (máximo {MAX_LINKS})")
+        links1 = self.devices[name1][1]
+        links2 = self.devices[name2][1]
+        self.links.append((name1, f"e{len(links1)}", name2, f"e{len(links2)}"))
+        links1.append(index)
+        links2.append(index)
+
+    def interface_count(self):
+        """Número total de interfaces (dos por enlace)"""
+        return 2 * len(self.links)
+
+    def interfaces(self, name):
+        """
+        Genera las interfaces de un dispositivo
+
+        Yields:
+            tuple: (interfaz, ip, (dispositivo vecino, interfaz vecina))
+        """
+        for index in self.devices[name][1]:
+            device1, interface1, device2, interface2 = self.links[index]
+            subnet = LINK_BASE + 4 * index
+            if device1 == name:
+                yield interface1, int_to_ip(subnet + 1), (device2, interface2)
+            else:
+                yield interface2, int_to_ip(subnet + 2), (device1, interface1)
+
+    def __str__(self):
+        """Representación string de la topología"""
+        return (f"Topología {self.kind}: {len(self.devices)} dispositivos, "
+                f"{len(self.links)} enlaces, {self.interface_count()} interfaces")
+
+def _check(condition, message):
+    """Lanza ValueError con message si no se cumple condition"""
+    if not condition:
+        raise ValueError(message)
+
+def line(count):
+    """Cadena R0 - R1 - ... - Rn-1"""
+    _check(count >= 1, "Se requiere al menos 1 dispositivo")
+    topology = Topology("line")
+    for index in range(count):
+        topology.add_device(f"R{index}")
+    for index in range(count - 1):
+        topology.connect(f"R{index}", f"R{index + 1}")
+    return topology
+
+def ring(count):
+    """Cadena cerrada: la de line más el enlace Rn-1 - R0"""
+    _check(count >= 3, "Un anillo requiere al menos 3 dispositivos")
+    topology = line(count)
+    topology.kind = "ring"
+    topology.connect(f"R{count - 1}", "R0")
+    return topology
+
+def star(count):
+    """Switch central SW con count hosts H0..Hn-1"""
+    _check(count >= 1, "Se requiere al menos 1 host")
+    topology = Topology("star")
+    topology.add_device("SW", "switch")
+    for index in range(count):
+        topology.add_device(f"H{index}", "host")
+        topology.connect("SW", f"H{index}")
+    return topology
+
+def tree(depth, fanout):
+    """
+    Árbol completo de la profundidad y el grado dados
+
+    Los nodos se numeran por niveles (los hijos de Ti son Ti*f+1 .. Ti*f+f);
+    los internos son routers y las hojas, hosts.
+    """
+    _check(depth >= 0 and fanout >= 1, "Se requiere profundidad >= 0 y grado >= 1")
+    # Se acota nivel a nivel: fanout ** depth con valores enormes no termina
+    _check(depth <= MAX_LINKS, f"Demasiados enlaces (máximo {MAX_LINKS})")
+    total = level = 1
+    for _ in range(depth):
+        level *= fanout
+        total += level
+        _check(total - 1 <= MAX_LINKS, f"Demasiados enlaces (máximo {MAX_LINKS})")
+    internal = total - level
+    topology = Topology("tree")
+    for index in range(total):
+        topology.add_device(f"T{index}", "router" if index < internal else "host")
+    for index in range(1, total):
+        topology.connect(f"T{(index - 1) // fanout}", f"T{index}")
+    return topology
+
+def mesh(count):
+    """Malla completa: un enlace entre cada par de los count routers"""
+    _check(count >= 1, "Se requiere al menos 1 dispositivo")
+    _check(count * (count - 1) // 2 <= MAX_LINKS, f"Demasiados enlaces (máximo {MAX_LINKS})")
+    topology = Topology("mesh")
+    for index in range(count):
+        topology.add_device(f"R{index}")
+    for first in range(count):
+        for second in range(first + 1, count):
+            topology.connect(f"R{first}", f"R{second}")
+    return topology
+
+def fat_tree(k):
+    """
+    Fat-tree de k puertos (k par)
+
+    (k/2)^2 switches de núcleo C, k pods con k/2 switches de agregación A
+    y k/2 de acceso E cada uno, y k/2 hosts H por switch de acceso (k^3/4
+    hosts en total). El switch de agregación a de cada pod se une a los
+    núcleos a*k/2 .. a*k/2 + k/2 - 1.
+    """
+    _check(k >= 2 and k % 2 == 0, "fat-tree requiere un número de puertos k par >= 2")
+    half = k // 2
+    _check(3 * k ** 3 // 4 <= MAX_LINKS, f"Demasiados enlaces (máximo {MAX_LINKS})")
+    topology = Topology("fat-tree")
+    for core in range(half * half):
+        topology.add_device(f"C{core}", "switch")
+    for pod in range(k):
+        for position in range(half):
+            topology.add_device(f"A{pod}-{position}", "switch")
+            topology.add_device(f"E{pod}-{position}", "switch")
+        for aggregation in range(half):
+            for core in range(half):
+                topology.connect(f"A{pod}-{aggregation}", f"C{aggregation * half + core}")
+        for edge in range(half):
+            for aggregation in range(half):
+                topology.connect(f"E{pod}-{edge}", f"A{pod}-{aggregation}")
+            for host in range(half):
+                name = f"H{pod}-{edge}-{host}"
+                topology.add_device(name, "host")
+                topology.connect(f"E{pod}-{edge}", name)
+    return topology
+
+def random_graph(count, link_count, seed=None):
+    """
+    Grafo aleatorio conexo de count routers y link_count enlaces
+
+    Primero un árbol aleatorio (cada Ri se une a un Rj anterior) y después
+    enlaces entre pares al azar sin repetir; con la misma semilla se
+    obtiene la misma topología.
+    """
+    _check(count >= 1, "Se requiere al menos 1 dispositivo")
+    _check(count - 1 <= link_count <= count * (count - 1) // 2,
+           f"El número de enlaces debe estar entre {count - 1} y {count * (count - 1) // 2}")
+    _check(link_count <= MAX_LINKS, f"Demasiados enlaces (máximo {MAX_LINKS})")
+    rng = random.Random(seed)
+    topology = Topology("random")
+    for index in range(count):
+        topology.add_device(f"R{index}")
+    pairs = set()
+    for index in range(1, count):
+        other = rng.randrange(index)
+        pairs.add((other, index))
+        topology.connect(f"R{other}", f"R{index}")
+    while len(pairs) < link_count:
+        first, second = sorted(rng.sample(range(count), 2))
+        if (first, second) not in pairs:
+            pairs.add((first, second))
+            topology.connect(f"R{first}", f"R{second}")
+    return topology
+
+# Tipo -> (función, parámetros enteros obligatorios, uso)
+GENERATORS = {
+    "line": (line, 1, "line <n>"),
+    "ring": (ring, 1, "ring <n>"),
+    "star": (star, 1, "star <hosts>"),
+    "tree": (tree, 2, "tree <profundidad> <grado>"),
+    "mesh": (mesh, 1, "mesh <n>"),
+    "fat-tree": (fat_tree, 1, "fat-tree <k>"),
+    "random": (random_graph, 2, "random <n> <enlaces> [seed <s>]")
+}
+
+def generate(kind, params, seed=None):
+    """
+    Genera una topología
+
+    Args:
+        kind (str): Tipo (ver GENERATORS)
+        params (list): Parámetros enteros del tipo
+        seed (int): Semilla de la topología aleatoria
+
+    Returns:
+        Topology: Topología generada
+    """
+    if kind not in GENERATORS:
+        raise ValueError(f"Tipo de topología desconocido: {kind}")
+    function, param_count, usage = GENERATORS[kind]
+    if len(params) != param_count:
+        raise ValueError(f"Uso: generate {usage}")
+    gc_enabled = gc.isenabled()
+    gc.disable()  # Millones de tuplas y cadenas nuevas sin ciclos
+    try:
+        if kind == "random":
+            return function(*params, seed=seed)
+        return function(*params)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def build(topology, network):
+    """
+    Reemplaza la red por la topología
+
+    Los dispositivos se construyen con sus interfaces ya activas y se
+    registran de una vez; los enlaces se crean con Network.connect_bulk,
+    que invalida las rutas una sola vez. Como en snapshot.load_snapshot, el
+    recolector de ciclos se pausa: con millones de objetos nuevos sus
+    pasadas completas dominarían el tiempo.
+
+    Returns:
+        dict: Número de dispositivos y conexiones creados
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _build(topology, network)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def _build(topology, network):
+    """Construye la red (ver build)"""
+    network.clear()
+    network.set_history_size(DEFAULT_HISTORY_SIZE)
+    for name, (device_type, _) in topology.devices.items():
+        device = Device(name, device_type)
+        for interface_name, ip_address, _ in topology.interfaces(name):
+            device.add_interface(interface_name, ip_address, LINK_PREFIX)
+            device.interfaces[interface_name].no_shutdown()
+        network.register_device(device)
+    errors = network.connect_bulk([link + (None, None) for link in topology.links])
+    return {"devices": len(topology.devices), "connections": len(topology.links) - len(errors)}
+
+def write_config(topology, filename):
+    """
+    Escribe la topología en el formato JSON de ConfigManager.save_config
+    sin construir la red, dispositivo a dispositivo
+
+    El archivo se escribe en un temporal que después lo sustituye. Los
+    nombres generados (R0, e0, ...) no necesitan escaparse, así que cada
+    dispositivo se formatea directamente en lugar de pasar por json.dumps.
+    """
+    temporary = filename + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write('{\n  "devices": {')
+        separator = "\n"
+        for name, (device_type, _) in topology.devices.items():
+            interfaces = ", ".join(
+                f'"{interface_name}": {{"name": "{interface_name}", "ip_address": "{ip_address}", '
+                f'"prefix_length": {LINK_PREFIX}, "status": "up", '
+                f'"neighbors": [["{neighbor_device}", "{neighbor_interface}"]]}}'
+                for interface_name, ip_address, (neighbor_device, neighbor_interface)
+                in topology.interfaces(name)
+            )
+            f.write(f'{separator}    "{name}": {{"name": "{name}", "type": "{device_type}", '
+                    f'"status": "online", "interfaces": {{{interfaces}}}, "packets_processed": 0, '
+                    f'"packets_dropped": 0, "history_size": null}}')
+            separator = ",\n"
+        f.write('\n  },\n  "connections": [')
+        separator = "\n"
+        for device1, interface1, device2, interface2 in topology.links:
+            f.write(f'{separator}    ["{device1}", "{interface1}", "{device2}", "{interface2}"]')
+            separator = ",\n"
+        current_device = next(iter(topology.devices), None)
+        f.write("\n  ],\n")
+        f.write('  "link_properties": [],\n')
+        f.write(f'  "current_device": {json.dumps(current_device, ensure_ascii=False)},\n')
+        f.write(f'  "history_size": {DEFAULT_HISTORY_SIZE},\n')
+        f.write('  "global_statistics": {"total_packets_sent": 0, "total_packets_delivered": 0, '
+                '"total_packets_dropped": 0, "total_hops": 0}\n}\n')
+    os.replace(temporary, filename)
+
+def write_cli_config(topology, filename):
+    """
+    Escribe la topología en formato CLI (el de ConfigManager.export_cli_config)
+    sin construir la red
+
+    El archivo se escribe en un temporal que después lo sustituye.
+    """
+    temporary = filename + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        for name in topology.devices:
+            f.write(f"hostname {name}\n")
+            for interface_name, ip_address, _ in topology.interfaces(name):
+                f.write(f"interface {interface_name}\n  ip address {ip_address}/{LINK_PREFIX}\n"
+                        "  no shutdown\n  exit\n")
+            f.write("\n")
+        f.write("# Conexiones entre dispositivos")
+        for device1, interface1, device2, interface2 in topology.links:
+            f.write(f"\nconnect {device1} {interface1} {device2} {interface2}")
+    os.replace(temporary, filename)